@@ -1,21 +1,393 @@
 import os
 import sqlite3
+import threading
+import time
+from collections import deque
+from typing import Any, Deque, Dict, Optional, Tuple
 from urllib.parse import urlparse
 
-def get_conn(dict_cursor: bool = False):
-    database_url = os.getenv("DATABASE_URL", "sqlite:///./test.db")
 
-    # SQLite
-    if database_url.startswith("sqlite"):
-        db_path = database_url.replace("sqlite:///", "", 1)
-        conn = sqlite3.connect(db_path)
-        conn.row_factory = sqlite3.Row if dict_cursor else None
-        return conn
+# -----------------------------
+# Pool configuration (env)
+# -----------------------------
+# DB_POOL_SIZE         idle connections kept per database URL
+# DB_POOL_MAX_OVERFLOW extra connections allowed under burst load (closed on return)
+# DB_POOL_TIMEOUT      seconds to wait for a free connection before giving up
+# DB_POOL_PING_AFTER   idle seconds after which a connection is health-checked on checkout
 
-    # PostgreSQL
-    import psycopg2
-    from psycopg2.extras import RealDictCursor
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.getenv(name, str(default)))
+    except ValueError:
+        return default
 
-    if dict_cursor:
-        return psycopg2.connect(database_url, cursor_factory=RealDictCursor)
-    return psycopg2.connect(database_url)
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float(os.getenv(name, str(default)))
+    except ValueError:
+        return default
+
+
+def _database_url() -> str:
+    return os.getenv("DATABASE_URL", "sqlite:///./test.db")
+
+
+def _is_sqlite(database_url: str) -> bool:
+    return database_url.startswith("sqlite")
+
+
+def _psycopg2_dsn(database_url: str) -> str:
+    """
+    psycopg2 does not understand SQLAlchemy driver suffixes
+    (postgresql+psycopg2://...), so strip them for the raw connection.
+    """
+    scheme, sep, rest = database_url.partition("://")
+    if sep and "+" in scheme:
+        return f"{scheme.split('+', 1)[0]}://{rest}"
+    return database_url
+
+
+def db_backend() -> str:
+    """Return "sqlite" or "postgres" for the configured DATABASE_URL."""
+    return "sqlite" if _is_sqlite(_database_url()) else "postgres"
+
+
+class PoolTimeout(RuntimeError):
+    """Raised when no connection becomes available within DB_POOL_TIMEOUT."""
+
+
+class PooledConnection:
+    """
+    Thin proxy around a DB-API connection checked out from ConnectionPool.
+
+    - close() returns the connection to the pool instead of closing it,
+      so existing `conn = get_conn(); ...; conn.close()` call sites keep working.
+    - `with get_conn() as conn:` commits on a clean exit and rolls back on
+      error (like psycopg2/sqlite3 `with conn:`), then returns the connection.
+      A bare close() without commit() discards uncommitted work.
+    - dict_cursor=True is applied per cursor (psycopg2) or via row_factory (SQLite).
+    """
+
+    def __init__(self, pool: "ConnectionPool", raw: Any, dict_cursor: bool, overflow: bool):
+        self._pool = pool
+        self._raw = raw
+        self._dict_cursor = dict_cursor
+        self._overflow = overflow
+        self._released = False
+
+        if pool.is_sqlite:
+            raw.row_factory = sqlite3.Row if dict_cursor else None
+
+    def cursor(self, *args, **kwargs):
+        if self._released:
+            raise RuntimeError("connection already returned to pool")
+        if self._dict_cursor and not self._pool.is_sqlite and not args and "cursor_factory" not in kwargs:
+            from psycopg2.extras import RealDictCursor
+
+            kwargs["cursor_factory"] = RealDictCursor
+        return self._raw.cursor(*args, **kwargs)
+
+    def close(self) -> None:
+        if self._released:
+            return
+        self._released = True
+        self._pool.release(self._raw, overflow=self._overflow)
+
+    def __enter__(self) -> "PooledConnection":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        try:
+            if exc_type is None:
+                self._raw.commit()
+            else:
+                try:
+                    self._raw.rollback()
+                except Exception:
+                    pass
+        finally:
+            self.close()
+
+    def __getattr__(self, name: str) -> Any:
+        # commit / rollback / execute / autocommit / etc.
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return getattr(self._raw, name)
+
+    def __del__(self):
+        # Safety net for call sites that forget close() (e.g. exception paths):
+        # return the connection instead of leaking a pool slot.
+        try:
+            self.close()
+        except Exception:
+            pass
+
+
+class ConnectionPool:
+    """
+    Process-wide bounded pool of raw DB-API connections (psycopg2 or sqlite3).
+
+    - keeps up to `size` idle connections
+    - allows up to `max_overflow` extra connections under burst load
+    - blocks up to `timeout` seconds when exhausted, then raises PoolTimeout
+    - health-checks connections that sat idle longer than `ping_after` seconds
+    """
+
+    def __init__(
+        self,
+        database_url: str,
+        size: int = 5,
+        max_overflow: int = 10,
+        timeout: float = 10.0,
+        ping_after: float = 30.0,
+    ):
+        self.database_url = database_url
+        self.is_sqlite = _is_sqlite(database_url)
+        self.size = max(1, size)
+        self.max_overflow = max(0, max_overflow)
+        self.timeout = timeout
+        self.ping_after = ping_after
+
+        self._cond = threading.Condition(threading.Lock())
+        self._idle: Deque[Tuple[Any, float]] = deque()
+        self._in_use = 0
+        self._overflow_in_use = 0
+
+        self._stats: Dict[str, float] = {
+            "checkouts": 0,
+            "connections_created": 0,
+            "connections_reused": 0,
+            "connections_discarded": 0,
+            "health_check_failures": 0,
+            "overflow_checkouts": 0,
+            "overflow_peak": 0,
+            "waits": 0,
+            "wait_ms_total": 0.0,
+            "wait_ms_max": 0.0,
+            "timeouts": 0,
+        }
+
+    # ---- raw connection lifecycle ----
+
+    def _connect(self) -> Any:
+        if self.is_sqlite:
+            db_path = self.database_url.replace("sqlite:///", "", 1)
+            # Pooled connections are handed to whichever worker thread checks them out.
+            return sqlite3.connect(db_path, check_same_thread=False)
+
+        import psycopg2
+
+        return psycopg2.connect(_psycopg2_dsn(self.database_url))
+
+    def _is_alive(self, raw: Any, idle_s: float) -> bool:
+        if not self.is_sqlite and getattr(raw, "closed", 0):
+            return False
+        if idle_s < self.ping_after:
+            return True
+        try:
+            cur = raw.cursor()
+            cur.execute("SELECT 1")
+            cur.fetchall()
+            cur.close()
+            raw.rollback()
+            return True
+        except Exception:
+            return False
+
+    def _reset(self, raw: Any) -> bool:
+        """Roll back any open transaction so the next borrower starts clean."""
+        try:
+            if self.is_sqlite:
+                if raw.in_transaction:
+                    raw.rollback()
+                raw.row_factory = None
+            else:
+                if raw.closed:
+                    return False
+                raw.rollback()
+            return True
+        except Exception:
+            return False
+
+    @staticmethod
+    def _discard(raw: Any) -> None:
+        try:
+            raw.close()
+        except Exception:
+            pass
+
+    # ---- checkout / return ----
+
+    def acquire(self, dict_cursor: bool = False) -> PooledConnection:
+        t0 = time.perf_counter()
+        waited = False
+        deadline = t0 + self.timeout
+
+        with self._cond:
+            while True:
+                if self._idle:
+                    raw, idle_since = self._idle.pop()
+                    self._in_use += 1
+                    overflow = False
+                    source = "idle"
+                    break
+                if self._in_use < self.size:
+                    self._in_use += 1
+                    raw, overflow, source = None, False, "new"
+                    break
+                if self._overflow_in_use < self.max_overflow:
+                    self._overflow_in_use += 1
+                    self._stats["overflow_checkouts"] += 1
+                    self._stats["overflow_peak"] = max(self._stats["overflow_peak"], self._overflow_in_use)
+                    raw, overflow, source = None, True, "new"
+                    break
+
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    self._stats["timeouts"] += 1
+                    raise PoolTimeout(
+                        f"DB pool exhausted (size={self.size}, max_overflow={self.max_overflow}, "
+                        f"timeout={self.timeout}s)"
+                    )
+                waited = True
+                self._cond.wait(remaining)
+
+            self._stats["checkouts"] += 1
+            if waited:
+                wait_ms = (time.perf_counter() - t0) * 1000.0
+                self._stats["waits"] += 1
+                self._stats["wait_ms_total"] += wait_ms
+                self._stats["wait_ms_max"] = max(self._stats["wait_ms_max"], wait_ms)
+
+        # Connect / health-check outside the lock.
+        try:
+            if source == "idle" and not self._is_alive(raw, time.monotonic() - idle_since):
+                self._bump("health_check_failures")
+                self._bump("connections_discarded")
+                self._discard(raw)
+                raw = None
+            if raw is None:
+                raw = self._connect()
+                self._bump("connections_created")
+            else:
+                self._bump("connections_reused")
+        except Exception:
+            self._release_slot(overflow)
+            raise
+
+        return PooledConnection(self, raw, dict_cursor=dict_cursor, overflow=overflow)
+
+    def release(self, raw: Any, overflow: bool = False) -> None:
+        healthy = self._reset(raw)
+        keep = healthy and not overflow
+        if keep:
+            with self._cond:
+                if len(self._idle) < self.size:
+                    self._idle.append((raw, time.monotonic()))
+                else:
+                    keep = False
+        if not keep:
+            self._bump("connections_discarded")
+            self._discard(raw)
+        self._release_slot(overflow)
+
+    def _release_slot(self, overflow: bool) -> None:
+        with self._cond:
+            if overflow:
+                self._overflow_in_use -= 1
+            else:
+                self._in_use -= 1
+            self._cond.notify()
+
+    def _bump(self, key: str, n: float = 1) -> None:
+        with self._cond:
+            self._stats[key] += n
+
+    # ---- admin ----
+
+    def dispose(self) -> None:
+        with self._cond:
+            idle = list(self._idle)
+            self._idle.clear()
+        for raw, _ in idle:
+            self._discard(raw)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._cond:
+            out: Dict[str, Any] = dict(self._stats)
+            out.update(
+                {
+                    "backend": "sqlite" if self.is_sqlite else "postgres",
+                    "size": self.size,
+                    "max_overflow": self.max_overflow,
+                    "idle": len(self._idle),
+                    "in_use": self._in_use,
+                    "overflow_in_use": self._overflow_in_use,
+                }
+            )
+        checkouts = out["checkouts"] or 0
+        out["wait_ms_avg"] = round(out["wait_ms_total"] / checkouts, 3) if checkouts else 0.0
+        out["wait_ms_total"] = round(out["wait_ms_total"], 3)
+        out["wait_ms_max"] = round(out["wait_ms_max"], 3)
+        return out
+
+
+_POOLS_LOCK = threading.Lock()
+_POOLS: Dict[str, ConnectionPool] = {}
+
+
+def get_pool(database_url: Optional[str] = None) -> ConnectionPool:
+    """Return the process-wide pool for a DATABASE_URL (created lazily)."""
+    url = database_url or _database_url()
+    pool = _POOLS.get(url)
+    if pool is not None:
+        return pool
+
+    with _POOLS_LOCK:
+        pool = _POOLS.get(url)
+        if pool is None:
+            pool = ConnectionPool(
+                url,
+                size=_env_int("DB_POOL_SIZE", 5),
+                max_overflow=_env_int("DB_POOL_MAX_OVERFLOW", 10),
+                timeout=_env_float("DB_POOL_TIMEOUT", 10.0),
+                ping_after=_env_float("DB_POOL_PING_AFTER", 30.0),
+            )
+            _POOLS[url] = pool
+    return pool
+
+
+def pool_stats() -> Dict[str, Any]:
+    """Pool metrics for every DATABASE_URL used by this process (host only, no credentials)."""
+    with _POOLS_LOCK:
+        pools = list(_POOLS.items())
+
+    out: Dict[str, Any] = {}
+    for url, pool in pools:
+        if pool.is_sqlite:
+            label = url
+        else:
+            parsed = urlparse(url)
+            label = f"{parsed.hostname}:{parsed.port or 5432}{parsed.path}"
+        out[label] = pool.stats()
+    return out
+
+
+def dispose_pools() -> None:
+    """Close all idle pooled connections (e.g. on shutdown or in tests)."""
+    with _POOLS_LOCK:
+        pools = list(_POOLS.values())
+        _POOLS.clear()
+    for pool in pools:
+        pool.dispose()
+
+
+def get_conn(dict_cursor: bool = False) -> PooledConnection:
+    """
+    Check out a pooled connection for the configured DATABASE_URL.
+
+    Call conn.close() (or use `with get_conn() as conn:`, which also commits)
+    to return it to the pool.
+    """
+    return get_pool().acquire(dict_cursor=dict_cursor)
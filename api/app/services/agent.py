@@ -1,46 +1,112 @@
-import json
-from api.llm.planner import make_plan
+import asyncio
+from typing import Any, Dict, Iterator
+
+from api.llm.planner import make_plan, make_plan_async
+from api.app.services.rollup_service import rollup_coverage
 from api.app.sql.builder import resolve_date_range, build_kpi_sql
-from api.db.runner import run_sql
-from api.llm.summarizer import summarize
+from api.app.utils.metrics import stage
+from api.db.runner import run_in_db_executor, run_sql_columnar, run_sql_stream
+from api.llm.summarizer import summarize, summarize_async
 
 
-def _json_safe(value):
-    """
-    Convert DB/query results into JSON-serializable Python objects.
-    Dates/datetimes become strings automatically.
-    """
-    return json.loads(json.dumps(value, default=str))
+def _metric_queries(plan, rollups=None) -> list:
+    with stage("build_sql"):
+        start, end = resolve_date_range(plan.date_range.model_dump())
+        queries = []
+        for metric in plan.metrics:
+            sql, params = build_kpi_sql(
+                metric=metric,
+                grain=plan.grain,
+                start=start,
+                end=end,
+                breakdown=plan.breakdown,
+                rollups=rollups,
+            )
+            queries.append((metric, sql, params))
+    return queries
 
 
-def ask_agent(question: str) -> dict:
-    plan = make_plan(question)
+def _run_metric_sql(sql: str, params: dict):
+    with stage("sql"):
+        return run_sql_columnar(sql, params)
 
-    start, end = resolve_date_range(plan.date_range.model_dump())
+
+def ask_agent(question: str) -> dict:
+    with stage("plan"):
+        plan = make_plan(question)
 
     results = {}
-    for metric in plan.metrics:
-        sql, params = build_kpi_sql(
-            metric=metric,
-            grain=plan.grain,
-            start=start,
-            end=end,
-            breakdown=plan.breakdown,
+    for metric, sql, params in _metric_queries(plan, rollup_coverage()):
+        results[metric] = _run_metric_sql(sql, params)
+
+    # Results are ColumnarResult (a Sequence of row mappings); values keep their
+    # Decimal/date types until api.app.utils.serialization renders the response.
+    safe_plan = plan.model_dump(mode="json")
+
+    with stage("summarize"):
+        report = summarize(
+            question=question,
+            plan=safe_plan,
+            results=results,
         )
-        raw_rows = run_sql(sql, params)
-        results[metric] = _json_safe(raw_rows)
 
-    safe_plan = _json_safe(plan.model_dump())
+    return {
+        "question": question,
+        "plan": safe_plan,
+        "results": results,
+        "report": report,
+    }
+
+
+async def plan_agent_queries(question: str):
+    """Plan a question and build its per-metric SQL: (plan, [(metric, sql, params)])."""
+    with stage("plan"):
+        plan = await make_plan_async(question)
+    rollups = await run_in_db_executor(rollup_coverage)
+    return plan, _metric_queries(plan, rollups)
 
-    report = summarize(
-        question=question,
-        plan=safe_plan,
-        results=results,
+
+async def ask_agent_async(question: str) -> dict:
+    """
+    Async ask_agent(): awaits the planner/summarizer LLM calls and runs the
+    per-metric queries concurrently on the DB executor.
+    """
+    plan, queries = await plan_agent_queries(question)
+    rows_per_metric = await asyncio.gather(
+        *(run_in_db_executor(_run_metric_sql, sql, params) for _, sql, params in queries)
     )
+    results = {metric: rows for (metric, _, _), rows in zip(queries, rows_per_metric)}
+
+    safe_plan = plan.model_dump(mode="json")
+
+    with stage("summarize"):
+        report = await summarize_async(
+            question=question,
+            plan=safe_plan,
+            results=results,
+        )
 
     return {
         "question": question,
         "plan": safe_plan,
         "results": results,
         "report": report,
-    }
\ No newline at end of file
+    }
+
+
+def stream_agent_results(plan, queries: list) -> Iterator[Dict[str, Any]]:
+    """
+    Streaming variant of the agent result: yields events instead of building
+    the full `results` dict (no summary: it would need every row in memory).
+
+      {"type": "plan", "plan": {...}}
+      {"type": "rows", "metric": ..., "rows": [...]}        one per fetched chunk
+      {"type": "metric_end", "metric": ..., "row_count": N}
+    """
+    yield {"type": "plan", "plan": plan.model_dump(mode="json")}
+    for metric, sql, params in queries:
+        count = 0
+        for chunk in run_sql_stream(sql, params):
+            count += len(chunk)
+            yield {"type": "rows", "metric": metric, "rows": chunk}
+        yield {"type": "metric_end", "metric": metric, "row_count": count}
@@ -2,6 +2,7 @@ from typing import Any, Dict, List, Optional
 from datetime import datetime
 
 from api.app.db import get_conn
+from api.app.services.log_sink import submit_log
 
 
 def ensure_agent_log_table() -> None:
@@ -49,6 +50,21 @@ def insert_agent_log(
         conn.close()
 
 
+def enqueue_agent_log(
+    *,
+    question: str,
+    mode: str,
+    latency_ms: int,
+    status: str,
+    error: Optional[str] = None,
+) -> bool:
+    """insert_agent_log() via the background log sink; False if the row was dropped."""
+    return submit_log(
+        "agent_query_log",
+        {"question": question, "mode": mode, "latency_ms": latency_ms, "status": status, "error": error},
+    )
+
+
 def fetch_agent_history(limit: int = 20) -> List[Dict[str, Any]]:
     conn = get_conn()
     try:
@@ -4,9 +4,10 @@ from typing import Tuple, Optional, Dict, Any, List
 from datetime import date
 
 from ..db import get_conn
+from .kpi_cache import kpi_cached
 
 import os
-from openai import OpenAI
+from openai import AsyncOpenAI, OpenAI
 
 
 # -----------------------------
@@ -48,13 +49,16 @@ ORDER BY month DESC
     return base
 
 
+@kpi_cached
 def fetch_metric_rows(sql: str) -> List[Dict[str, Any]]:
     conn = get_conn(dict_cursor=True)
-    cur = conn.cursor()
-    cur.execute(sql)
-    rows = cur.fetchall()
-    cur.close()
-    conn.close()
+    try:
+        cur = conn.cursor()
+        cur.execute(sql)
+        rows = cur.fetchall()
+        cur.close()
+    finally:
+        conn.close()
 
     # We ordered DESC, but for narrative it’s nicer ASC
     return list(reversed(rows))
@@ -140,21 +144,22 @@ def _get_client() -> Optional[OpenAI]:
     return OpenAI(api_key=key)
 
 
-def build_llm_narrative(metric: str, rows: List[Dict[str, Any]], style: str = "executive") -> Tuple[str, str, str]:
-    """
-    LLM-powered narrative.
-    Returns (narrative, risk, recommendation).
-    Falls back to rule-based build_narrative() if LLM fails or API key missing.
-    """
-    if not rows:
-        return ("No data found.", "No risk signals.", "Insert KPI data first.")
+_ASYNC_CLIENTS: Dict[str, AsyncOpenAI] = {}
 
-    client = _get_client()
+
+def _get_async_client() -> Optional[AsyncOpenAI]:
+    """Async client reused per API key (keeps the HTTP connection pool warm)."""
+    key = os.getenv("OPENAI_API_KEY")
+    if not key:
+        return None
+    client = _ASYNC_CLIENTS.get(key)
     if client is None:
-        return build_narrative(metric, rows, style=style)
+        client = _ASYNC_CLIENTS.setdefault(key, AsyncOpenAI(api_key=key))
+    return client
 
-    try:
-        prompt = f"""
+
+def _narrative_prompt(metric: str, rows: List[Dict[str, Any]], style: str) -> str:
+    return f"""
 You are a senior analytics consultant. Write in {style} tone.
 
 Metric: {metric}
@@ -167,28 +172,72 @@ RISK: <one paragraph>
 RECOMMENDATION: <one paragraph>
 """.strip()
 
+
+def _parse_narrative(text: str) -> Optional[Tuple[str, str, str]]:
+    """Parse INSIGHT/RISK/RECOMMENDATION lines; None if any section is missing."""
+    text = (text or "").strip()
+
+    def _pick(prefix: str) -> str:
+        for line in text.splitlines():
+            if line.upper().startswith(prefix):
+                return line.split(":", 1)[1].strip()
+        return ""
+
+    insight = _pick("INSIGHT")
+    risk = _pick("RISK")
+    rec = _pick("RECOMMENDATION")
+
+    if not insight or not risk or not rec:
+        return None
+
+    return (insight, risk, rec)
+
+
+def build_llm_narrative(metric: str, rows: List[Dict[str, Any]], style: str = "executive") -> Tuple[str, str, str]:
+    """
+    LLM-powered narrative.
+    Returns (narrative, risk, recommendation).
+    Falls back to rule-based build_narrative() if LLM fails or API key missing.
+    """
+    if not rows:
+        return ("No data found.", "No risk signals.", "Insert KPI data first.")
+
+    client = _get_client()
+    if client is None:
+        return build_narrative(metric, rows, style=style)
+
+    try:
         resp = client.chat.completions.create(
             model=os.getenv("OPENAI_MODEL", "gpt-4.1-mini"),
-            messages=[{"role": "user", "content": prompt}],
+            messages=[{"role": "user", "content": _narrative_prompt(metric, rows, style)}],
             temperature=0.3,
         )
+        parsed = _parse_narrative(resp.choices[0].message.content)
+        return parsed or build_narrative(metric, rows, style=style)
 
-        text = (resp.choices[0].message.content or "").strip()
+    except Exception:
+        return build_narrative(metric, rows, style=style)
 
-        def _pick(prefix: str) -> str:
-            for line in text.splitlines():
-                if line.upper().startswith(prefix):
-                    return line.split(":", 1)[1].strip()
-            return ""
 
-        insight = _pick("INSIGHT")
-        risk = _pick("RISK")
-        rec = _pick("RECOMMENDATION")
+async def build_llm_narrative_async(
+    metric: str, rows: List[Dict[str, Any]], style: str = "executive"
+) -> Tuple[str, str, str]:
+    """Awaitable build_llm_narrative() (same prompt, parsing and fallback)."""
+    if not rows:
+        return ("No data found.", "No risk signals.", "Insert KPI data first.")
 
-        if not insight or not risk or not rec:
-            return build_narrative(metric, rows, style=style)
+    client = _get_async_client()
+    if client is None:
+        return build_narrative(metric, rows, style=style)
 
-        return (insight, risk, rec)
+    try:
+        resp = await client.chat.completions.create(
+            model=os.getenv("OPENAI_MODEL", "gpt-4.1-mini"),
+            messages=[{"role": "user", "content": _narrative_prompt(metric, rows, style)}],
+            temperature=0.3,
+        )
+        parsed = _parse_narrative(resp.choices[0].message.content)
+        return parsed or build_narrative(metric, rows, style=style)
 
     except Exception:
         return build_narrative(metric, rows, style=style)
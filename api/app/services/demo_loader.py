@@ -0,0 +1,245 @@
+from __future__ import annotations
+
+import io
+import random
+import time
+from datetime import date, timedelta
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from sqlalchemy import text
+
+from api.db.engines import get_engine
+from api.db.schema import DEMO_SALES_COLUMNS, DEMO_SALES_KEY, ensure_demo_sales_schema
+
+# -----------------------------
+# demo_sales_daily bulk loader
+# -----------------------------
+# Generates (day, country, category, seller) rows and writes them in chunks:
+#   - Postgres: COPY ... FROM STDIN (CSV buffer per chunk); with replace=False the
+#     chunks go to a temp staging table and are merged with one INSERT ... ON CONFLICT
+#   - SQLite:   multi-row INSERT ... VALUES (...), (...) statements
+# Everything runs in one transaction. Written rows get updated_at = now, which
+# api.app.services.kpi_derivation uses to find the months to recompute.
+
+# Base scale per country (share of US volume); extra countries get a random scale.
+COUNTRY_SCALES: Dict[str, float] = {
+    "US": 1.00, "CA": 0.35, "KR": 0.55, "JP": 0.50, "BR": 0.40, "DE": 0.45,
+}
+_EXTRA_COUNTRIES = [
+    "GB", "FR", "IT", "ES", "MX", "IN", "AU", "NL", "SE", "SG",
+    "CH", "PL", "TR", "ID", "TH", "VN", "AR", "CL", "CO", "ZA",
+]
+
+# Category share of a country's daily volume; extra categories split the remainder evenly.
+CATEGORY_SHARES: Dict[str, float] = {
+    "electronics": 0.35, "apparel": 0.25, "home": 0.20, "beauty": 0.12, "sports": 0.08,
+}
+
+COPY_CHUNK_ROWS = 50_000
+# Stay under SQLite's default 999 bound-parameter limit.
+SQLITE_ROWS_PER_STATEMENT = 999 // len(DEMO_SALES_COLUMNS)
+
+
+def demo_countries(n: int) -> List[str]:
+    """First n country codes: the six originals, then real codes, then synthetic X001..."""
+    n = max(1, n)
+    codes = list(COUNTRY_SCALES) + _EXTRA_COUNTRIES
+    codes += [f"X{i:03d}" for i in range(1, max(0, n - len(codes)) + 1)]
+    return codes[:n]
+
+
+def demo_categories(n: int) -> Dict[str, float]:
+    """First n categories with their volume shares (normalised to 1)."""
+    n = max(1, n)
+    names = list(CATEGORY_SHARES)[:n] + [f"category_{i:02d}" for i in range(len(CATEGORY_SHARES) + 1, n + 1)]
+    weights = [CATEGORY_SHARES.get(c, 0.05) for c in names]
+    total = sum(weights)
+    return {c: w / total for c, w in zip(names, weights)}
+
+
+def generate_demo_rows(
+    start: date,
+    end: date,
+    countries: List[str],
+    categories: int = 1,
+    sellers: int = 1,
+    seed: Optional[int] = None,
+) -> Iterator[Tuple[date, str, str, str, float, int, int]]:
+    """
+    Yield (d, country, category, seller_id, revenue, orders, customers) for every
+    day in [start, end]. A country's daily volume is split across categories by
+    share and evenly across sellers.
+    """
+    rng = random.Random(seed)
+    scales = {c: COUNTRY_SCALES.get(c) or round(rng.uniform(0.1, 0.6), 2) for c in countries}
+    category_shares = demo_categories(categories)
+    seller_ids = [f"S{i:03d}" for i in range(1, max(1, sellers) + 1)]
+    seller_share = 1.0 / len(seller_ids)
+    min_orders = 5 if len(category_shares) * len(seller_ids) == 1 else 1
+
+    d = start
+    while d <= end:
+        base_mult = 1.0 + (0.15 * (1 if d.weekday() in (4, 5) else 0))  # Fri/Sat uplift
+        for c in countries:
+            for cat, cat_share in category_shares.items():
+                for seller in seller_ids:
+                    scale = scales[c] * cat_share * seller_share
+                    orders = max(min_orders, int(rng.gauss(120 * scale * base_mult, 18 * scale)))
+                    customers = max(1, int(orders * rng.uniform(0.55, 0.85)))
+                    aov = rng.uniform(35, 95) * (1.05 if c in ("US", "DE") else 1.0)
+                    revenue = round(orders * aov * rng.uniform(0.92, 1.08), 2)
+                    yield d, c, cat, seller, revenue, orders, customers
+        d += timedelta(days=1)
+
+
+def _chunks(rows: Iterator[tuple], size: int) -> Iterator[List[tuple]]:
+    chunk: List[tuple] = []
+    for r in rows:
+        chunk.append(r)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _csv_buffer(chunk: List[tuple]) -> io.StringIO:
+    buf = io.StringIO()
+    buf.writelines(
+        f"{d.isoformat()},{c},{cat},{s},{rev:.2f},{o},{cu}\n" for d, c, cat, s, rev, o, cu in chunk
+    )
+    buf.seek(0)
+    return buf
+
+
+def _load_postgres(rows: Iterator[tuple], replace: bool, chunk_rows: int) -> int:
+    cols = ", ".join(DEMO_SALES_COLUMNS)
+    raw = get_engine().raw_connection()
+    try:
+        cur = raw.cursor()
+        if replace:
+            cur.execute("TRUNCATE TABLE demo_sales_daily;")
+            target = "demo_sales_daily"
+        else:
+            cur.execute(
+                "CREATE TEMP TABLE demo_sales_daily_stage "
+                "(LIKE demo_sales_daily INCLUDING DEFAULTS) ON COMMIT DROP;"
+            )
+            target = "demo_sales_daily_stage"
+
+        total = 0
+        for chunk in _chunks(rows, chunk_rows):
+            cur.copy_expert(f"COPY {target} ({cols}) FROM STDIN WITH (FORMAT csv)", _csv_buffer(chunk))
+            total += len(chunk)
+
+        if not replace:
+            cur.execute(
+                f"""
+                INSERT INTO demo_sales_daily ({cols})
+                SELECT {cols} FROM demo_sales_daily_stage
+                ON CONFLICT ({", ".join(DEMO_SALES_KEY)})
+                DO UPDATE SET revenue=EXCLUDED.revenue, orders=EXCLUDED.orders, customers=EXCLUDED.customers,
+                              updated_at=now();
+                """
+            )
+        raw.commit()
+        cur.close()
+        return total
+    except Exception:
+        raw.rollback()
+        raise
+    finally:
+        raw.close()
+
+
+def _load_sqlite(rows: Iterator[tuple], replace: bool) -> int:
+    cols = ", ".join(DEMO_SALES_COLUMNS)
+    placeholders = "(" + ", ".join("?" for _ in DEMO_SALES_COLUMNS) + ")"
+    upsert = (
+        f" ON CONFLICT ({', '.join(DEMO_SALES_KEY)}) DO UPDATE SET "
+        "revenue=excluded.revenue, orders=excluded.orders, customers=excluded.customers, "
+        "updated_at=CURRENT_TIMESTAMP"
+    )
+
+    raw = get_engine().raw_connection()
+    try:
+        cur = raw.cursor()
+        if replace:
+            cur.execute("DELETE FROM demo_sales_daily;")
+
+        total = 0
+        statements: Dict[int, str] = {}
+        for chunk in _chunks(rows, SQLITE_ROWS_PER_STATEMENT):
+            sql = statements.get(len(chunk))
+            if sql is None:
+                values = ", ".join([placeholders] * len(chunk))
+                sql = statements[len(chunk)] = f"INSERT INTO demo_sales_daily ({cols}) VALUES {values}{upsert}"
+            params = [v for d, *rest in chunk for v in (d.isoformat(), *rest)]
+            cur.execute(sql, params)
+            total += len(chunk)
+
+        raw.commit()
+        cur.close()
+        return total
+    except Exception:
+        raw.rollback()
+        raise
+    finally:
+        raw.close()
+
+
+def load_demo_sales(
+    days: int = 90,
+    countries: int = 6,
+    categories: int = 1,
+    sellers: int = 1,
+    replace: bool = True,
+    end: Optional[date] = None,
+    seed: Optional[int] = None,
+    chunk_rows: int = COPY_CHUNK_ROWS,
+) -> Dict[str, Any]:
+    """
+    Generate days x countries x categories x sellers rows ending at `end`
+    (default today) and bulk-load them. replace=True empties demo_sales_daily
+    first (its previous date range is returned as replaced_range); otherwise rows
+    are upserted. Returns load stats including rows_per_sec.
+    """
+    days = max(1, days)
+    end = end or date.today()
+    start = end - timedelta(days=days - 1)
+    codes = demo_countries(countries)
+    rows = generate_demo_rows(start, end, codes, categories=categories, sellers=sellers, seed=seed)
+
+    engine = get_engine()
+    replaced_range = None
+    with engine.begin() as conn:
+        schema = ensure_demo_sales_schema(conn, start, end)
+        if replace:
+            # What the truncation removes, so derived tables can drop months that vanish.
+            lo, hi = conn.execute(text("SELECT MIN(d), MAX(d) FROM demo_sales_daily")).one()
+            if lo is not None:
+                replaced_range = [str(lo)[:10], str(hi)[:10]]
+
+    t0 = time.perf_counter()
+    if engine.dialect.name == "sqlite":
+        method = "sqlite_multirow_insert"
+        total = _load_sqlite(rows, replace)
+    else:
+        method = "postgres_copy"
+        total = _load_postgres(rows, replace, max(1, chunk_rows))
+    elapsed = time.perf_counter() - t0
+
+    return {
+        "rows": total,
+        "days": days,
+        "countries": codes,
+        "categories": list(demo_categories(categories)),
+        "sellers": max(1, sellers),
+        "date_range": [start.isoformat(), end.isoformat()],
+        "method": method,
+        "replace": replace,
+        "replaced_range": replaced_range,
+        "schema": schema,
+        "seconds": round(elapsed, 3),
+        "rows_per_sec": round(total / elapsed, 1) if elapsed > 0 else None,
+    }
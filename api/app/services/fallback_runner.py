@@ -0,0 +1,83 @@
+from __future__ import annotations
+
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+# Shared pool for multi-metric fallback legs (one leg = DB read + LLM narrative).
+# Legs are I/O bound, so threads are enough; the pool is process-wide so a burst
+# of fallback requests cannot spawn unbounded threads.
+FALLBACK_MAX_WORKERS = int(os.getenv("FALLBACK_MAX_WORKERS", "16"))
+FALLBACK_LEG_TIMEOUT_S = float(os.getenv("FALLBACK_LEG_TIMEOUT_S", "30"))
+
+_EXECUTOR = ThreadPoolExecutor(max_workers=FALLBACK_MAX_WORKERS, thread_name_prefix="fallback-leg")
+
+
+def run_metric_legs(
+    leg: Callable[[str], Any],
+    metrics: List[str],
+    timeout_s: Optional[float] = None,
+) -> Tuple[List[Any], List[Dict[str, Any]]]:
+    """
+    Run `leg(metric)` for every metric concurrently.
+
+    Returns (outputs, failed_legs):
+      - outputs: successful leg results, in the same order as `metrics`
+      - failed_legs: [{"metric": ..., "error": ...}] for legs that raised or
+        did not finish within timeout_s (partial results are still returned)
+
+    Raises RuntimeError only if every leg failed.
+    """
+    timeout = FALLBACK_LEG_TIMEOUT_S if timeout_s is None else timeout_s
+    futures = [(m, _EXECUTOR.submit(leg, m)) for m in metrics]
+    wait([f for _, f in futures], timeout=timeout)
+
+    outputs: List[Any] = []
+    failed: List[Dict[str, Any]] = []
+    for metric, fut in futures:
+        if not fut.done():
+            # Cannot interrupt a running thread; drop its result when it finishes.
+            fut.cancel()
+            failed.append({"metric": metric, "error": f"timeout after {timeout:.1f}s"})
+            continue
+        try:
+            outputs.append(fut.result())
+        except Exception as e:
+            failed.append({"metric": metric, "error": str(e)[:200]})
+
+    if not outputs and failed:
+        raise RuntimeError(f"all fallback legs failed: {failed}")
+
+    return outputs, failed
+
+
+async def run_metric_legs_async(
+    leg: Callable[[str], Awaitable[Any]],
+    metrics: List[str],
+    timeout_s: Optional[float] = None,
+) -> Tuple[List[Any], List[Dict[str, Any]]]:
+    """
+    Awaitable run_metric_legs(): legs are coroutines gathered on the event loop,
+    each bounded by timeout_s. Same (outputs, failed_legs) contract.
+    """
+    timeout = FALLBACK_LEG_TIMEOUT_S if timeout_s is None else timeout_s
+    results = await asyncio.gather(
+        *(asyncio.wait_for(leg(m), timeout=timeout) for m in metrics),
+        return_exceptions=True,
+    )
+
+    outputs: List[Any] = []
+    failed: List[Dict[str, Any]] = []
+    for metric, res in zip(metrics, results):
+        if isinstance(res, asyncio.TimeoutError):
+            failed.append({"metric": metric, "error": f"timeout after {timeout:.1f}s"})
+        elif isinstance(res, Exception):
+            failed.append({"metric": metric, "error": str(res)[:200]})
+        else:
+            outputs.append(res)
+
+    if not outputs and failed:
+        raise RuntimeError(f"all fallback legs failed: {failed}")
+
+    return outputs, failed
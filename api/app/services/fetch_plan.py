@@ -0,0 +1,66 @@
+from __future__ import annotations
+
+import threading
+from typing import Any, Callable, Dict, List, Optional
+
+from api.app.services.analyze_service import fetch_metric_rows
+
+
+class FetchPlan:
+    """
+    Request-scoped KPI read plan.
+
+    The multi-metric fallback legs all build the same kpi_monthly SELECT
+    (build_metric_sql ignores the metric). A FetchPlan runs each distinct SQL
+    once per request and hands the same row list to every leg, even when the
+    legs run concurrently. Rows are shared: treat them as read-only.
+    """
+
+    def __init__(self, fetch: Optional[Callable[[str], List[Dict[str, Any]]]] = None):
+        self._fetch = fetch or fetch_metric_rows
+        self._lock = threading.Lock()
+        self._rows: Dict[str, List[Dict[str, Any]]] = {}
+        self._errors: Dict[str, BaseException] = {}
+        self._pending: Dict[str, threading.Event] = {}
+        self.reads = 0
+        self.queries = 0
+
+    def rows(self, sql: str) -> List[Dict[str, Any]]:
+        key = sql.strip()
+        with self._lock:
+            self.reads += 1
+            if key in self._rows:
+                return self._rows[key]
+            if key in self._errors:
+                raise self._errors[key]
+            event = self._pending.get(key)
+            owner = event is None
+            if owner:
+                event = threading.Event()
+                self._pending[key] = event
+                self.queries += 1
+
+        if not owner:
+            event.wait()
+            with self._lock:
+                if key in self._errors:
+                    raise self._errors[key]
+                return self._rows[key]
+
+        try:
+            rows = self._fetch(sql)
+            with self._lock:
+                self._rows[key] = rows
+            return rows
+        except BaseException as e:
+            with self._lock:
+                self._errors[key] = e
+            raise
+        finally:
+            with self._lock:
+                self._pending.pop(key, None)
+            event.set()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"reads": self.reads, "queries": self.queries, "shared": self.reads - self.queries}
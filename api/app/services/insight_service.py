@@ -3,6 +3,7 @@ from __future__ import annotations
 from dataclasses import dataclass
 from typing import Dict, Any, List, Optional, Tuple
 
+from api.app.services.kpi_cache import kpi_cached
 from api.app.services.report_service import fetch_latest_two_months
 
 
@@ -29,6 +30,7 @@ def _change(prev: Optional[float], cur: Optional[float]) -> Tuple[Optional[float
     return delta, pct
 
 
+@kpi_cached
 def compute_latest_kpi_changes() -> Dict[str, Any]:
     """
     Returns:
@@ -168,3 +170,78 @@ def simulate_kpi_what_if(
             "revenue_delta_pct": (impact / cur_revenue) if (impact is not None and cur_revenue) else None,
         },
     }
+
+
+def _simulation_base(changes_payload: Dict[str, Any]) -> Dict[str, Optional[float]]:
+    current = changes_payload["months"][1]
+    return {
+        m: (float(current[m]) if current.get(m) is not None else None)
+        for m in ("orders", "aov", "revenue")
+    }
+
+
+def _revenue_columns(base: Dict[str, Optional[float]], sim_revenue: List[float]) -> Dict[str, Any]:
+    cur_revenue = base["revenue"]
+    if cur_revenue is None:
+        return {"revenue": sim_revenue, "revenue_delta": None, "revenue_delta_pct": None}
+    delta = [r - cur_revenue for r in sim_revenue]
+    return {
+        "revenue": sim_revenue,
+        "revenue_delta": delta,
+        "revenue_delta_pct": [d / cur_revenue for d in delta] if cur_revenue else None,
+    }
+
+
+def simulate_kpi_grid(
+    changes_payload: Dict[str, Any],
+    orders_delta_pct: List[float],
+    aov_delta_pct: List[float],
+) -> Dict[str, Any]:
+    """
+    simulate_kpi_what_if() over every (orders_delta_pct x aov_delta_pct) pair.
+
+    Revenue ~ Orders * AOV factorizes, so the grid is the outer product of
+    (1 + od) and (1 + ad) scaled by base orders * AOV. Matrices are row-major,
+    rows = orders_delta_pct, columns = aov_delta_pct, flattened to one list each.
+    """
+    if changes_payload.get("status") != "ok":
+        return changes_payload
+
+    base = _simulation_base(changes_payload)
+    out: Dict[str, Any] = {
+        "status": "ok",
+        "base": base,
+        "shape": [len(orders_delta_pct), len(aov_delta_pct)],
+        "orders_delta_pct": orders_delta_pct,
+        "aov_delta_pct": aov_delta_pct,
+    }
+    if base["orders"] is None or base["aov"] is None:
+        out.update({"revenue": None, "revenue_delta": None, "revenue_delta_pct": None})
+        return out
+
+    base_revenue = base["orders"] * base["aov"]
+    aov_factors = [base_revenue * (1 + ad) for ad in aov_delta_pct]
+    sim_revenue = [(1 + od) * f for od in orders_delta_pct for f in aov_factors]
+    out.update(_revenue_columns(base, sim_revenue))
+    return out
+
+
+def simulate_kpi_scenarios(
+    changes_payload: Dict[str, Any],
+    scenarios: List[Dict[str, float]],
+) -> Dict[str, Any]:
+    """simulate_kpi_what_if() for a list of scenarios, returned column-wise (one list per field)."""
+    if changes_payload.get("status") != "ok":
+        return changes_payload
+
+    base = _simulation_base(changes_payload)
+    od = [s.get("orders_delta_pct", 0.0) for s in scenarios]
+    ad = [s.get("aov_delta_pct", 0.0) for s in scenarios]
+    out: Dict[str, Any] = {"status": "ok", "base": base, "orders_delta_pct": od, "aov_delta_pct": ad}
+    if base["orders"] is None or base["aov"] is None:
+        out.update({"revenue": None, "revenue_delta": None, "revenue_delta_pct": None})
+        return out
+
+    base_revenue = base["orders"] * base["aov"]
+    out.update(_revenue_columns(base, [base_revenue * (1 + o) * (1 + a) for o, a in zip(od, ad)]))
+    return out
@@ -0,0 +1,152 @@
+from __future__ import annotations
+
+import json
+import os
+import time
+from typing import Any, Dict, List
+
+from sqlalchemy import text
+
+from api.app.services.job_store import SqlJobStore
+from api.app.utils.serialization import dumps_str
+from api.db.engines import get_engine
+
+# -----------------------------
+# Durable job queue (agent_jobs)
+# -----------------------------
+# With JOB_QUEUE_MODE=queue the web tier only inserts PENDING rows (create_job);
+# `python -m api.worker` processes on any node claim and run them:
+#
+# - claim_jobs(): PENDING rows, or RUNNING rows whose lease expired (crashed
+#   worker), oldest first, are marked RUNNING with lease_owner/lease_expires_at.
+#   On Postgres the candidate SELECT uses FOR UPDATE SKIP LOCKED, so concurrent
+#   workers never block on or double-claim the same row. (SQLite serializes
+#   writers, so the plain UPDATE is already exclusive.)
+# - heartbeat(): the worker extends the lease of its running jobs every
+#   JOB_HEARTBEAT_S; a worker that stops heartbeating loses its jobs after
+#   JOB_LEASE_S and they are claimed again, up to JOB_MAX_ATTEMPTS times.
+# - complete_job()/fail_job() only apply while the caller still holds the lease,
+#   so a worker that lost its lease cannot overwrite the new owner's result.
+# - JOB_TTL_S never applies to queued or running rows (job_store only expires
+#   finished jobs), so a backlog older than the TTL is still claimed.
+
+JOB_LEASE_S = int(os.getenv("JOB_LEASE_S", "60"))
+JOB_HEARTBEAT_S = float(os.getenv("JOB_HEARTBEAT_S", "15"))
+JOB_MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", "3"))
+
+_STORE = SqlJobStore()
+
+_CANDIDATES_SQL = """
+SELECT job_id FROM agent_jobs
+WHERE (status = 'PENDING' OR (status = 'RUNNING' AND lease_expires_at < :now))
+  AND attempts < :max_attempts
+ORDER BY created_at
+LIMIT :n
+"""
+
+
+def claim_jobs(worker_id: str, n: int) -> List[Dict[str, Any]]:
+    """Lease up to n runnable jobs to worker_id; returns [{job_id, payload, attempts}]."""
+    if n <= 0:
+        return []
+    now = int(time.time())
+    params = {"now": now, "max_attempts": JOB_MAX_ATTEMPTS, "n": n, "w": worker_id, "exp": now + JOB_LEASE_S}
+    with get_engine().begin() as conn:
+        _STORE.ensure(conn)
+        candidates = _CANDIDATES_SQL
+        if conn.dialect.name == "postgresql":
+            candidates += " FOR UPDATE SKIP LOCKED"
+        rows = conn.execute(
+            text(
+                f"""
+                UPDATE agent_jobs
+                SET status = 'RUNNING', lease_owner = :w, lease_expires_at = :exp,
+                    attempts = attempts + 1, updated_at = :now
+                WHERE job_id IN ({candidates})
+                RETURNING job_id, payload, attempts
+                """
+            ),
+            params,
+        ).mappings().all()
+    return [
+        {"job_id": r["job_id"], "payload": json.loads(r["payload"]) if r["payload"] else {}, "attempts": r["attempts"]}
+        for r in rows
+    ]
+
+
+def heartbeat(worker_id: str, job_ids: List[str]) -> int:
+    """Extend the leases worker_id still holds; returns how many were extended."""
+    if not job_ids:
+        return 0
+    now = int(time.time())
+    with get_engine().begin() as conn:
+        result = conn.execute(
+            text(
+                f"""
+                UPDATE agent_jobs SET lease_expires_at = :exp, updated_at = :now
+                WHERE lease_owner = :w AND status = 'RUNNING'
+                  AND job_id IN ({", ".join(f":j{i}" for i in range(len(job_ids)))})
+                """
+            ),
+            {"exp": now + JOB_LEASE_S, "now": now, "w": worker_id, **{f"j{i}": j for i, j in enumerate(job_ids)}},
+        )
+    return result.rowcount or 0
+
+
+def _finish(job_id: str, worker_id: str, status: str, result: Any = None, error: Any = None) -> bool:
+    with get_engine().begin() as conn:
+        updated = conn.execute(
+            text(
+                """
+                UPDATE agent_jobs
+                SET status = :status, result = :result, error = :error,
+                    lease_owner = NULL, lease_expires_at = NULL, updated_at = :now
+                WHERE job_id = :job_id AND lease_owner = :w AND status = 'RUNNING'
+                """
+            ),
+            {
+                "status": status,
+                "result": dumps_str(result) if result is not None else None,
+                "error": error,
+                "now": int(time.time()),
+                "job_id": job_id,
+                "w": worker_id,
+            },
+        ).rowcount
+    return bool(updated)
+
+
+def complete_job(job_id: str, worker_id: str, result: Any) -> bool:
+    """Record the result; False if worker_id no longer holds the lease."""
+    return _finish(job_id, worker_id, "SUCCEEDED", result=result)
+
+
+def fail_job(job_id: str, worker_id: str, error: str) -> bool:
+    return _finish(job_id, worker_id, "FAILED", error=error)
+
+
+def fail_exhausted_jobs() -> int:
+    """Mark FAILED the jobs whose lease expired on their last allowed attempt."""
+    now = int(time.time())
+    with get_engine().begin() as conn:
+        _STORE.ensure(conn)
+        return (
+            conn.execute(
+                text(
+                    """
+                    UPDATE agent_jobs
+                    SET status = 'FAILED', error = :error, lease_owner = NULL, updated_at = :now
+                    WHERE status = 'RUNNING' AND lease_expires_at < :now AND attempts >= :max_attempts
+                    """
+                ),
+                {"error": f"lease expired after {JOB_MAX_ATTEMPTS} attempts", "now": now, "max_attempts": JOB_MAX_ATTEMPTS},
+            ).rowcount
+            or 0
+        )
+
+
+def queue_stats() -> Dict[str, int]:
+    with get_engine().begin() as conn:
+        _STORE.ensure(conn)
+        rows = conn.execute(text("SELECT status, COUNT(*) FROM agent_jobs GROUP BY status")).all()
+    return {status: count for status, count in rows}
@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+import contextvars
+import os
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+from api.app.utils.request_id import bind_request_id, current_request_id
+
+# -----------------------------
+# Async job executor
+# -----------------------------
+# /v1/agent/query-async jobs run here instead of in FastAPI BackgroundTasks, so a
+# burst of jobs cannot occupy the request threadpool.
+# - JOB_WORKERS: jobs running at once
+# - JOB_QUEUE_MAX: jobs allowed to wait for a worker; past that submit_job()
+#   refuses (the router answers 503) rather than queueing without bound
+# shutdown_job_runner() cancels jobs still waiting for a worker and calls their
+# on_cancel, so the caller can mark them finished instead of leaving them PENDING.
+# Jobs run in a fresh context that carries only the submitting request's
+# request_id (for logs): no request metrics record, so their stages are
+# recorded as endpoint="background" and cannot relabel the submitting request.
+
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "4"))
+JOB_QUEUE_MAX = int(os.getenv("JOB_QUEUE_MAX", "100"))
+
+_EXECUTOR = ThreadPoolExecutor(max_workers=max(1, JOB_WORKERS), thread_name_prefix="job")
+_LOCK = threading.Lock()
+_STATS: Dict[str, int] = {"inflight": 0, "submitted": 0, "rejected": 0, "failed": 0, "cancelled": 0}
+
+
+def _run(fn: Callable[..., Any], args: tuple) -> None:
+    try:
+        fn(*args)
+    except Exception:
+        # Job functions record their own errors; this only keeps the slot accounting right.
+        with _LOCK:
+            _STATS["failed"] += 1
+    finally:
+        with _LOCK:
+            _STATS["inflight"] -= 1
+
+
+def _cancelled(on_cancel: Optional[Callable[[], Any]], future: "Future[Any]") -> None:
+    if not future.cancelled():
+        return
+    with _LOCK:
+        _STATS["inflight"] -= 1
+        _STATS["cancelled"] += 1
+    if on_cancel is not None:
+        try:
+            on_cancel()
+        except Exception:
+            pass
+
+
+def submit_job(fn: Callable[..., Any], *args: Any, on_cancel: Optional[Callable[[], Any]] = None) -> bool:
+    """
+    Run fn(*args) on the job executor; False if JOB_WORKERS + JOB_QUEUE_MAX jobs are already in flight.
+    on_cancel() is called if the job is cancelled before it starts (shutdown_job_runner).
+    """
+    with _LOCK:
+        if _STATS["inflight"] >= max(1, JOB_WORKERS) + JOB_QUEUE_MAX:
+            _STATS["rejected"] += 1
+            return False
+        _STATS["inflight"] += 1
+        _STATS["submitted"] += 1
+    ctx = contextvars.Context()
+    ctx.run(bind_request_id, current_request_id())
+    future = _EXECUTOR.submit(ctx.run, _run, fn, args)
+    future.add_done_callback(lambda f: _cancelled(on_cancel, f))
+    return True
+
+
+def job_runner_stats() -> Dict[str, Any]:
+    with _LOCK:
+        stats = dict(_STATS)
+    running = min(stats["inflight"], max(1, JOB_WORKERS))
+    return {**stats, "running": running, "queued": stats["inflight"] - running, "workers": JOB_WORKERS, "queue_max": JOB_QUEUE_MAX}
+
+
+def shutdown_job_runner() -> None:
+    _EXECUTOR.shutdown(wait=False, cancel_futures=True)
@@ -1,27 +1,86 @@
 from __future__ import annotations
 
+import json
+import os
 import threading
 import time
 import uuid
-from typing import Any, Dict, Optional
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
 
+from sqlalchemy import inspect, text
 
-_LOCK = threading.Lock()
-_JOBS: Dict[str, Dict[str, Any]] = {}
+from api.app.utils.serialization import dumps_str
+from api.db.engines import get_engine
+
+# -----------------------------
+# Async job store
+# -----------------------------
+# JOB_STORE_BACKEND=memory (default): per-process OrderedDict in creation order.
+#   Bounded to JOB_STORE_MAX_JOBS (oldest finished jobs evicted first); finished
+#   jobs not updated for JOB_TTL_S are evicted on the next write. Recent listing
+#   walks from the newest end, so it costs O(limit), not a copy + sort of every job.
+# JOB_STORE_BACKEND=sql: agent_jobs table on DATABASE_URL (sqlite or Postgres),
+#   visible to every worker. Listing uses the created_at index; expired finished
+#   rows are deleted on create. Also the durable queue consumed by api.worker
+#   (JOB_QUEUE_MODE=queue forces this backend; see api.app.services.job_queue).
+#
+# Only SUCCEEDED/FAILED jobs are ever evicted or expired: a PENDING or RUNNING
+# job stays until it finishes, so a backlog never loses work. (The memory store
+# can therefore exceed JOB_STORE_MAX_JOBS by the number of unfinished jobs,
+# which job_runner bounds to JOB_WORKERS + JOB_QUEUE_MAX.)
+# The one exception is the sql backend in local mode, where nothing reclaims a
+# row whose process died (leases only exist in queue mode): PENDING/RUNNING rows
+# not updated for JOB_STALE_S are marked FAILED on create, and then expire like
+# any finished job. Queue mode leaves them to the worker's lease recovery.
+#
+# Job dicts returned by the memory backend are the stored objects: treat them
+# as read-only.
+
+JOB_QUEUE_MODE = os.getenv("JOB_QUEUE_MODE", "local").lower()
+JOB_STORE_BACKEND = "sql" if JOB_QUEUE_MODE == "queue" else os.getenv("JOB_STORE_BACKEND", "memory").lower()
+JOB_STORE_MAX_JOBS = int(os.getenv("JOB_STORE_MAX_JOBS", "1000"))
+JOB_TTL_S = float(os.getenv("JOB_TTL_S", "3600"))
+JOB_STALE_S = float(os.getenv("JOB_STALE_S", "3600"))
+
+JOB_LIST_MAX = 200
+TERMINAL_STATUSES = ("SUCCEEDED", "FAILED")
+
+JOBS_DDL = [
+    """
+    CREATE TABLE IF NOT EXISTS agent_jobs (
+      job_id text PRIMARY KEY,
+      status text NOT NULL,
+      created_at bigint NOT NULL,
+      updated_at bigint NOT NULL,
+      payload text,
+      result text,
+      error text,
+      lease_owner text,
+      lease_expires_at bigint,
+      attempts int NOT NULL DEFAULT 0
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS agent_jobs_created_at_idx ON agent_jobs (created_at)",
+    "CREATE INDEX IF NOT EXISTS agent_jobs_claim_idx ON agent_jobs (status, created_at)",
+    "CREATE INDEX IF NOT EXISTS agent_jobs_expiry_idx ON agent_jobs (status, updated_at)",
+]
+# Queue columns missing from tables created before the worker queue existed.
+JOBS_LEASE_COLUMNS = {
+    "lease_owner": "text",
+    "lease_expires_at": "bigint",
+    "attempts": "int NOT NULL DEFAULT 0",
+}
 
 
 def new_job_id() -> str:
     return uuid.uuid4().hex
 
 
-def create_job(payload: Dict[str, Any]) -> Dict[str, Any]:
-    """
-    payload: { "type": "...", "input": {...} }
-    """
-    job_id = new_job_id()
+def _new_job(payload: Dict[str, Any]) -> Dict[str, Any]:
     now = int(time.time())
-    job = {
-        "job_id": job_id,
+    return {
+        "job_id": new_job_id(),
         "status": "PENDING",  # PENDING | RUNNING | SUCCEEDED | FAILED
         "created_at": now,
         "updated_at": now,
@@ -29,41 +88,188 @@ def create_job(payload: Dict[str, Any]) -> Dict[str, Any]:
         "result": None,
         "error": None,
     }
-    with _LOCK:
-        _JOBS[job_id] = job
-    return job
+
+
+class MemoryJobStore:
+    def __init__(self, max_jobs: int = JOB_STORE_MAX_JOBS, ttl_s: float = JOB_TTL_S):
+        self.max_jobs = max(1, max_jobs)
+        self.ttl_s = ttl_s
+        self._lock = threading.Lock()
+        self._jobs: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self.evicted = 0
+
+    def _evict(self) -> None:
+        # Oldest first, skipping unfinished jobs: stop at the first finished job
+        # that is neither expired nor needed to get back under capacity.
+        cutoff = time.time() - self.ttl_s if self.ttl_s > 0 else None
+        excess = len(self._jobs) - self.max_jobs
+        victims = []
+        for job_id, job in self._jobs.items():
+            if job["status"] not in TERMINAL_STATUSES:
+                continue
+            if len(victims) < excess or (cutoff is not None and job["updated_at"] < cutoff):
+                victims.append(job_id)
+            else:
+                break
+        for job_id in victims:
+            del self._jobs[job_id]
+        self.evicted += len(victims)
+
+    def create(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        job = _new_job(payload)
+        with self._lock:
+            self._jobs[job["job_id"]] = job
+            self._evict()
+        return job
+
+    def update(self, job_id: str, **fields: Any) -> None:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is not None:
+                job.update(fields, updated_at=int(time.time()))
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def recent(self, limit: int) -> List[Dict[str, Any]]:
+        out = []
+        with self._lock:
+            for job in reversed(self._jobs.values()):
+                if len(out) >= limit:
+                    break
+                out.append(job)
+        return out
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"backend": "memory", "jobs": len(self._jobs), "max_jobs": self.max_jobs, "evicted": self.evicted}
+
+
+class SqlJobStore:
+    def __init__(self, ttl_s: float = JOB_TTL_S, stale_s: Optional[float] = None):
+        self.ttl_s = ttl_s
+        # 0 disables; queue mode never fails unfinished rows (leases recover them).
+        self.stale_s = stale_s if stale_s is not None else (0 if JOB_QUEUE_MODE == "queue" else JOB_STALE_S)
+        self._ready = False
+        self._lock = threading.Lock()
+
+    def ensure(self, conn) -> None:
+        if self._ready:
+            return
+        with self._lock:
+            if not self._ready:
+                conn.execute(text(JOBS_DDL[0]))
+                existing = {c["name"] for c in inspect(conn).get_columns("agent_jobs")}
+                for name, ddl in JOBS_LEASE_COLUMNS.items():
+                    if name not in existing:
+                        conn.execute(text(f"ALTER TABLE agent_jobs ADD COLUMN {name} {ddl}"))
+                for ddl in JOBS_DDL[1:]:
+                    conn.execute(text(ddl))
+                self._ready = True
+
+    @staticmethod
+    def _row_to_job(row: Any) -> Dict[str, Any]:
+        job = dict(row)
+        for key in ("payload", "result"):
+            if job.get(key) is not None:
+                job[key] = json.loads(job[key])
+        return job
+
+    def create(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        job = _new_job(payload)
+        with get_engine().begin() as conn:
+            self.ensure(conn)
+            if self.stale_s > 0:
+                conn.execute(
+                    text(
+                        """
+                        UPDATE agent_jobs SET status = 'FAILED', error = :error, updated_at = :now
+                        WHERE status IN ('PENDING', 'RUNNING') AND updated_at < :cutoff
+                        """
+                    ),
+                    {
+                        "error": "abandoned: not updated for %ds" % self.stale_s,
+                        "now": job["created_at"],
+                        "cutoff": int(time.time() - self.stale_s),
+                    },
+                )
+            if self.ttl_s > 0:
+                conn.execute(
+                    text(
+                        "DELETE FROM agent_jobs WHERE status IN ('SUCCEEDED', 'FAILED') AND updated_at < :cutoff"
+                    ),
+                    {"cutoff": int(time.time() - self.ttl_s)},
+                )
+            conn.execute(
+                text(
+                    """
+                    INSERT INTO agent_jobs (job_id, status, created_at, updated_at, payload)
+                    VALUES (:job_id, :status, :created_at, :updated_at, :payload)
+                    """
+                ),
+                {**job, "payload": dumps_str(payload)},
+            )
+        return job
+
+    def update(self, job_id: str, **fields: Any) -> None:
+        params = dict(fields, job_id=job_id, updated_at=int(time.time()))
+        if "result" in params:
+            params["result"] = dumps_str(params["result"])
+        sets = ", ".join(f"{k} = :{k}" for k in params if k != "job_id")
+        with get_engine().begin() as conn:
+            self.ensure(conn)
+            conn.execute(text(f"UPDATE agent_jobs SET {sets} WHERE job_id = :job_id"), params)
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with get_engine().begin() as conn:
+            self.ensure(conn)
+            row = conn.execute(
+                text("SELECT * FROM agent_jobs WHERE job_id = :job_id"), {"job_id": job_id}
+            ).mappings().first()
+        return self._row_to_job(row) if row is not None else None
+
+    def recent(self, limit: int) -> List[Dict[str, Any]]:
+        with get_engine().begin() as conn:
+            self.ensure(conn)
+            rows = conn.execute(
+                text("SELECT * FROM agent_jobs ORDER BY created_at DESC LIMIT :limit"), {"limit": limit}
+            ).mappings().all()
+        return [self._row_to_job(r) for r in rows]
+
+    def stats(self) -> Dict[str, Any]:
+        return {"backend": "sql", "ttl_s": self.ttl_s, "stale_s": self.stale_s}
+
+
+_STORE = SqlJobStore() if JOB_STORE_BACKEND == "sql" else MemoryJobStore()
+
+
+def create_job(payload: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    payload: { "type": "...", "input": {...} }
+    """
+    return _STORE.create(payload)
 
 
 def set_job_running(job_id: str) -> None:
-    with _LOCK:
-        if job_id in _JOBS:
-            _JOBS[job_id]["status"] = "RUNNING"
-            _JOBS[job_id]["updated_at"] = int(time.time())
+    _STORE.update(job_id, status="RUNNING")
 
 
 def set_job_result(job_id: str, result: Any) -> None:
-    with _LOCK:
-        if job_id in _JOBS:
-            _JOBS[job_id]["status"] = "SUCCEEDED"
-            _JOBS[job_id]["result"] = result
-            _JOBS[job_id]["updated_at"] = int(time.time())
+    _STORE.update(job_id, status="SUCCEEDED", result=result)
 
 
 def set_job_error(job_id: str, error: str) -> None:
-    with _LOCK:
-        if job_id in _JOBS:
-            _JOBS[job_id]["status"] = "FAILED"
-            _JOBS[job_id]["error"] = error
-            _JOBS[job_id]["updated_at"] = int(time.time())
+    _STORE.update(job_id, status="FAILED", error=error)
 
 
 def get_job(job_id: str) -> Optional[Dict[str, Any]]:
-    with _LOCK:
-        return _JOBS.get(job_id)
+    return _STORE.get(job_id)
 
 
 def list_jobs(limit: int = 20) -> Dict[str, Any]:
-    with _LOCK:
-        jobs = list(_JOBS.values())
-    jobs.sort(key=lambda x: x.get("created_at", 0), reverse=True)
-    return {"data": jobs[: max(1, min(limit, 200))]}
+    return {"data": _STORE.recent(max(1, min(limit, JOB_LIST_MAX)))}
+
+
+def job_store_stats() -> Dict[str, Any]:
+    return _STORE.stats()
@@ -0,0 +1,101 @@
+from __future__ import annotations
+
+import functools
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, Hashable, Tuple
+
+# -----------------------------
+# KPI read cache
+# -----------------------------
+# kpi_monthly only changes through upsert_kpi and the seed routers, so reads are
+# cached in-process until the data version is bumped by a writer.
+#
+# - bump_data_version() is called after every committed write
+# - an entry is served only while its version == the current version
+# - KPI_CACHE_TTL_S bounds staleness for writes made by *other* worker processes
+#   (a bump is process-local); 0 disables the TTL check
+# - KPI_CACHE_ENABLED=0 turns the cache off
+#
+# Cached rows are shared between callers: treat them as read-only.
+
+KPI_CACHE_ENABLED = os.getenv("KPI_CACHE_ENABLED", "1") != "0"
+KPI_CACHE_TTL_S = float(os.getenv("KPI_CACHE_TTL_S", "60"))
+KPI_CACHE_MAX_ENTRIES = int(os.getenv("KPI_CACHE_MAX_ENTRIES", "256"))
+
+_LOCK = threading.Lock()
+_VERSION = 0
+_ENTRIES: Dict[Hashable, Tuple[int, float, Any]] = {}
+_STATS: Dict[str, int] = {"hits": 0, "misses": 0, "bumps": 0}
+
+
+def data_version() -> int:
+    """Current KPI data version (monotonic within this process)."""
+    return _VERSION
+
+
+def bump_data_version() -> int:
+    """Invalidate every cached KPI read. Call after a committed write."""
+    global _VERSION
+    with _LOCK:
+        _VERSION += 1
+        _STATS["bumps"] += 1
+        _ENTRIES.clear()
+        return _VERSION
+
+
+def cached_read(key: Hashable, load: Callable[[], Any]) -> Any:
+    """Return the cached value for `key` at the current data version, loading it on miss."""
+    if not KPI_CACHE_ENABLED:
+        return load()
+
+    now = time.monotonic()
+    with _LOCK:
+        version = _VERSION
+        entry = _ENTRIES.get(key)
+        if entry is not None:
+            entry_version, stored_at, value = entry
+            fresh = KPI_CACHE_TTL_S <= 0 or now - stored_at < KPI_CACHE_TTL_S
+            if entry_version == version and fresh:
+                _STATS["hits"] += 1
+                return value
+        _STATS["misses"] += 1
+
+    value = load()
+
+    with _LOCK:
+        # A write that landed while we were loading bumped the version:
+        # don't publish a result that may predate it.
+        if version == _VERSION:
+            if len(_ENTRIES) >= KPI_CACHE_MAX_ENTRIES:
+                _ENTRIES.pop(next(iter(_ENTRIES)))
+            _ENTRIES[key] = (version, time.monotonic(), value)
+    return value
+
+
+def kpi_cached(fn: Callable[..., Any]) -> Callable[..., Any]:
+    """Decorator: cache a kpi_monthly reader by (function name, args)."""
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        key = (fn.__qualname__, args, tuple(sorted(kwargs.items())))
+        return cached_read(key, lambda: fn(*args, **kwargs))
+
+    return wrapper
+
+
+def kpi_cache_stats() -> Dict[str, Any]:
+    with _LOCK:
+        out: Dict[str, Any] = dict(_STATS)
+        out.update(
+            {
+                "enabled": KPI_CACHE_ENABLED,
+                "data_version": _VERSION,
+                "size": len(_ENTRIES),
+                "ttl_s": KPI_CACHE_TTL_S,
+            }
+        )
+    lookups = out["hits"] + out["misses"]
+    out["hit_ratio"] = round(out["hits"] / lookups, 4) if lookups else 0.0
+    return out
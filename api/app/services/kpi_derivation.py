@@ -0,0 +1,171 @@
+from __future__ import annotations
+
+import os
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from sqlalchemy import text
+
+from api.app.services.kpi_cache import bump_data_version
+from api.db.engines import get_engine
+
+# -----------------------------
+# kpi_monthly <- demo_sales_daily
+# -----------------------------
+# Keeps the legacy monthly table in step with the daily table the agent reads.
+# Only months containing daily rows with updated_at past the watermark are
+# recomputed (revenue/orders/customers summed, aov = revenue / orders), so the
+# cost follows the amount of new data, not the table size.
+#
+# - loaded=(start, end): the date range the caller just wrote. The first run
+#   (no watermark yet) derives only these months and starts the watermark at
+#   the database clock; it never scans the whole table. A first run without
+#   `loaded` only initializes the watermark.
+# - replaced=(start, end): the date range a truncating reload deleted (see
+#   load_demo_sales). Months in it that no longer have daily rows are removed
+#   from kpi_monthly, since the watermark only sees rows that still exist.
+#
+# KPI_DERIVE_OVERLAP_S: rows are re-scanned this far behind the watermark, so a
+# write whose transaction committed after a later one still gets picked up
+# (updated_at is the transaction start time). Recomputing a month is idempotent.
+
+KPI_DERIVE_OVERLAP_S = float(os.getenv("KPI_DERIVE_OVERLAP_S", "300"))
+WATERMARK_SOURCE = "demo_sales_daily"
+
+WATERMARK_DDL = """
+CREATE TABLE IF NOT EXISTS kpi_derivation_watermark (
+  source text PRIMARY KEY,
+  watermark timestamptz NOT NULL,
+  derived_at timestamptz NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+"""
+
+
+def _month_expr(dialect: str) -> str:
+    if dialect == "sqlite":
+        return "strftime('%Y-%m-01', d)"
+    return "date_trunc('month', d)::date"
+
+
+def _as_datetime(value: Any) -> datetime:
+    # SQLite returns CURRENT_TIMESTAMP columns as text.
+    return value if isinstance(value, datetime) else datetime.fromisoformat(str(value))
+
+
+def _as_date(value: Any) -> date:
+    return value if isinstance(value, date) and not isinstance(value, datetime) else date.fromisoformat(str(value)[:10])
+
+
+def _next_month(m: date) -> date:
+    return date(m.year + m.month // 12, m.month % 12 + 1, 1)
+
+
+def _months_between(start: date, end: date) -> List[date]:
+    months, m = [], date(start.year, start.month, 1)
+    while m <= end:
+        months.append(m)
+        m = _next_month(m)
+    return months
+
+
+def derive_kpi_monthly(
+    loaded: Optional[Tuple[date, date]] = None,
+    replaced: Optional[Tuple[date, date]] = None,
+) -> Dict[str, Any]:
+    """
+    Recompute the kpi_monthly rows for months whose daily data changed since the
+    last run, then advance the watermark. Returns the months touched.
+    """
+    engine = get_engine()
+    dialect = engine.dialect.name
+    month_expr = _month_expr(dialect)
+
+    with engine.begin() as conn:
+        conn.execute(text(WATERMARK_DDL))
+
+        row = conn.execute(
+            text("SELECT watermark FROM kpi_derivation_watermark WHERE source = :s"),
+            {"s": WATERMARK_SOURCE},
+        ).first()
+        previous: Optional[datetime] = _as_datetime(row[0]) if row else None
+
+        if previous is None:
+            # Bootstrap: start the watermark now and derive only what the caller loaded.
+            changed = [(None, conn.execute(text("SELECT CURRENT_TIMESTAMP")).scalar())]
+            months_set: Set[date] = set(_months_between(*loaded)) if loaded else set()
+        else:
+            since = previous - timedelta(seconds=KPI_DERIVE_OVERLAP_S)
+            changed = conn.execute(
+                text(
+                    f"""
+                    SELECT {month_expr} AS month, MAX(updated_at)
+                    FROM demo_sales_daily
+                    WHERE updated_at > :since
+                    GROUP BY 1
+                    """
+                ),
+                {"since": since},
+            ).all()
+            months_set = {_as_date(m) for m, _ in changed}
+
+        removed: List[date] = []
+        if replaced:
+            for m in _months_between(*replaced):
+                if m in months_set:
+                    continue
+                has_rows = conn.execute(
+                    text("SELECT 1 FROM demo_sales_daily WHERE d >= :m_start AND d < :m_end LIMIT 1"),
+                    {"m_start": m.isoformat(), "m_end": _next_month(m).isoformat()},
+                ).first()
+                if has_rows is None:
+                    conn.execute(text("DELETE FROM kpi_monthly WHERE month = :m"), {"m": m.isoformat()})
+                    removed.append(m)
+                else:
+                    months_set.add(m)
+
+        months: List[date] = sorted(months_set)
+        for m in months:
+            conn.execute(
+                text(
+                    f"""
+                    INSERT INTO kpi_monthly (month, revenue, orders, customers, aov)
+                    SELECT {month_expr}, SUM(revenue), SUM(orders), SUM(customers),
+                           SUM(revenue) / NULLIF(SUM(orders), 0)
+                    FROM demo_sales_daily
+                    WHERE d >= :m_start AND d < :m_end
+                    GROUP BY 1
+                    ON CONFLICT (month) DO UPDATE SET
+                        revenue = EXCLUDED.revenue,
+                        orders = EXCLUDED.orders,
+                        customers = EXCLUDED.customers,
+                        aov = EXCLUDED.aov
+                    """
+                ),
+                {"m_start": m.isoformat(), "m_end": _next_month(m).isoformat()},
+            )
+
+        seen = [_as_datetime(ts) for _, ts in changed]
+        watermark = max(seen + ([previous] if previous is not None else []), default=None)
+        if watermark is not None:
+            conn.execute(
+                text(
+                    """
+                    INSERT INTO kpi_derivation_watermark (source, watermark, derived_at)
+                    VALUES (:s, :w, CURRENT_TIMESTAMP)
+                    ON CONFLICT (source) DO UPDATE SET
+                        watermark = EXCLUDED.watermark,
+                        derived_at = EXCLUDED.derived_at
+                    """
+                ),
+                {"s": WATERMARK_SOURCE, "w": watermark},
+            )
+
+    if months or removed:
+        bump_data_version()
+
+    return {
+        "months_recomputed": [m.isoformat() for m in months],
+        "months_removed": [m.isoformat() for m in removed],
+        "watermark": watermark.isoformat() if watermark is not None else None,
+        "previous_watermark": previous.isoformat() if previous is not None else None,
+    }
@@ -1,60 +1,107 @@
 from datetime import date
-from typing import Optional
-from psycopg2.extras import RealDictCursor
-from ..db import get_conn
+from typing import Any, Dict, Iterable, List, Optional
+from psycopg2.extras import RealDictCursor, execute_values
+from ..db import db_backend, get_conn
+from .kpi_cache import bump_data_version, kpi_cached
 
+@kpi_cached
 def fetch_kpi(from_: Optional[date] = None, to: Optional[date] = None):
     conn = get_conn(dict_cursor=True)
-    cur = conn.cursor()
+    try:
+        cur = conn.cursor()
 
-    if from_ and to:
-        cur.execute("""
-            SELECT month, revenue, orders, customers, aov
-            FROM kpi_monthly
-            WHERE month BETWEEN %s AND %s
-            ORDER BY month;
-        """, (from_, to))
-    elif from_:
-        cur.execute("""
-            SELECT month, revenue, orders, customers, aov
-            FROM kpi_monthly
-            WHERE month >= %s
-            ORDER BY month;
-        """, (from_,))
-    elif to:
-        cur.execute("""
-            SELECT month, revenue, orders, customers, aov
-            FROM kpi_monthly
-            WHERE month <= %s
-            ORDER BY month;
-        """, (to,))
-    else:
-        cur.execute("""
-            SELECT month, revenue, orders, customers, aov
-            FROM kpi_monthly
-            ORDER BY month;
-        """)
+        if from_ and to:
+            cur.execute("""
+                SELECT month, revenue, orders, customers, aov
+                FROM kpi_monthly
+                WHERE month BETWEEN %s AND %s
+                ORDER BY month;
+            """, (from_, to))
+        elif from_:
+            cur.execute("""
+                SELECT month, revenue, orders, customers, aov
+                FROM kpi_monthly
+                WHERE month >= %s
+                ORDER BY month;
+            """, (from_,))
+        elif to:
+            cur.execute("""
+                SELECT month, revenue, orders, customers, aov
+                FROM kpi_monthly
+                WHERE month <= %s
+                ORDER BY month;
+            """, (to,))
+        else:
+            cur.execute("""
+                SELECT month, revenue, orders, customers, aov
+                FROM kpi_monthly
+                ORDER BY month;
+            """)
 
-    rows = cur.fetchall()
-    cur.close()
-    conn.close()
+        rows = cur.fetchall()
+        cur.close()
+    finally:
+        conn.close()
     return rows
 
 def upsert_kpi(month: date, revenue: float, orders: int, customers: int, aov: float):
     conn = get_conn(dict_cursor=False)
-    cur = conn.cursor()
+    try:
+        cur = conn.cursor()
+        cur.execute("""
+            INSERT INTO kpi_monthly (month, revenue, orders, customers, aov)
+            VALUES (%s, %s, %s, %s, %s)
+            ON CONFLICT (month) DO UPDATE SET
+                revenue = EXCLUDED.revenue,
+                orders = EXCLUDED.orders,
+                customers = EXCLUDED.customers,
+                aov = EXCLUDED.aov;
+        """, (month, revenue, orders, customers, aov))
+        conn.commit()
+        cur.close()
+    finally:
+        conn.close()
+    bump_data_version()
+    return {"month": str(month), "revenue": revenue, "orders": orders, "customers": customers, "aov": aov}
 
-    cur.execute("""
-        INSERT INTO kpi_monthly (month, revenue, orders, customers, aov)
-        VALUES (%s, %s, %s, %s, %s)
-        ON CONFLICT (month) DO UPDATE SET
-            revenue = EXCLUDED.revenue,
-            orders = EXCLUDED.orders,
-            customers = EXCLUDED.customers,
-            aov = EXCLUDED.aov;
-    """, (month, revenue, orders, customers, aov))
+def upsert_kpi_bulk(rows: Iterable[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Upsert many months in one transaction (one round trip on Postgres via execute_values).
+    rows: dicts with month, revenue, orders, customers, aov. A month given twice keeps the last row.
+    """
+    by_month: Dict[date, tuple] = {}
+    for r in rows:
+        by_month[r["month"]] = (r["month"], r["revenue"], r["orders"], r["customers"], r["aov"])
+    values: List[tuple] = [by_month[m] for m in sorted(by_month)]
+    if not values:
+        return {"upserted": 0, "months_range": None}
 
-    conn.commit()
-    cur.close()
-    conn.close()
-    return {"month": str(month), "revenue": revenue, "orders": orders, "customers": customers, "aov": aov}
+    conn = get_conn(dict_cursor=False)
+    try:
+        cur = conn.cursor()
+        if db_backend() == "sqlite":
+            cur.executemany("""
+                INSERT INTO kpi_monthly (month, revenue, orders, customers, aov)
+                VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT (month) DO UPDATE SET
+                    revenue = excluded.revenue,
+                    orders = excluded.orders,
+                    customers = excluded.customers,
+                    aov = excluded.aov;
+            """, [(v[0].isoformat(),) + v[1:] for v in values])
+        else:
+            execute_values(cur, """
+                INSERT INTO kpi_monthly (month, revenue, orders, customers, aov)
+                VALUES %s
+                ON CONFLICT (month) DO UPDATE SET
+                    revenue = EXCLUDED.revenue,
+                    orders = EXCLUDED.orders,
+                    customers = EXCLUDED.customers,
+                    aov = EXCLUDED.aov;
+            """, values, page_size=len(values))
+        conn.commit()
+        cur.close()
+    finally:
+        conn.close()
+    bump_data_version()
+    return {"upserted": len(values), "months_range": [str(values[0][0]), str(values[-1][0])]}
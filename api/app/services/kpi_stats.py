@@ -0,0 +1,169 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+import os
+from operator import mul
+from decimal import Decimal
+from collections.abc import Mapping
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+from api.db.columnar import ColumnarResult
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - optional accelerator
+    np = None
+
+HAS_NUMPY = np is not None
+
+# -----------------------------
+# Series statistics kernel
+# -----------------------------
+# One pass over a KPI result collects every numeric column (None skipped), then
+# each column is reduced to the figures the rule-based scoring/narratives use:
+# mean, sample std, CV, OLS slope per step, first/prev/last values, last delta,
+# and mean/std of the trailing `window` points. NumPy does the reductions when
+# installed; otherwise a pure-Python fallback built on sum()/map() (two-pass:
+# deviations from the mean, so large KPI magnitudes don't lose precision).
+#
+# Input is either a row list (List[Mapping]) or a ColumnarResult, whose numeric
+# columns are read straight from their arrays.
+
+DEFAULT_WINDOW = 7
+KPI_STATS_NUMPY_MIN_POINTS = int(os.getenv("KPI_STATS_NUMPY_MIN_POINTS", "300"))
+
+
+@dataclass
+class SeriesStats:
+    metric: str
+    n: int
+    mean: float
+    std: Optional[float]  # sample std (n - 1); None for n < 2
+    cv: Optional[float]  # std / mean; None when mean <= 0 or std is None
+    slope: Optional[float]  # least-squares change per point; None for n < 2
+    first: float
+    prev: Optional[float]
+    last: float
+    last_delta: Optional[float]  # last - prev
+    last_pct: Optional[float]  # last_delta / prev
+    rolling_mean: float  # over the trailing `window` points
+    rolling_std: Optional[float]
+
+
+_FAST_TYPES = frozenset((int, float, Decimal))
+
+
+def _is_number(v: Any) -> bool:
+    return isinstance(v, (int, float, Decimal)) and not isinstance(v, bool)
+
+
+def _collect(rows: Any, metrics: Optional[Iterable[str]]) -> Dict[str, Sequence[float]]:
+    wanted = set(metrics) if metrics is not None else None
+
+    if isinstance(rows, ColumnarResult):
+        out: Dict[str, Sequence[float]] = {}
+        for name in rows.columns:
+            if wanted is not None and name not in wanted:
+                continue
+            kind = rows.column_type(name)
+            if kind in ("int", "float"):
+                out[name] = rows.column(name)
+            elif kind == "object":
+                vals = [float(v) for v in rows.column(name) if _is_number(v)]
+                if vals:
+                    out[name] = vals
+        return out
+
+    if not rows:
+        return {}
+    # One comprehension per column (not a Python loop over every cell).
+    # sqlite3.Row has no get(); its rows all share the first row's columns.
+    if isinstance(rows[0], Mapping):
+        names = wanted if wanted is not None else set().union(*(r.keys() for r in rows))
+        cols = {k: [v for r in rows if (v := r.get(k)) is not None] for k in names}
+    else:
+        names = [k for k in rows[0].keys() if wanted is None or k in wanted]
+        cols = {k: [v for r in rows if (v := r[k]) is not None] for k in names}
+
+    out = {}
+    for k, vals in cols.items():
+        nums = [float(v) for v in vals if type(v) in _FAST_TYPES or _is_number(v)]
+        if nums:
+            out[k] = nums
+    return out
+
+
+def _reduce_numpy(metric: str, values: Sequence[float], window: int) -> SeriesStats:
+    y = np.asarray(values, dtype=np.float64)
+    n = y.size
+    mean = float(y.mean())
+    tail = y[-window:]
+    std = slope = rolling_std = None
+    if n >= 2:
+        std = float(y.std(ddof=1))
+        x = np.arange(n, dtype=np.float64) - (n - 1) / 2.0
+        slope = float(x @ (y - mean) / (x @ x))
+        if tail.size >= 2:
+            rolling_std = float(tail.std(ddof=1))
+    prev = float(y[-2]) if n >= 2 else None
+    return _finish(metric, n, mean, std, slope, float(y[0]), prev, float(y[-1]), float(tail.mean()), rolling_std)
+
+
+def _moments(values: Sequence[float]):
+    """(n, mean, sample std, slope): two passes, each a builtin sum() over a C-level map."""
+    n = len(values)
+    mean = sum(values) / n
+    if n < 2:
+        return n, mean, None, None
+    dev = [v - mean for v in values]
+    var = sum(map(mul, dev, dev)) / (n - 1)
+    sxx = n * (n * n - 1) / 12.0
+    # sum(dev) == 0, so sum(i * dev) is already centred on the mean index.
+    slope = sum(map(mul, range(n), dev)) / sxx
+    return n, mean, var ** 0.5, slope
+
+
+def _reduce_python(metric: str, values: Sequence[float], window: int) -> SeriesStats:
+    n, mean, std, slope = _moments(values)
+    _, rolling_mean, rolling_std, _ = _moments(values[-window:])
+    prev = float(values[-2]) if n >= 2 else None
+    return _finish(metric, n, mean, std, slope, float(values[0]), prev, float(values[-1]), rolling_mean, rolling_std)
+
+
+def _reduce(metric: str, values: Sequence[float], window: int) -> SeriesStats:
+    if HAS_NUMPY and len(values) >= KPI_STATS_NUMPY_MIN_POINTS:
+        return _reduce_numpy(metric, values, window)
+    return _reduce_python(metric, values, window)
+
+
+def _finish(metric, n, mean, std, slope, first, prev, last, rolling_mean, rolling_std) -> SeriesStats:
+    last_delta = last - prev if prev is not None else None
+    return SeriesStats(
+        metric=metric,
+        n=n,
+        mean=mean,
+        std=std,
+        cv=std / mean if std is not None and mean > 0 else None,
+        slope=slope,
+        first=first,
+        prev=prev,
+        last=last,
+        last_delta=last_delta,
+        last_pct=last_delta / prev if last_delta is not None and prev else None,
+        rolling_mean=rolling_mean,
+        rolling_std=rolling_std,
+    )
+
+
+def series_stats(
+    rows: Any,
+    metrics: Optional[Iterable[str]] = None,
+    window: int = DEFAULT_WINDOW,
+) -> Dict[str, SeriesStats]:
+    """
+    {column: SeriesStats} for every numeric column of `rows` (or just `metrics`).
+    Columns with no numeric values are absent from the result.
+    """
+    window = max(1, window)
+    return {name: _reduce(name, values, window) for name, values in _collect(rows, metrics).items() if len(values)}
+
@@ -1,5 +1,6 @@
 from typing import Any, Dict, List
 from api.app.db import get_conn
+from api.app.services.log_sink import submit_log
 
 
 def ensure_analysis_log_table() -> None:
@@ -59,6 +60,11 @@ def insert_analysis_log(row: Dict[str, Any]) -> None:
         conn.close()
 
 
+def enqueue_analysis_log(row: Dict[str, Any]) -> bool:
+    """insert_analysis_log() via the background log sink; False if the row was dropped."""
+    return submit_log("analysis_log", row)
+
+
 def fetch_analysis_history(limit: int = 20) -> List[Dict[str, Any]]:
     conn = get_conn()
     try:
@@ -0,0 +1,191 @@
+from __future__ import annotations
+
+import os
+import queue
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import text
+
+from api.app.utils.log import get_logger
+from api.db.engines import get_engine
+
+# -----------------------------
+# Background audit-log sink
+# -----------------------------
+# agent_query_log / analysis_log rows are queued here instead of being written
+# inline (one connection + one commit per request). A single writer thread
+# drains the queue and inserts each batch as multi-row INSERTs (at most
+# ROWS_PER_STATEMENT[table] rows each, to stay under SQLite's default 999
+# bound-parameter limit) in one transaction per table:
+# - LOG_SINK_BATCH_SIZE: flush once this many rows are pending
+# - LOG_SINK_FLUSH_MS:   ... or once the oldest pending row is this old
+# - LOG_SINK_QUEUE_MAX:  rows allowed to wait; past that submit() drops the row
+#   (counted in `dropped`) rather than blocking the request
+# If a table's batch insert fails, its rows are retried one by one, so only the
+# rows that really fail (counted in `failed`) are lost; other tables in the same
+# batch are unaffected.
+# shutdown_log_sink() writes everything still queued.
+
+LOG_SINK_BATCH_SIZE = int(os.getenv("LOG_SINK_BATCH_SIZE", "200"))
+LOG_SINK_FLUSH_MS = int(os.getenv("LOG_SINK_FLUSH_MS", "500"))
+LOG_SINK_QUEUE_MAX = int(os.getenv("LOG_SINK_QUEUE_MAX", "10000"))
+
+LOG_TABLES: Dict[str, Tuple[str, ...]] = {
+    "agent_query_log": ("question", "mode", "latency_ms", "status", "error"),
+    "analysis_log": ("metric", "range", "style", "sql", "narrative", "risk", "recommendation"),
+}
+
+# Stay under SQLite's default 999 bound-parameter limit.
+ROWS_PER_STATEMENT: Dict[str, int] = {table: 999 // len(cols) for table, cols in LOG_TABLES.items()}
+
+log = get_logger(__name__)
+
+_STOP = object()
+
+
+def _insert_sql(table: str, n: int) -> str:
+    cols = LOG_TABLES[table]
+    values = ", ".join("(" + ", ".join(f":{c}_{i}" for c in cols) + ")" for i in range(n))
+    return f"INSERT INTO {table} ({', '.join(cols)}) VALUES {values}"
+
+
+class LogSink:
+    def __init__(
+        self,
+        batch_size: int = LOG_SINK_BATCH_SIZE,
+        flush_ms: int = LOG_SINK_FLUSH_MS,
+        queue_max: int = LOG_SINK_QUEUE_MAX,
+    ):
+        self.batch_size = max(1, batch_size)
+        self.flush_s = max(1, flush_ms) / 1000.0
+        self.queue_max = max(1, queue_max)
+        self._queue: "queue.Queue[Any]" = queue.Queue(maxsize=self.queue_max)
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._stats: Dict[str, int] = {"submitted": 0, "dropped": 0, "written": 0, "batches": 0, "failed": 0}
+
+    def _bump(self, key: str, n: int = 1) -> None:
+        with self._lock:
+            self._stats[key] += n
+
+    def _ensure_thread(self) -> None:
+        if self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._loop, name="log-sink", daemon=True)
+                self._thread.start()
+
+    def submit(self, table: str, row: Dict[str, Any]) -> bool:
+        """Queue one row for `table`; False (and counted as dropped) if the queue is full."""
+        if table not in LOG_TABLES:
+            raise ValueError(f"unknown log table: {table}")
+        self._ensure_thread()
+        try:
+            self._queue.put_nowait((table, row))
+        except queue.Full:
+            self._bump("dropped")
+            return False
+        self._bump("submitted")
+        return True
+
+    def _loop(self) -> None:
+        while True:
+            item = self._queue.get()
+            if item is _STOP:
+                return
+            batch = [item]
+            deadline = time.monotonic() + self.flush_s
+            stop = False
+            while len(batch) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stop = True
+                    break
+                batch.append(item)
+            self._write(batch)
+            if stop:
+                return
+
+    @staticmethod
+    def _insert(table: str, rows: List[Dict[str, Any]]) -> None:
+        cols = LOG_TABLES[table]
+        step = ROWS_PER_STATEMENT[table]
+        with get_engine().begin() as conn:
+            for start in range(0, len(rows), step):
+                chunk = rows[start:start + step]
+                params = {f"{c}_{i}": row.get(c) for i, row in enumerate(chunk) for c in cols}
+                conn.execute(text(_insert_sql(table, len(chunk))), params)
+
+    def _write_table(self, table: str, rows: List[Dict[str, Any]]) -> Tuple[int, int]:
+        """Insert rows into table; returns (written, failed)."""
+        try:
+            self._insert(table, rows)
+            return len(rows), 0
+        except Exception as e:
+            if len(rows) == 1:
+                log.warning("log sink row failed", extra={"table": table, "error": str(e)[:200]})
+                return 0, 1
+        written = failed = 0
+        for row in rows:
+            w, f = self._write_table(table, [row])
+            written += w
+            failed += f
+        return written, failed
+
+    def _write(self, batch: List[Tuple[str, Dict[str, Any]]]) -> None:
+        by_table: Dict[str, List[Dict[str, Any]]] = {}
+        for table, row in batch:
+            by_table.setdefault(table, []).append(row)
+        written = failed = 0
+        for table, rows in by_table.items():
+            w, f = self._write_table(table, rows)
+            written += w
+            failed += f
+        with self._lock:
+            self._stats["written"] += written
+            self._stats["failed"] += failed
+            self._stats["batches"] += 1
+
+    def close(self, timeout: Optional[float] = 10.0) -> None:
+        """Write every queued row, then stop the writer (the next submit() restarts it)."""
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is None:
+            return
+        self._queue.put(_STOP)  # blocking: waits for room on a full queue
+        thread.join(timeout)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self._stats)
+        return {
+            **stats,
+            "queued": self._queue.qsize(),
+            "queue_max": self.queue_max,
+            "batch_size": self.batch_size,
+            "flush_ms": int(self.flush_s * 1000),
+        }
+
+
+_SINK = LogSink()
+
+
+def submit_log(table: str, row: Dict[str, Any]) -> bool:
+    return _SINK.submit(table, row)
+
+
+def log_sink_stats() -> Dict[str, Any]:
+    return _SINK.stats()
+
+
+def shutdown_log_sink() -> None:
+    _SINK.close()
@@ -1,18 +1,22 @@
 from psycopg2.extras import RealDictCursor
 from ..db import get_conn
+from .kpi_cache import kpi_cached
 
+@kpi_cached
 def fetch_latest_two_months():
     conn = get_conn(dict_cursor=True)
-    cur = conn.cursor()
-    cur.execute("""
-        SELECT month, revenue, orders, customers, aov
-        FROM kpi_monthly
-        ORDER BY month DESC
-        LIMIT 2;
-    """)
-    rows = cur.fetchall()
-    cur.close()
-    conn.close()
+    try:
+        cur = conn.cursor()
+        cur.execute("""
+            SELECT month, revenue, orders, customers, aov
+            FROM kpi_monthly
+            ORDER BY month DESC
+            LIMIT 2;
+        """)
+        rows = cur.fetchall()
+        cur.close()
+    finally:
+        conn.close()
     return list(reversed(rows))
 
 def build_monthly_report(base, target):
@@ -0,0 +1,174 @@
+from __future__ import annotations
+
+from datetime import date, timedelta
+from typing import Any, Dict, Optional, Tuple
+
+from sqlalchemy import text
+
+from api.app.services.kpi_cache import cached_read
+from api.app.sql.builder import ROLLUP_DIMENSIONS, ROLLUP_TABLES, align_period_start, align_period_up
+from api.db.engines import get_engine
+
+# -----------------------------
+# demo_sales_daily rollups
+# -----------------------------
+# demo_sales_weekly / demo_sales_monthly hold SUM(revenue, orders, customers) per
+# (period, *ROLLUP_DIMENSIONS). rollup_state records, per grain, the day range
+# [covered_start, covered_end) the rollup reflects; build_kpi_sql only reads whole
+# periods inside that range and takes the rest from demo_sales_daily.
+#
+# Refresh after new days land: refresh_rollups(start, end) recomputes only the
+# periods touching [start, end]. Postgres only (date_trunc / ON CONFLICT on SQL side).
+
+ROLLUP_STATE_DDL = """
+CREATE TABLE IF NOT EXISTS rollup_state (
+  grain text PRIMARY KEY,
+  covered_start date NOT NULL,
+  covered_end date NOT NULL,
+  refreshed_at timestamptz NOT NULL DEFAULT now()
+);
+"""
+
+
+def _rollup_ddl(grain: str) -> str:
+    dims = "".join(f"  {d} text NOT NULL,\n" for d in ROLLUP_DIMENSIONS)
+    pk = ", ".join(["period", *ROLLUP_DIMENSIONS])
+    return f"""
+CREATE TABLE IF NOT EXISTS {ROLLUP_TABLES[grain]} (
+  period date NOT NULL,
+{dims}  revenue numeric(16,2) NOT NULL,
+  orders bigint NOT NULL,
+  customers bigint NOT NULL,
+  PRIMARY KEY ({pk})
+);
+"""
+
+
+def ensure_rollup_tables(conn) -> None:
+    conn.execute(text(ROLLUP_STATE_DDL))
+    for grain, table in ROLLUP_TABLES.items():
+        cols = set(
+            conn.execute(
+                text(
+                    "SELECT column_name FROM information_schema.columns "
+                    "WHERE table_schema = current_schema() AND table_name = :t"
+                ),
+                {"t": table},
+            ).scalars()
+        )
+        if cols and not set(ROLLUP_DIMENSIONS) <= cols:
+            # Built for fewer dimensions: rollups are derived data, rebuild them.
+            conn.execute(text(f"DROP TABLE {table}"))
+            conn.execute(text("DELETE FROM rollup_state WHERE grain = :g"), {"g": grain})
+        conn.execute(text(_rollup_ddl(grain)))
+
+
+def _refresh_grain(conn, grain: str, start: date, end: date) -> int:
+    """Recompute every `grain` period touching [start, end) from demo_sales_daily."""
+    table = ROLLUP_TABLES[grain]
+    p_start = align_period_start(grain, start)
+    p_end = align_period_up(grain, end)
+    dims = "".join(f", {d}" for d in ROLLUP_DIMENSIONS)
+
+    conn.execute(
+        text(f"DELETE FROM {table} WHERE period >= :p_start AND period < :p_end"),
+        {"p_start": p_start, "p_end": p_end},
+    )
+    result = conn.execute(
+        text(
+            f"""
+            INSERT INTO {table} (period{dims}, revenue, orders, customers)
+            SELECT date_trunc('{grain}', d)::date AS period{dims},
+                   SUM(revenue), SUM(orders), SUM(customers)
+            FROM demo_sales_daily
+            WHERE d >= :p_start AND d < :p_end
+            GROUP BY 1{dims}
+            """
+        ),
+        {"p_start": p_start, "p_end": p_end},
+    )
+
+    # Extend coverage; the refreshed range is whole periods, so it is exact.
+    conn.execute(
+        text(
+            """
+            INSERT INTO rollup_state (grain, covered_start, covered_end, refreshed_at)
+            VALUES (:grain, :p_start, :p_end, now())
+            ON CONFLICT (grain) DO UPDATE SET
+                covered_start = LEAST(rollup_state.covered_start, EXCLUDED.covered_start),
+                covered_end = GREATEST(rollup_state.covered_end, EXCLUDED.covered_end),
+                refreshed_at = now()
+            """
+        ),
+        {"grain": grain, "p_start": p_start, "p_end": p_end},
+    )
+    return result.rowcount or 0
+
+
+def refresh_rollups(
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    full: bool = False,
+) -> Dict[str, Any]:
+    """
+    Incrementally refresh weekly/monthly rollups for days [start, end] (inclusive).
+
+    - start/end default to the daily table's min/max day
+    - full=True rebuilds from scratch (use after demo_sales_daily was truncated)
+    - a range that does not touch the current coverage is widened to close the gap,
+      so coverage never claims days that were not aggregated
+    """
+    engine = get_engine()
+    if engine.dialect.name != "postgresql":
+        return {"status": "skipped", "reason": "rollups require Postgres"}
+
+    with engine.begin() as conn:
+        ensure_rollup_tables(conn)
+
+        if full:
+            for table in ROLLUP_TABLES.values():
+                conn.execute(text(f"DELETE FROM {table}"))
+            conn.execute(text("DELETE FROM rollup_state"))
+
+        bounds = conn.execute(text("SELECT MIN(d), MAX(d) FROM demo_sales_daily")).first()
+        if bounds is None or bounds[0] is None:
+            return {"status": "empty", "refreshed": {}}
+
+        lo = start or bounds[0]
+        hi = (end or bounds[1]) + timedelta(days=1)
+
+        refreshed: Dict[str, Any] = {}
+        for grain in ROLLUP_TABLES:
+            g_lo, g_hi = lo, hi
+            state = conn.execute(
+                text("SELECT covered_start, covered_end FROM rollup_state WHERE grain = :g"),
+                {"g": grain},
+            ).first()
+            if state is not None:
+                covered_start, covered_end = state
+                if g_lo > covered_end:
+                    g_lo = covered_end
+                if g_hi < covered_start:
+                    g_hi = covered_start
+            rows = _refresh_grain(conn, grain, g_lo, g_hi)
+            refreshed[grain] = {"rows": rows, "range": [str(g_lo), str(g_hi - timedelta(days=1))]}
+
+    return {"status": "ok", "refreshed": refreshed}
+
+
+def _load_coverage() -> Dict[str, Tuple[date, date]]:
+    engine = get_engine()
+    if engine.dialect.name != "postgresql":
+        return {}
+    try:
+        with engine.connect() as conn:
+            rows = conn.execute(text("SELECT grain, covered_start, covered_end FROM rollup_state")).all()
+    except Exception:
+        # No rollups yet (table missing): everything is served from demo_sales_daily.
+        return {}
+    return {grain: (s, e) for grain, s, e in rows if grain in ROLLUP_TABLES}
+
+
+def rollup_coverage() -> Dict[str, Tuple[date, date]]:
+    """{grain: (covered_start, covered_end)} for build_kpi_sql(rollups=...); cached per data version."""
+    return cached_read(("rollup_coverage",), _load_coverage)
@@ -0,0 +1,71 @@
+from __future__ import annotations
+
+import asyncio
+import os
+import threading
+from typing import Any, Awaitable, Callable, Dict, Hashable, Tuple
+
+# -----------------------------
+# Async single-flight
+# -----------------------------
+# Identical concurrent requests (a dashboard refreshing for many users at once)
+# share one computation: the first caller for a key starts it as a task, and
+# callers arriving while it runs await the same task instead of running the
+# LLM pipeline again. Nothing is cached: once the task finishes the key is
+# free, and the next request computes afresh.
+#
+# - The shared task is shielded: a caller that disconnects does not cancel it
+#   for the others.
+# - Errors are shared too: every waiter sees the leader's exception.
+# - The result object is shared between callers: treat it as read-only.
+# - SINGLE_FLIGHT_ENABLED=0 turns coalescing off.
+# Keys are per event loop (one per worker process under uvicorn).
+
+SINGLE_FLIGHT_ENABLED = os.getenv("SINGLE_FLIGHT_ENABLED", "1") != "0"
+
+
+class AsyncSingleFlight:
+    def __init__(self):
+        self._inflight: Dict[Tuple[asyncio.AbstractEventLoop, Hashable], "asyncio.Task[Any]"] = {}
+        self._lock = threading.Lock()
+        self._stats: Dict[str, int] = {"leaders": 0, "coalesced": 0}
+
+    def _done(self, key: Tuple[asyncio.AbstractEventLoop, Hashable], task: "asyncio.Task[Any]") -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        if not task.cancelled():
+            task.exception()  # retrieved here so an error nobody awaited is not reported as lost
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """Return await fn(), sharing one in-flight call among concurrent callers with the same key."""
+        loop = asyncio.get_running_loop()
+        k = (loop, key)
+        task = self._inflight.get(k)
+        if task is None:
+            task = loop.create_task(fn())
+            self._inflight[k] = task
+            task.add_done_callback(lambda t: self._done(k, t))
+            counter = "leaders"
+        else:
+            counter = "coalesced"
+        with self._lock:
+            self._stats[counter] += 1
+        return await asyncio.shield(task)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self._stats)
+        return {**stats, "inflight": len(self._inflight), "enabled": SINGLE_FLIGHT_ENABLED}
+
+
+_FLIGHT = AsyncSingleFlight()
+
+
+async def single_flight(key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+    if not SINGLE_FLIGHT_ENABLED:
+        return await fn()
+    return await _FLIGHT.do(key, fn)
+
+
+def single_flight_stats() -> Dict[str, Any]:
+    return _FLIGHT.stats()
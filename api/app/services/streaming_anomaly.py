@@ -0,0 +1,266 @@
+from __future__ import annotations
+
+import math
+import os
+import threading
+from dataclasses import dataclass, field
+from datetime import date, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from api.db.runner import run_sql_stream
+
+# -----------------------------
+# Streaming anomaly detection over demo_sales_daily
+# -----------------------------
+# Every (metric, breakdown) series keeps a fixed-size state, updated once per new
+# day and never rebuilt from history:
+# - EWMA mean / variance                   (alpha = STREAMING_ALPHA)
+# - streaming median + mean absolute deviation -> robust z-score
+#   (stochastic median estimate, step scaled by the deviation; approximate, but
+#   not dragged by the spikes it is meant to flag)
+# - per-weekday EWMA mean / variance       -> seasonal z-score
+#
+# A day is scored against the state *before* it is folded in. It is flagged when
+# both |robust z| and |seasonal z| reach the threshold, once the series has
+# STREAMING_WARMUP_DAYS of history (seasonal z needs 2 points for that weekday).
+#
+# Series: total, per country, per (country, category); metrics revenue, orders,
+# customers and aov (revenue / orders). Sellers are summed.
+#
+# Ingestion is incremental by day: the detector remembers the last day it folded
+# in and only reads `d > watermark`. The newest day in the table is held back
+# (it may still be loading; folding a partial day would score it low and never
+# revisit it), so it is folded once a later day appears. The first call
+# bootstraps from the last STREAMING_BOOTSTRAP_DAYS. Corrections to days already
+# ingested are not re-scored; reset_streaming_detector() (done by a demo reseed)
+# starts over. New rows are read before taking the detector lock, so alerts()
+# never waits on the database.
+
+STREAMING_ALPHA = float(os.getenv("STREAMING_ALPHA", "0.1"))
+STREAMING_Z_THRESHOLD = float(os.getenv("STREAMING_Z_THRESHOLD", "3.0"))
+STREAMING_WARMUP_DAYS = int(os.getenv("STREAMING_WARMUP_DAYS", "14"))
+STREAMING_BOOTSTRAP_DAYS = int(os.getenv("STREAMING_BOOTSTRAP_DAYS", "180"))
+STREAMING_MAX_ALERTS = int(os.getenv("STREAMING_MAX_ALERTS", "50"))
+
+STREAMING_METRICS = ("revenue", "orders", "customers", "aov")
+
+# Normal-distribution constant: sigma ~= 1.2533 * mean absolute deviation.
+_MAD_TO_SIGMA = math.sqrt(math.pi / 2)
+
+SeriesKey = Tuple[str, Optional[str], Optional[str]]  # (metric, country, category)
+
+_NEW_DAYS_SQL = """
+SELECT d, country, category,
+       SUM(revenue) AS revenue, SUM(orders) AS orders, SUM(customers) AS customers
+FROM demo_sales_daily
+WHERE d > :since
+GROUP BY d, country, category
+ORDER BY d
+"""
+
+
+@dataclass
+class SeriesState:
+    n: int = 0
+    mean: float = 0.0
+    var: float = 0.0
+    median: float = 0.0
+    mad: float = 0.0
+    weekday_n: List[int] = field(default_factory=lambda: [0] * 7)
+    weekday_mean: List[float] = field(default_factory=lambda: [0.0] * 7)
+    weekday_var: List[float] = field(default_factory=lambda: [0.0] * 7)
+    # Score of the latest folded-in day.
+    last_day: Optional[date] = None
+    last_value: Optional[float] = None
+    last_expected: Optional[float] = None
+    last_robust_z: Optional[float] = None
+    last_seasonal_z: Optional[float] = None
+
+    def update(self, day: date, x: float, alpha: float) -> None:
+        """Score `x` against the current state, then fold it in. O(1)."""
+        wd = day.weekday()
+        robust_z = seasonal_z = None
+        if self.n > 0:
+            sigma = self.mad * _MAD_TO_SIGMA
+            robust_z = (x - self.median) / sigma if sigma > 0 else 0.0
+        if self.weekday_n[wd] >= 2:
+            sd = math.sqrt(self.weekday_var[wd])
+            seasonal_z = (x - self.weekday_mean[wd]) / sd if sd > 0 else 0.0
+
+        self.last_day, self.last_value = day, x
+        self.last_expected = self.weekday_mean[wd] if self.weekday_n[wd] else (self.mean if self.n else None)
+        self.last_robust_z, self.last_seasonal_z = robust_z, seasonal_z
+
+        if self.n == 0:
+            self.mean = self.median = x
+        else:
+            diff = x - self.mean
+            incr = alpha * diff
+            self.mean += incr
+            self.var = (1 - alpha) * (self.var + diff * incr)
+
+            dev = x - self.median
+            self.mad += alpha * (abs(dev) - self.mad)
+            step = alpha * (self.mad if self.mad > 0 else abs(dev))
+            self.median += step if dev > 0 else (-step if dev < 0 else 0.0)
+        self.n += 1
+
+        if self.weekday_n[wd] == 0:
+            self.weekday_mean[wd] = x
+        else:
+            diff = x - self.weekday_mean[wd]
+            incr = alpha * diff
+            self.weekday_mean[wd] += incr
+            self.weekday_var[wd] = (1 - alpha) * (self.weekday_var[wd] + diff * incr)
+        self.weekday_n[wd] += 1
+
+
+def _as_date(value: Any) -> date:
+    # SQLite returns date columns as text.
+    return value if isinstance(value, date) else date.fromisoformat(str(value)[:10])
+
+
+class StreamingAnomalyDetector:
+    def __init__(
+        self,
+        alpha: float = STREAMING_ALPHA,
+        z_threshold: float = STREAMING_Z_THRESHOLD,
+        warmup: int = STREAMING_WARMUP_DAYS,
+    ):
+        self.alpha = alpha
+        self.z_threshold = z_threshold
+        self.warmup = warmup
+        self.series: Dict[SeriesKey, SeriesState] = {}
+        self.watermark: Optional[date] = None
+        self._lock = threading.Lock()
+
+    def _fold_day(self, day: date, rows: List[Dict[str, Any]]) -> None:
+        # Sum the (country, category) rows of one day into every series level.
+        totals: Dict[Tuple[Optional[str], Optional[str]], List[float]] = {}
+        for r in rows:
+            vals = (float(r["revenue"] or 0), float(r["orders"] or 0), float(r["customers"] or 0))
+            for key in ((None, None), (r["country"], None), (r["country"], r["category"])):
+                acc = totals.get(key)
+                if acc is None:
+                    totals[key] = list(vals)
+                else:
+                    acc[0] += vals[0]
+                    acc[1] += vals[1]
+                    acc[2] += vals[2]
+
+        for (country, category), (revenue, orders, customers) in totals.items():
+            values = {
+                "revenue": revenue,
+                "orders": orders,
+                "customers": customers,
+                "aov": revenue / orders if orders else None,
+            }
+            for metric in STREAMING_METRICS:
+                x = values[metric]
+                if x is None:
+                    continue
+                key = (metric, country, category)
+                state = self.series.get(key)
+                if state is None:
+                    state = self.series[key] = SeriesState()
+                state.update(day, x, self.alpha)
+
+    def ingest(self, rows: Iterable[Dict[str, Any]]) -> int:
+        """
+        Fold rows ordered by day (d, country, category, revenue, orders, customers),
+        except the newest day, which may be incomplete. Returns days ingested.
+        """
+        days = 0
+        day: Optional[date] = None
+        pending: List[Dict[str, Any]] = []
+        with self._lock:
+            for r in rows:
+                d = _as_date(r["d"])
+                if self.watermark is not None and d <= self.watermark:
+                    continue
+                if day is not None and d != day:
+                    self._fold_day(day, pending)
+                    self.watermark, days, pending = day, days + 1, []
+                day = d
+                pending.append(r)
+        return days
+
+    def refresh(self) -> int:
+        """Read and fold the days of demo_sales_daily past the watermark."""
+        since = self.watermark
+        if since is None:
+            since = date.today() - timedelta(days=STREAMING_BOOTSTRAP_DAYS)
+        # Read everything first (only days past the watermark), then fold under the
+        # lock. One ingest() over all chunks: a day can straddle a chunk boundary.
+        rows = [r for chunk in run_sql_stream(_NEW_DAYS_SQL, {"since": since.isoformat()}) for r in chunk]
+        return self.ingest(rows)
+
+    def alerts(self, z_threshold: Optional[float] = None) -> List[Dict[str, Any]]:
+        """Flagged series on the latest ingested day, strongest first."""
+        th = self.z_threshold if z_threshold is None else z_threshold
+        out = []
+        with self._lock:
+            for (metric, country, category), s in self.series.items():
+                # n counts the latest day too: require `warmup` days before it.
+                if s.last_day != self.watermark or s.n <= self.warmup:
+                    continue
+                if s.last_robust_z is None or s.last_seasonal_z is None:
+                    continue
+                score = min(abs(s.last_robust_z), abs(s.last_seasonal_z))
+                if score < th:
+                    continue
+                direction = "UP" if s.last_seasonal_z > 0 else "DOWN"
+                out.append(
+                    {
+                        "metric": metric,
+                        "country": country,
+                        "category": category,
+                        "day": s.last_day.isoformat(),
+                        "value": s.last_value,
+                        "expected": s.last_expected,
+                        "robust_z": round(s.last_robust_z, 2),
+                        "seasonal_z": round(s.last_seasonal_z, 2),
+                        "direction": direction,
+                        "severity": "HIGH" if score >= 2 * th else "MEDIUM",
+                    }
+                )
+        out.sort(key=lambda a: min(abs(a["robust_z"]), abs(a["seasonal_z"])), reverse=True)
+        return out
+
+
+_DETECTOR = StreamingAnomalyDetector()
+
+
+def reset_streaming_detector() -> None:
+    """Drop all series state; the next call re-bootstraps (after a reseed/replace)."""
+    global _DETECTOR
+    _DETECTOR = StreamingAnomalyDetector()
+
+
+def streaming_insight(z_threshold: Optional[float] = None) -> Dict[str, Any]:
+    """
+    Fold new days into the detector and report the series flagged on the latest
+    day. Shape mirrors insight_service.detect_anomalies (alerts + risk).
+    """
+    detector = _DETECTOR
+    days = detector.refresh()
+    if detector.watermark is None:
+        return {"status": "insufficient_data", "mode": "streaming", "message": "demo_sales_daily has no complete days yet.", "alerts": []}
+
+    alerts = detector.alerts(z_threshold)
+    risk = "LOW"
+    if any(a["metric"] == "revenue" and a["country"] is None and a["direction"] == "DOWN" for a in alerts):
+        risk = "HIGH"
+    elif len(alerts) >= 2:
+        risk = "MEDIUM"
+
+    return {
+        "status": "ok",
+        "mode": "streaming",
+        "watermark": detector.watermark.isoformat(),
+        "days_ingested": days,
+        "series": len(detector.series),
+        "alerts": alerts[:STREAMING_MAX_ALERTS],
+        "alerts_total": len(alerts),
+        "risk": risk,
+    }
@@ -3,6 +3,14 @@ from typing import Optional, List, Tuple, Dict, Any
 
 ALLOWED_BREAKDOWNS = {"category", "seller_id", "country"}
 
+# Pre-aggregated demo_sales_daily tables (maintained by api.app.services.rollup_service).
+ROLLUP_TABLES = {"week": "demo_sales_weekly", "month": "demo_sales_monthly"}
+# Breakdown columns kept in the rollups; other breakdowns read demo_sales_daily.
+ROLLUP_DIMENSIONS = ["country", "category", "seller_id"]
+# grain -> rollups whose periods nest inside exactly one period of that grain,
+# coarsest first (a month rollup cannot answer weeks and vice versa).
+ROLLUPS_FOR_GRAIN = {"day": [], "week": ["week"], "month": ["month"]}
+
 
 def _parse_yyyy_mm_dd(s: str) -> date:
     return datetime.strptime(s, "%Y-%m-%d").date()
@@ -37,13 +45,67 @@ def resolve_date_range(dr: Dict[str, Any]) -> Tuple[date, date]:
     return today - timedelta(days=30), today
 
 
+def align_period_start(grain: str, d: date) -> date:
+    """Start of the `grain` period containing d (weeks start on Monday, like date_trunc)."""
+    if grain == "week":
+        return d - timedelta(days=d.weekday())
+    if grain == "month":
+        return d.replace(day=1)
+    return d
+
+
+def align_period_up(grain: str, d: date) -> date:
+    """First period boundary >= d."""
+    start = align_period_start(grain, d)
+    if start == d:
+        return d
+    if grain == "week":
+        return start + timedelta(days=7)
+    return date(start.year + start.month // 12, start.month % 12 + 1, 1)
+
+
+def _pick_rollup(
+    grain: str,
+    start: date,
+    end: date,
+    breakdown: Optional[List[str]],
+    rollups: Optional[Dict[str, Tuple[date, date]]],
+) -> Optional[Tuple[str, date, date]]:
+    """
+    Choose the coarsest rollup that can serve [start, end) and return
+    (rollup grain, r_start, r_end): the whole periods inside both the query range
+    and the rollup coverage. None -> scan demo_sales_daily only.
+    """
+    if not rollups:
+        return None
+    if breakdown and not set(breakdown) <= set(ROLLUP_DIMENSIONS):
+        return None
+
+    for rollup in ROLLUPS_FOR_GRAIN.get(grain, []):
+        if rollup not in rollups:
+            continue
+        covered_start, covered_end = rollups[rollup]
+        r_start = align_period_up(rollup, max(start, covered_start))
+        r_end = align_period_start(rollup, min(end, covered_end))
+        if r_start < r_end:
+            return rollup, r_start, r_end
+    return None
+
+
 def build_kpi_sql(
     metric: str,
     grain: str,
     start: date,
     end: date,
     breakdown: Optional[List[str]] = None,
+    rollups: Optional[Dict[str, Tuple[date, date]]] = None,
 ) -> Tuple[str, Dict[str, Any]]:
+    """
+    rollups: {grain: (covered_start, covered_end)} of the available rollup tables
+    (rollup_service.rollup_coverage()). When a rollup covers whole periods of the
+    requested range, those periods are read from it and only the partial edge
+    periods are aggregated from demo_sales_daily.
+    """
     metric_expr = {
         "revenue": "SUM(revenue)",
         "orders": "SUM(orders)",
@@ -67,6 +129,31 @@ def build_kpi_sql(
             select_cols.append(b)
             group_cols.append(b)
 
+    params = {"start": str(start), "end": str(end)}
+
+    picked = _pick_rollup(grain, start, end, breakdown, rollups)
+    if picked is not None:
+        rollup, r_start, r_end = picked
+        dims = "".join(f", {b}" for b in breakdown or [])
+        sql = f"""
+    SELECT
+      period{dims},
+      {metric_expr} AS value
+    FROM (
+      SELECT period{dims}, revenue, orders, customers
+      FROM {ROLLUP_TABLES[rollup]}
+      WHERE period >= :r_start AND period < :r_end
+      UNION ALL
+      SELECT {grain_expr} AS period{dims}, revenue, orders, customers
+      FROM demo_sales_daily
+      WHERE (d >= :start AND d < :r_start) OR (d >= :r_end AND d < :end)
+    ) src
+    GROUP BY period{dims}
+    ORDER BY period{dims};
+    """.strip()
+        params.update({"r_start": str(r_start), "r_end": str(r_end)})
+        return sql, params
+
     sql = f"""
     SELECT
       {", ".join(select_cols)},
@@ -77,5 +164,4 @@ def build_kpi_sql(
     ORDER BY {", ".join(group_cols)};
     """.strip()
 
-    params = {"start": str(start), "end": str(end)}
-    return sql, params
\ No newline at end of file
+    return sql, params
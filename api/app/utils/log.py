@@ -0,0 +1,157 @@
+"""
+Structured, non-blocking logging for the API and the job worker.
+
+- get_logger(__name__) returns a stdlib logger under the "api" hierarchy.
+- Records are handed to a bounded in-memory queue (QueueHandler); a single
+  QueueListener thread formats them as one JSON object per line and writes
+  them to stderr. The request thread never touches the stream: when the queue
+  is full the record is dropped and counted instead of blocking.
+- LOG_LEVEL gates records before they are built (logger.isEnabledFor), and
+  LOG_SAMPLE_RATE keeps that fraction of DEBUG/INFO records; WARNING and above
+  are always kept.
+- Each record carries the request_id bound by new_request_id() in the calling
+  context; extra={...} fields are merged into the JSON object.
+- Tracebacks are formatted on the listener thread, not in the request.
+"""
+from __future__ import annotations
+
+import atexit
+import logging
+import os
+import queue
+import random
+import threading
+from logging.handlers import QueueHandler, QueueListener
+from typing import Any, Dict, Optional
+
+from api.app.utils.request_id import current_request_id
+from api.app.utils.serialization import dumps_str
+
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+LOG_SAMPLE_RATE = float(os.getenv("LOG_SAMPLE_RATE", "1.0"))
+LOG_QUEUE_MAX = int(os.getenv("LOG_QUEUE_MAX", "10000"))
+
+ROOT_LOGGER = "api"
+
+# Attributes every LogRecord has; anything else came from extra={...}.
+_RESERVED = frozenset(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message", "request_id"}
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        out: Dict[str, Any] = {
+            "ts": round(record.created, 3),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+            "request_id": getattr(record, "request_id", None),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RESERVED and not key.startswith("_"):
+                out[key] = value
+        if record.exc_info:
+            out["exc"] = self.formatException(record.exc_info)
+        try:
+            return dumps_str(out)
+        except TypeError:
+            return dumps_str({k: v if isinstance(v, (str, int, float, bool, type(None))) else repr(v) for k, v in out.items()})
+
+
+class _SampleFilter(logging.Filter):
+    def __init__(self, rate: float):
+        super().__init__()
+        self.rate = rate
+        self.sampled_out = 0
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING or self.rate >= 1.0:
+            return True
+        if random.random() < self.rate:
+            return True
+        self.sampled_out += 1
+        return False
+
+
+class DropQueueHandler(QueueHandler):
+    """QueueHandler that never blocks: a full queue drops (and counts) the record."""
+
+    def __init__(self, q: "queue.Queue[logging.LogRecord]"):
+        super().__init__(q)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Cheap on purpose: stamp the caller's request_id (contextvars do not
+        # cross into the listener thread) and leave formatting to the listener.
+        record.request_id = current_request_id()
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class _Listener(QueueListener):
+    def enqueue_sentinel(self) -> None:
+        # Blocking put: on shutdown, wait for room rather than fail on a full queue.
+        self.queue.put(self._sentinel)
+
+
+_LOCK = threading.Lock()
+_HANDLER: Optional[DropQueueHandler] = None
+_SAMPLER: Optional[_SampleFilter] = None
+_LISTENER: Optional[QueueListener] = None
+
+
+def configure_logging() -> None:
+    """Install the queue handler on the "api" logger and start the listener (idempotent)."""
+    global _HANDLER, _SAMPLER, _LISTENER
+    with _LOCK:
+        if _LISTENER is not None:
+            return
+        q: "queue.Queue[logging.LogRecord]" = queue.Queue(maxsize=max(1, LOG_QUEUE_MAX))
+        _HANDLER = DropQueueHandler(q)
+        _SAMPLER = _SampleFilter(LOG_SAMPLE_RATE)
+        _HANDLER.addFilter(_SAMPLER)
+
+        sink = logging.StreamHandler()
+        sink.setFormatter(JsonFormatter())
+
+        root = logging.getLogger(ROOT_LOGGER)
+        root.setLevel(LOG_LEVEL)
+        root.addHandler(_HANDLER)
+        root.propagate = False
+
+        _LISTENER = _Listener(q, sink)
+        _LISTENER.start()
+        atexit.register(shutdown_logging)
+
+
+def shutdown_logging() -> None:
+    """Stop the listener after it has written every queued record."""
+    global _LISTENER
+    with _LOCK:
+        listener, _LISTENER = _LISTENER, None
+        if _HANDLER is not None:
+            logging.getLogger(ROOT_LOGGER).removeHandler(_HANDLER)
+    if listener is not None:
+        listener.stop()
+
+
+def get_logger(name: str) -> logging.Logger:
+    configure_logging()
+    return logging.getLogger(name)
+
+
+def log_stats() -> Dict[str, Any]:
+    handler, sampler = _HANDLER, _SAMPLER
+    return {
+        "level": LOG_LEVEL,
+        "sample_rate": LOG_SAMPLE_RATE,
+        "queued": handler.queue.qsize() if handler is not None else 0,
+        "queue_max": LOG_QUEUE_MAX,
+        "dropped": handler.dropped if handler is not None else 0,
+        "sampled_out": sampler.sampled_out if sampler is not None else 0,
+        "running": _LISTENER is not None,
+    }
@@ -0,0 +1,251 @@
+"""
+In-process metrics for the agent pipeline, rendered as Prometheus text.
+
+- MetricsMiddleware opens a per-request record (contextvar) and, when the
+  response is done, observes http_request_seconds / http_requests_total
+  labelled by route template, method, status and agent mode.
+- `with stage("plan"): ...` times one pipeline stage. Inside a request the
+  timing is appended to the request record (a perf_counter pair and a list
+  append) and folded into agent_stage_seconds{stage, endpoint, mode} once, at
+  the end of the request, when endpoint and mode are known. Outside a request
+  (job workers) it is observed immediately with endpoint="background".
+- set_request_mode() tags the current request with the agent mode
+  (agent_llm, multi_metric_fallback, fallback_legacy).
+- register_gauges(prefix, fn, counters=...) adds scrape-time series from a
+  stats() dict (pool, cache and job stats): keys listed in `counters` are
+  monotonic totals rendered as `<prefix>_<key>_total` counters, the rest gauges.
+"""
+from __future__ import annotations
+
+import contextvars
+import re
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, FrozenSet, Iterable, Iterator, List, Optional, Tuple
+
+LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+class Histogram:
+    def __init__(self, name: str, help_text: str, buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        self.name = name
+        self.help = help_text
+        self.buckets = buckets
+        self._lock = threading.Lock()
+        # labels -> [bucket counts..., +Inf count, sum]
+        self._series: Dict[Labels, List[float]] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = tuple(sorted(labels.items()))
+        i = bisect_left(self.buckets, value)
+        with self._lock:
+            s = self._series.get(key)
+            if s is None:
+                s = self._series[key] = [0] * (len(self.buckets) + 1) + [0.0]
+            s[i] += 1
+            s[-1] += value
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            series = [(k, list(v)) for k, v in self._series.items()]
+        for key, s in series:
+            cumulative = 0
+            for bound, n in zip(self.buckets + (float("inf"),), s[:-1]):
+                cumulative += n
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                lines.append(f"{self.name}_bucket{_labels(key, le=le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(key)} {s[-1]}")
+            lines.append(f"{self.name}_count{_labels(key)} {cumulative}")
+        return lines
+
+
+class Counter:
+    def __init__(self, name: str, help_text: str):
+        self.name = name
+        self.help = help_text
+        self._lock = threading.Lock()
+        self._series: Dict[Labels, float] = {}
+
+    def inc(self, amount: float = 1, **labels: str) -> None:
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            self._series[key] = self._series.get(key, 0) + amount
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            series = list(self._series.items())
+        lines.extend(f"{self.name}{_labels(k)} {v}" for k, v in series)
+        return lines
+
+
+def _escape(value: Any) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(key: Labels, **extra: str) -> str:
+    pairs = list(key) + list(extra.items())
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in pairs) + "}"
+
+
+HTTP_REQUEST_SECONDS = Histogram("http_request_seconds", "Request latency by route template, method, status and agent mode.")
+HTTP_REQUESTS_TOTAL = Counter("http_requests_total", "Requests by route template, method, status and agent mode.")
+AGENT_STAGE_SECONDS = Histogram("agent_stage_seconds", "Agent pipeline stage latency by stage, endpoint and mode.")
+
+_METRICS = [HTTP_REQUEST_SECONDS, HTTP_REQUESTS_TOTAL, AGENT_STAGE_SECONDS]
+_GAUGES: List[Tuple[str, Callable[[], Dict[str, Any]], Optional[str], FrozenSet[str]]] = []
+
+
+# -----------------------------
+# Per-request record
+# -----------------------------
+
+class _RequestRecord:
+    __slots__ = ("stages", "mode", "done", "endpoint")
+
+    def __init__(self):
+        self.stages: List[Tuple[str, float]] = []
+        self.mode = "none"
+        self.done = False
+        self.endpoint = "unmatched"
+
+
+_CURRENT: contextvars.ContextVar[Optional[_RequestRecord]] = contextvars.ContextVar("metrics_request", default=None)
+
+
+def set_request_mode(mode: Optional[str]) -> None:
+    rec = _CURRENT.get()
+    if rec is not None and mode:
+        rec.mode = mode
+
+
+def observe_stage(name: str, seconds: float) -> None:
+    rec = _CURRENT.get()
+    if rec is None:
+        AGENT_STAGE_SECONDS.observe(seconds, stage=name, endpoint="background", mode="none")
+    elif rec.done:
+        # Work that outlived its request (e.g. a shared single-flight task whose leader left).
+        AGENT_STAGE_SECONDS.observe(seconds, stage=name, endpoint=rec.endpoint, mode=rec.mode)
+    else:
+        rec.stages.append((name, seconds))
+
+
+@contextmanager
+def stage(name: str) -> Iterator[None]:
+    """Time the enclosed block as agent stage `name` (errors are timed too)."""
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe_stage(name, time.perf_counter() - t0)
+
+
+class MetricsMiddleware:
+    """Pure ASGI middleware (no per-request Request/Response objects)."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        rec = _RequestRecord()
+        token = _CURRENT.set(rec)
+        status = 500
+        t0 = time.perf_counter()
+
+        async def _send(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, _send)
+        finally:
+            elapsed = time.perf_counter() - t0
+            _CURRENT.reset(token)
+            route = scope.get("route")
+            rec.endpoint = getattr(route, "path", None) or "unmatched"
+            rec.done = True
+            labels = {"endpoint": rec.endpoint, "method": scope["method"], "status": str(status), "mode": rec.mode}
+            HTTP_REQUEST_SECONDS.observe(elapsed, **labels)
+            HTTP_REQUESTS_TOTAL.inc(**labels)
+            for name, seconds in rec.stages:
+                AGENT_STAGE_SECONDS.observe(seconds, stage=name, endpoint=rec.endpoint, mode=rec.mode)
+
+
+# -----------------------------
+# Scrape-time gauges + rendering
+# -----------------------------
+
+def register_gauges(
+    prefix: str,
+    fn: Callable[[], Dict[str, Any]],
+    label: Optional[str] = None,
+    counters: Iterable[str] = (),
+) -> None:
+    """
+    Expose the numeric values of fn() as `<prefix>_<key>` gauges at scrape time.
+    Keys in `counters` are monotonic totals and are exposed as `<prefix>_<key>_total`
+    counters instead. With `label`, fn() returns {label_value: {key: value}} (one
+    series per entry). Booleans become 0/1; non-numeric values are skipped.
+    """
+    _GAUGES.append((prefix, fn, label, frozenset(counters)))
+
+
+_NAME_UNSAFE = re.compile(r"[^a-zA-Z0-9_]")
+
+
+def _numeric(v: Any) -> Optional[float]:
+    if isinstance(v, bool):
+        return 1.0 if v else 0.0
+    if isinstance(v, (int, float)):
+        return float(v)
+    return None
+
+
+def _render_gauges() -> List[str]:
+    samples: Dict[Tuple[str, str], List[str]] = {}
+    for prefix, fn, label, counters in _GAUGES:
+        try:
+            stats = fn()
+        except Exception:
+            continue
+        groups = stats.items() if label else [(None, stats)]
+        for group, values in groups:
+            if not isinstance(values, dict):
+                continue
+            key: Labels = ((label, str(group)),) if label else ()
+            for k, v in values.items():
+                num = _numeric(v)
+                if num is not None:
+                    name = f"{prefix}_{_NAME_UNSAFE.sub('_', str(k))}"
+                    kind = "gauge"
+                    if k in counters:
+                        kind = "counter"
+                        if not name.endswith("_total"):
+                            name += "_total"
+                    samples.setdefault((name, kind), []).append(f"{name}{_labels(key)} {num}")
+    lines = []
+    for (name, kind), rows in samples.items():
+        lines.append(f"# TYPE {name} {kind}")
+        lines.extend(rows)
+    return lines
+
+
+def render_prometheus() -> str:
+    lines: List[str] = []
+    for metric in _METRICS:
+        lines.extend(metric.render())
+    lines.extend(_render_gauges())
+    return "\n".join(lines) + "\n"
@@ -1,4 +1,22 @@
+import contextvars
 import uuid
+from typing import Optional
+
+# Bound for the rest of the calling context (one request), so log records
+# emitted anywhere below the route carry it (see api.app.utils.log).
+_REQUEST_ID: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("request_id", default=None)
+
 
 def new_request_id() -> str:
-    return uuid.uuid4().hex
+    request_id = uuid.uuid4().hex
+    _REQUEST_ID.set(request_id)
+    return request_id
+
+
+def bind_request_id(request_id: Optional[str]) -> None:
+    """Bind an existing request_id in this context (e.g. a job started by that request)."""
+    _REQUEST_ID.set(request_id)
+
+
+def current_request_id() -> Optional[str]:
+    return _REQUEST_ID.get()
@@ -0,0 +1,91 @@
+"""
+Single-pass JSON serialization for API payloads.
+
+Query results (Decimal, date/datetime, DB row mappings) and pydantic models are
+encoded straight to bytes in one walk, instead of json.dumps -> json.loads ->
+jsonable_encoder -> json.dumps. Uses orjson when installed, the stdlib json
+module otherwise. Values are encoded the way FastAPI's jsonable_encoder did:
+
+- Decimal                  -> int if integral, else float
+- date / datetime / time   -> ISO 8601 string
+- Mapping / sqlite3.Row    -> object
+- pydantic BaseModel       -> model_dump()
+- set / tuple / array.array -> array
+- objects with __json__()  -> __json__() (e.g. api.db.columnar.ColumnarResult -> row list)
+"""
+from __future__ import annotations
+
+import json
+import sqlite3
+from array import array
+from collections.abc import Mapping
+from datetime import date, datetime, time
+from decimal import Decimal
+from typing import Any
+
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional accelerator
+    orjson = None
+
+HAS_ORJSON = orjson is not None
+
+
+def _default(obj: Any) -> Any:
+    if isinstance(obj, Decimal):
+        return int(obj) if obj.as_tuple().exponent >= 0 else float(obj)
+    if isinstance(obj, (date, datetime, time)):
+        return obj.isoformat()
+    if isinstance(obj, BaseModel):
+        return obj.model_dump()
+    if isinstance(obj, sqlite3.Row):
+        return dict(zip(obj.keys(), obj))
+    if isinstance(obj, Mapping):
+        return dict(obj)
+    if isinstance(obj, array):
+        return obj.tolist()
+    if isinstance(obj, (set, frozenset, tuple)):
+        return list(obj)
+    hook = getattr(obj, "__json__", None)
+    if hook is not None:
+        return hook()
+    if isinstance(obj, bytes):
+        return obj.decode("utf-8", "replace")
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+if orjson is not None:
+    _ORJSON_OPTS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+    def dumps(obj: Any, sort_keys: bool = False) -> bytes:
+        """Encode `obj` to UTF-8 JSON bytes."""
+        return orjson.dumps(obj, default=_default, option=_ORJSON_OPTS | (orjson.OPT_SORT_KEYS if sort_keys else 0))
+
+else:
+
+    def dumps(obj: Any, sort_keys: bool = False) -> bytes:
+        """Encode `obj` to UTF-8 JSON bytes."""
+        return json.dumps(
+            obj,
+            default=_default,
+            ensure_ascii=False,
+            separators=(",", ":"),
+            sort_keys=sort_keys,
+        ).encode("utf-8")
+
+
+def dumps_str(obj: Any, sort_keys: bool = False) -> str:
+    return dumps(obj, sort_keys=sort_keys).decode("utf-8")
+
+
+class FastJSONResponse(JSONResponse):
+    """
+    JSONResponse rendered with dumps(). Return it directly from a handler:
+    FastAPI skips jsonable_encoder for Response instances.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
@@ -0,0 +1,174 @@
+"""
+Columnar query results.
+
+A ColumnarResult stores one array per column instead of one dict per row:
+- int / integral Decimal -> array('q')   (Postgres SUM(int) comes back as Decimal)
+- float / other Decimal  -> array('d')
+- date                   -> array('i') of days since 1970-01-01
+- low-cardinality str    -> array('I') codes + a dictionary list
+- anything else / NULLs  -> plain list
+
+It is a Sequence of read-only row Mappings, so code written for List[Dict]
+(len, indexing, iteration, row.get / row["col"] / row.keys()) keeps working,
+and it serializes as that row list. to_columnar() gives the compact wire shape
+used by `format=columnar` responses.
+"""
+from __future__ import annotations
+
+from array import array
+from collections.abc import Mapping, Sequence
+from datetime import date
+from decimal import Decimal
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+_EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+
+
+def _column_kind(values: List[Any]) -> str:
+    kinds = set()
+    for v in values:
+        if v is None:
+            return "object"
+        if isinstance(v, bool):
+            return "object"
+        if isinstance(v, int) or (isinstance(v, Decimal) and v.as_tuple().exponent >= 0):
+            kinds.add("int")
+        elif isinstance(v, (float, Decimal)):
+            kinds.add("float")
+        elif isinstance(v, date) and type(v) is date:
+            kinds.add("date")
+        elif isinstance(v, str):
+            kinds.add("str")
+        else:
+            return "object"
+        if len(kinds) > 1:
+            return "float" if kinds == {"int", "float"} else "object"
+    return kinds.pop() if kinds else "object"
+
+
+class _Column:
+    __slots__ = ("kind", "values", "dictionary")
+
+    def __init__(self, values: List[Any]):
+        self.kind = _column_kind(values)
+        self.dictionary: Optional[List[str]] = None
+        if self.kind == "int":
+            self.values: Any = array("q", (int(v) for v in values))
+        elif self.kind == "float":
+            self.values = array("d", (float(v) for v in values))
+        elif self.kind == "date":
+            self.values = array("i", (v.toordinal() - _EPOCH_ORDINAL for v in values))
+        elif self.kind == "str":
+            index: Dict[str, int] = {}
+            codes = array("I", (index.setdefault(v, len(index)) for v in values))
+            if len(index) * 2 <= len(values):
+                self.values, self.dictionary = codes, list(index)
+            else:
+                self.values = list(values)
+        else:
+            self.values = list(values)
+
+    def get(self, i: int) -> Any:
+        v = self.values[i]
+        if self.kind == "date":
+            return date.fromordinal(v + _EPOCH_ORDINAL)
+        if self.dictionary is not None:
+            return self.dictionary[v]
+        return v
+
+    def describe(self, name: str) -> Dict[str, Any]:
+        out: Dict[str, Any] = {"name": name, "type": self.kind}
+        if self.kind == "date":
+            out["encoding"] = "epoch_day"
+        elif self.dictionary is not None:
+            out["encoding"] = "dictionary"
+            out["dictionary"] = self.dictionary
+        return out
+
+    def nbytes(self) -> int:
+        if isinstance(self.values, array):
+            return self.values.buffer_info()[1] * self.values.itemsize
+        return 0
+
+
+class RowView(Mapping):
+    """Read-only mapping view of one row of a ColumnarResult."""
+
+    __slots__ = ("_result", "_i")
+
+    def __init__(self, result: "ColumnarResult", i: int):
+        self._result = result
+        self._i = i
+
+    def __getitem__(self, key: str) -> Any:
+        return self._result._data[key].get(self._i)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._result.columns)
+
+    def __len__(self) -> int:
+        return len(self._result.columns)
+
+    def __repr__(self) -> str:
+        return repr(dict(self))
+
+
+class ColumnarResult(Sequence):
+    """Column-oriented result set; behaves like a List[Mapping] of rows."""
+
+    def __init__(self, columns: Iterable[str], rows: Iterable[Iterable[Any]]):
+        self.columns: List[str] = list(columns)
+        by_column: List[List[Any]] = [[] for _ in self.columns]
+        n = 0
+        for row in rows:
+            for col, v in zip(by_column, row):
+                col.append(v)
+            n += 1
+        self._len = n
+        self._data: Dict[str, _Column] = {
+            name: _Column(values) for name, values in zip(self.columns, by_column)
+        }
+
+    @classmethod
+    def from_rows(cls, rows: List[Mapping]) -> "ColumnarResult":
+        columns = list(rows[0].keys()) if rows else []
+        return cls(columns, ([r[c] for c in columns] for r in rows))
+
+    def __len__(self) -> int:
+        return self._len
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(self._len))]
+        if i < 0:
+            i += self._len
+        if not 0 <= i < self._len:
+            raise IndexError("row index out of range")
+        return RowView(self, i)
+
+    def column(self, name: str) -> Any:
+        """Raw column storage (array.array or list); dates are epoch days, strings may be codes."""
+        return self._data[name].values
+
+    def column_type(self, name: str) -> str:
+        """"int" | "float" | "date" | "str" | "object" (mixed or nullable)."""
+        return self._data[name].kind
+
+    def to_rows(self) -> List[Dict[str, Any]]:
+        return [dict(RowView(self, i)) for i in range(self._len)]
+
+    def to_columnar(self) -> Dict[str, Any]:
+        """Wire shape for `format=columnar`."""
+        return {
+            "format": "columnar",
+            "row_count": self._len,
+            "columns": [self._data[c].describe(c) for c in self.columns],
+            "data": {c: self._data[c].values for c in self.columns},
+        }
+
+    def nbytes(self) -> int:
+        """Bytes held by the typed arrays (lists/dictionaries not counted)."""
+        return sum(col.nbytes() for col in self._data.values())
+
+    def __json__(self) -> List[Dict[str, Any]]:
+        return self.to_rows()
@@ -0,0 +1,107 @@
+import os
+import threading
+from typing import Any, Dict, Optional
+
+from sqlalchemy import create_engine
+from sqlalchemy.engine import Engine, make_url
+
+from api.core.config import DATABASE_URL
+
+# -----------------------------
+# Engine registry
+# -----------------------------
+# One SQLAlchemy engine (and therefore one connection pool) per database URL
+# per process. Routers and api.db.runner must call get_engine() instead of
+# create_engine() so a worker does not hold several independent pools.
+#
+# Pool sizing (Postgres only; SQLite uses SQLAlchemy's default pool):
+#   DB_ENGINE_POOL_SIZE      persistent connections per engine   (default 5)
+#   DB_ENGINE_MAX_OVERFLOW   burst connections above pool size   (default 10)
+#   DB_ENGINE_POOL_TIMEOUT   seconds to wait for a connection    (default 30)
+#   DB_ENGINE_POOL_RECYCLE   seconds before a connection is recycled (default 1800)
+#
+# Max Postgres connections per replica ~= workers * (POOL_SIZE + MAX_OVERFLOW)
+# plus the raw get_conn pool (DB_POOL_SIZE + DB_POOL_MAX_OVERFLOW).
+
+_LOCK = threading.Lock()
+_ENGINES: Dict[str, Engine] = {}
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.getenv(name, str(default)))
+    except ValueError:
+        return default
+
+
+def normalize_database_url(url: Optional[str] = None) -> str:
+    """
+    Resolve the SQLAlchemy URL for this process.
+    - empty -> api.core.config.DATABASE_URL
+    - postgres:// / postgresql:// -> postgresql+psycopg2:// (the driver in requirements.txt)
+    """
+    url = (url or os.getenv("DATABASE_URL", "") or DATABASE_URL).strip()
+    for prefix in ("postgres://", "postgresql://"):
+        if url.startswith(prefix):
+            return "postgresql+psycopg2://" + url[len(prefix):]
+    return url
+
+
+def _engine_kwargs(url: str) -> Dict[str, Any]:
+    kwargs: Dict[str, Any] = {"pool_pre_ping": True}
+    if url.startswith("sqlite"):
+        return kwargs
+
+    kwargs.update(
+        {
+            "pool_size": _env_int("DB_ENGINE_POOL_SIZE", 5),
+            "max_overflow": _env_int("DB_ENGINE_MAX_OVERFLOW", 10),
+            "pool_timeout": _env_int("DB_ENGINE_POOL_TIMEOUT", 30),
+            "pool_recycle": _env_int("DB_ENGINE_POOL_RECYCLE", 1800),
+        }
+    )
+    return kwargs
+
+
+def get_engine(url: Optional[str] = None) -> Engine:
+    """Return the shared engine for `url` (default: DATABASE_URL), creating it once."""
+    key = normalize_database_url(url)
+    engine = _ENGINES.get(key)
+    if engine is not None:
+        return engine
+
+    with _LOCK:
+        engine = _ENGINES.get(key)
+        if engine is None:
+            engine = create_engine(key, **_engine_kwargs(key))
+            _ENGINES[key] = engine
+    return engine
+
+
+def engine_stats() -> Dict[str, Any]:
+    """Per-engine pool stats (credentials masked)."""
+    with _LOCK:
+        engines = list(_ENGINES.items())
+
+    out: Dict[str, Any] = {}
+    for key, engine in engines:
+        pool = engine.pool
+        stats: Dict[str, Any] = {
+            "pool_class": type(pool).__name__,
+            "status": pool.status(),
+        }
+        for name in ("size", "checkedin", "checkedout", "overflow"):
+            fn = getattr(pool, name, None)
+            if callable(fn):
+                stats[name] = fn()
+        out[make_url(key).render_as_string(hide_password=True)] = stats
+    return out
+
+
+def dispose_engines() -> None:
+    """Dispose every registered engine (shutdown / tests)."""
+    with _LOCK:
+        engines = list(_ENGINES.values())
+        _ENGINES.clear()
+    for engine in engines:
+        engine.dispose()
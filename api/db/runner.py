@@ -1,12 +1,60 @@
-from typing import List, Dict, Any
+import asyncio
+import contextvars
+import functools
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterator, List, TypeVar
+
 from sqlalchemy import text
-from api.db.session import SessionLocal
+from api.db.columnar import ColumnarResult
+from api.db.engines import get_engine
+
+T = TypeVar("T")
+
+# Blocking DB work from async handlers runs on this dedicated, bounded executor
+# (sized to the connection pools) instead of Starlette's shared threadpool, so
+# slow LLM requests awaiting on the event loop never compete with DB calls for threads.
+DB_ASYNC_WORKERS = int(os.getenv("DB_ASYNC_WORKERS", "16"))
+
+_DB_EXECUTOR = ThreadPoolExecutor(max_workers=DB_ASYNC_WORKERS, thread_name_prefix="db")
+
+# Rows per fetch for run_sql_stream (server-side cursor on Postgres).
+STREAM_CHUNK_ROWS = int(os.getenv("STREAM_CHUNK_ROWS", "2000"))
+
 
 def run_sql(sql: str, params: Dict[str, Any]) -> List[Dict[str, Any]]:
-    db = SessionLocal()
-    try:
-        result = db.execute(text(sql), params)
-        rows = result.mappings().all()
-        return [dict(r) for r in rows]
-    finally:
-        db.close()
+    with get_engine().connect() as conn:
+        result = conn.execute(text(sql), params)
+        return [dict(r) for r in result.mappings()]
+
+
+def run_sql_columnar(sql: str, params: Dict[str, Any]) -> ColumnarResult:
+    """run_sql() without per-row dicts: rows go straight from the cursor into column arrays."""
+    with get_engine().connect() as conn:
+        result = conn.execute(text(sql), params)
+        return ColumnarResult(result.keys(), result)
+
+
+def run_sql_stream(sql: str, params: Dict[str, Any], chunk_size: int = 0) -> Iterator[List[Dict[str, Any]]]:
+    """
+    Yield result rows in chunks of `chunk_size` (default STREAM_CHUNK_ROWS) through a
+    server-side cursor, so only one chunk is in memory at a time. The connection is
+    held until the generator is exhausted or closed.
+    """
+    size = chunk_size or STREAM_CHUNK_ROWS
+    with get_engine().connect() as conn:
+        result = conn.execution_options(stream_results=True, yield_per=size).execute(text(sql), params)
+        for chunk in result.mappings().partitions(size):
+            yield [dict(r) for r in chunk]
+
+
+async def run_in_db_executor(fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """Await a blocking DB call on the DB executor (context variables are propagated)."""
+    loop = asyncio.get_running_loop()
+    ctx = contextvars.copy_context()
+    call = functools.partial(ctx.run, fn, *args, **kwargs)
+    return await loop.run_in_executor(_DB_EXECUTOR, call)
+
+
+async def run_sql_async(sql: str, params: Dict[str, Any]) -> List[Dict[str, Any]]:
+    return await run_in_db_executor(run_sql, sql, params)
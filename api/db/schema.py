@@ -0,0 +1,275 @@
+"""
+Schema management for the demo_sales_daily fact table.
+
+Postgres layout (matches the SQL generated by api.app.sql.builder.build_kpi_sql):
+- columns for every allowed breakdown (country, category, seller_id)
+- PRIMARY KEY (d, country, category, seller_id)
+- PARTITION BY RANGE (d), one partition per month (demo_sales_daily_pYYYYMM);
+  writers call ensure_month_partitions() for the days they load (there is no
+  default partition, so an unplanned month fails loudly instead of piling up)
+- a covering index on d INCLUDE-ing the breakdown and measure columns, so every
+  supported plan shape (d range + GROUP BY period/breakdown) is an index-only scan
+- an updated_at index for api.app.services.kpi_derivation
+
+A pre-partitioning table (PRIMARY KEY (d, country)) is migrated in place:
+renamed, copied into the partitioned table with category/seller_id = 'unknown', dropped.
+
+SQLite (tests/CI) gets the same columns on a plain table.
+
+CLI:
+    PYTHONPATH=. python -m api.db.schema migrate
+    PYTHONPATH=. python -m api.db.schema explain      # exit 1 if a shape uses a Seq Scan
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+from datetime import date, timedelta
+from typing import Any, Dict, Iterator, List, Optional
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+
+from api.app.sql.builder import ALLOWED_BREAKDOWNS, ROLLUP_TABLES, ROLLUPS_FOR_GRAIN, build_kpi_sql
+from api.db.engines import get_engine
+
+DEMO_SALES_TABLE = "demo_sales_daily"
+DEMO_SALES_COLUMNS = ("d", "country", "category", "seller_id", "revenue", "orders", "customers")
+DEMO_SALES_KEY = ("d", "country", "category", "seller_id")
+
+_COLUMNS_DDL = """
+  d date NOT NULL,
+  country text NOT NULL,
+  category text NOT NULL DEFAULT 'unknown',
+  seller_id text NOT NULL DEFAULT 'unknown',
+  revenue numeric(14,2) NOT NULL,
+  orders int NOT NULL,
+  customers int NOT NULL,
+  updated_at timestamptz NOT NULL DEFAULT CURRENT_TIMESTAMP,
+  PRIMARY KEY (d, country, category, seller_id)
+"""
+
+DEMO_SALES_DDL_PG = f"CREATE TABLE IF NOT EXISTS demo_sales_daily ({_COLUMNS_DDL}) PARTITION BY RANGE (d);"
+DEMO_SALES_DDL_SQLITE = f"CREATE TABLE IF NOT EXISTS demo_sales_daily ({_COLUMNS_DDL});"
+
+DEMO_SALES_INDEXES_PG = [
+    # d-range scans for every grain/breakdown combination, without heap fetches.
+    "CREATE INDEX IF NOT EXISTS demo_sales_daily_d_cover_idx ON demo_sales_daily (d) "
+    "INCLUDE (country, category, seller_id, revenue, orders, customers)",
+    "CREATE INDEX IF NOT EXISTS demo_sales_daily_updated_at_idx ON demo_sales_daily (updated_at)",
+]
+DEMO_SALES_INDEXES_SQLITE = [
+    "CREATE INDEX IF NOT EXISTS demo_sales_daily_updated_at_idx ON demo_sales_daily (updated_at)",
+]
+
+
+def _month_start(d: date) -> date:
+    return d.replace(day=1)
+
+
+def _next_month(m: date) -> date:
+    return date(m.year + m.month // 12, m.month % 12 + 1, 1)
+
+
+def iter_months(start: date, end: date) -> Iterator[date]:
+    """Month starts covering [start, end] (inclusive)."""
+    m = _month_start(start)
+    while m <= end:
+        yield m
+        m = _next_month(m)
+
+
+def partition_name(month: date) -> str:
+    return f"{DEMO_SALES_TABLE}_p{month:%Y%m}"
+
+
+def _relkind(conn: Connection, name: str) -> Optional[str]:
+    return conn.execute(
+        text(
+            """
+            SELECT c.relkind FROM pg_class c
+            JOIN pg_namespace n ON n.oid = c.relnamespace
+            WHERE c.relname = :name AND n.nspname = current_schema()
+            """
+        ),
+        {"name": name},
+    ).scalar()
+
+
+def _columns(conn: Connection, name: str) -> List[str]:
+    return list(
+        conn.execute(
+            text(
+                "SELECT column_name FROM information_schema.columns "
+                "WHERE table_schema = current_schema() AND table_name = :name"
+            ),
+            {"name": name},
+        ).scalars()
+    )
+
+
+def ensure_month_partitions(conn: Connection, start: date, end: date) -> List[str]:
+    """Create the monthly partitions for days [start, end]; returns the ones created."""
+    created = []
+    for m in iter_months(start, end):
+        name = partition_name(m)
+        if _relkind(conn, name) is not None:
+            continue
+        conn.execute(
+            text(
+                f"CREATE TABLE IF NOT EXISTS {name} PARTITION OF {DEMO_SALES_TABLE} "
+                f"FOR VALUES FROM ('{m.isoformat()}') TO ('{_next_month(m).isoformat()}')"
+            )
+        )
+        created.append(name)
+    return created
+
+
+def _migrate_legacy(conn: Connection) -> Dict[str, Any]:
+    """Move a plain (unpartitioned) demo_sales_daily into the partitioned layout."""
+    legacy = f"{DEMO_SALES_TABLE}_legacy"
+    cols = _columns(conn, DEMO_SALES_TABLE)
+
+    conn.execute(text(f"ALTER TABLE {DEMO_SALES_TABLE} RENAME TO {legacy}"))
+    # Index names are schema-wide: free them for the new table.
+    conn.execute(text(f"ALTER INDEX IF EXISTS {DEMO_SALES_TABLE}_pkey RENAME TO {legacy}_pkey"))
+    conn.execute(text(f"DROP INDEX IF EXISTS {DEMO_SALES_TABLE}_updated_at_idx"))
+    conn.execute(text(DEMO_SALES_DDL_PG))
+
+    lo, hi = conn.execute(text(f"SELECT MIN(d), MAX(d) FROM {legacy}")).one()
+    if lo is not None:
+        ensure_month_partitions(conn, lo, hi)
+
+    category = "category" if "category" in cols else "'unknown'"
+    seller = "seller_id" if "seller_id" in cols else "'unknown'"
+    updated_at = "updated_at" if "updated_at" in cols else "now()"
+    moved = conn.execute(
+        text(
+            f"""
+            INSERT INTO {DEMO_SALES_TABLE} (d, country, category, seller_id, revenue, orders, customers, updated_at)
+            SELECT d, country, {category}, {seller}, revenue, orders, customers, {updated_at}
+            FROM {legacy}
+            """
+        )
+    ).rowcount
+    conn.execute(text(f"DROP TABLE {legacy}"))
+    return {"migrated_rows": moved}
+
+
+def ensure_demo_sales_schema(
+    conn: Connection,
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+) -> Dict[str, Any]:
+    """
+    Create (or migrate) demo_sales_daily and its indexes; on Postgres also create
+    the monthly partitions for [start, end]. Idempotent.
+    """
+    if conn.dialect.name == "sqlite":
+        conn.execute(text(DEMO_SALES_DDL_SQLITE))
+        for ddl in DEMO_SALES_INDEXES_SQLITE:
+            conn.execute(text(ddl))
+        return {"layout": "plain"}
+
+    out: Dict[str, Any] = {"layout": "partitioned"}
+    kind = _relkind(conn, DEMO_SALES_TABLE)
+    if kind is None:
+        conn.execute(text(DEMO_SALES_DDL_PG))
+    elif kind == "r":
+        out.update(_migrate_legacy(conn))
+
+    if start is not None and end is not None:
+        out["partitions_created"] = ensure_month_partitions(conn, start, end)
+    for ddl in DEMO_SALES_INDEXES_PG:
+        conn.execute(text(ddl))
+    return out
+
+
+# -----------------------------
+# EXPLAIN check
+# -----------------------------
+
+def _plan_nodes(node: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+    yield node
+    for child in node.get("Plans", []):
+        yield from _plan_nodes(child)
+
+
+def supported_plan_shapes() -> List[Dict[str, Any]]:
+    """Every (grain, breakdown) combination build_kpi_sql emits, daily and rollup-routed."""
+    shapes = []
+    for grain in ("day", "week", "month"):
+        for breakdown in [None] + [[b] for b in sorted(ALLOWED_BREAKDOWNS)]:
+            shapes.append({"grain": grain, "breakdown": breakdown, "rollup": False})
+            if ROLLUPS_FOR_GRAIN.get(grain):
+                shapes.append({"grain": grain, "breakdown": breakdown, "rollup": True})
+    return shapes
+
+
+def explain_plan_shapes(conn: Connection, start: date, end: date) -> List[Dict[str, Any]]:
+    """
+    EXPLAIN each supported shape over [start, end) with enable_seqscan=off:
+    a Seq Scan that survives means no index can serve that shape.
+    """
+    conn.execute(text("SET LOCAL enable_seqscan = off"))
+    results = []
+    for shape in supported_plan_shapes():
+        rollups = {g: (start, end) for g in ROLLUP_TABLES} if shape["rollup"] else None
+        sql, params = build_kpi_sql(
+            metric="revenue",
+            grain=shape["grain"],
+            start=start,
+            end=end,
+            breakdown=shape["breakdown"],
+            rollups=rollups,
+        )
+        plan = conn.execute(text(f"EXPLAIN (FORMAT JSON) {sql.rstrip(';')}"), params).scalar()
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        seq_scans = sorted(
+            {
+                n.get("Relation Name", "?")
+                for n in _plan_nodes(plan[0]["Plan"])
+                if n.get("Node Type") == "Seq Scan"
+            }
+        )
+        results.append({**shape, "seq_scans": seq_scans, "ok": not seq_scans})
+    return results
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m api.db.schema")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("migrate", help="create/migrate demo_sales_daily and its indexes")
+    explain = sub.add_parser("explain", help="fail if a supported query shape uses a Seq Scan")
+    explain.add_argument("--days", type=int, default=365)
+    args = parser.parse_args(argv)
+
+    engine = get_engine()
+    if engine.dialect.name != "postgresql":
+        print("schema management requires Postgres (DATABASE_URL)", file=sys.stderr)
+        return 2
+
+    if args.command == "migrate":
+        with engine.begin() as conn:
+            print(json.dumps(ensure_demo_sales_schema(conn), indent=2, default=str))
+        return 0
+
+    from api.app.services.rollup_service import ensure_rollup_tables
+
+    end = date.today() + timedelta(days=1)
+    start = end - timedelta(days=args.days)
+    with engine.begin() as conn:
+        ensure_demo_sales_schema(conn, start, end)
+        ensure_rollup_tables(conn)
+    with engine.connect() as conn:
+        results = explain_plan_shapes(conn, start, end)
+
+    failed = [r for r in results if not r["ok"]]
+    print(json.dumps({"shapes": len(results), "failed": failed}, indent=2))
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,6 +1,5 @@
-from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
-from api.core.config import DATABASE_URL
+from api.db.engines import get_engine
 
-engine = create_engine(DATABASE_URL, pool_pre_ping=True)
+engine = get_engine()
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
@@ -0,0 +1,228 @@
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy import text
+
+# -----------------------------
+# LLM response cache
+# -----------------------------
+# LLMCache   : namespaced TTL cache with hit/miss counters (values are JSON)
+# backends   : "memory" (in-process LRU, default) or "sql" (shared llm_cache table,
+#              visible to every worker/replica); more can be added with register_backend()
+#
+# LLM_CACHE_BACKEND      memory | sql | <registered name>
+# LLM_CACHE_MAX_ENTRIES  LRU bound for the memory backend (per cache)
+
+
+class MemoryBackend:
+    """In-process LRU with per-entry expiry."""
+
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = max(1, max_entries)
+        self._lock = threading.Lock()
+        self._data: "OrderedDict[str, Tuple[str, float]]" = OrderedDict()
+        self.evictions = 0
+
+    def get(self, key: str) -> Optional[str]:
+        now = time.time()
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            value, expires_at = item
+            if expires_at <= now:
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: str, ttl_s: float) -> None:
+        with self._lock:
+            self._data[key] = (value, time.time() + ttl_s)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def size(self) -> int:
+        with self._lock:
+            return len(self._data)
+
+
+class SqlBackend:
+    """
+    Shared backend on the application database (table llm_cache), so cached
+    plans/summaries are reused across workers and replicas.
+    Keys are namespaced by LLMCache; expired rows are ignored and overwritten.
+    """
+
+    DDL = """
+    CREATE TABLE IF NOT EXISTS llm_cache (
+        cache_key TEXT PRIMARY KEY,
+        value TEXT NOT NULL,
+        expires_at DOUBLE PRECISION NOT NULL
+    );
+    """
+
+    def __init__(self, prefix: str = ""):
+        self.prefix = prefix
+        self._ready = False
+
+    def _engine(self):
+        from api.db.engines import get_engine
+
+        engine = get_engine()
+        if not self._ready:
+            with engine.begin() as conn:
+                conn.execute(text(self.DDL))
+            self._ready = True
+        return engine
+
+    def get(self, key: str) -> Optional[str]:
+        with self._engine().connect() as conn:
+            row = conn.execute(
+                text("SELECT value FROM llm_cache WHERE cache_key = :k AND expires_at > :now"),
+                {"k": self.prefix + key, "now": time.time()},
+            ).first()
+        return row[0] if row else None
+
+    def set(self, key: str, value: str, ttl_s: float) -> None:
+        with self._engine().begin() as conn:
+            conn.execute(
+                text(
+                    """
+                    INSERT INTO llm_cache (cache_key, value, expires_at)
+                    VALUES (:k, :v, :e)
+                    ON CONFLICT (cache_key) DO UPDATE SET
+                        value = EXCLUDED.value,
+                        expires_at = EXCLUDED.expires_at
+                    """
+                ),
+                {"k": self.prefix + key, "v": value, "e": time.time() + ttl_s},
+            )
+
+    def delete(self, key: str) -> None:
+        with self._engine().begin() as conn:
+            conn.execute(text("DELETE FROM llm_cache WHERE cache_key = :k"), {"k": self.prefix + key})
+
+    def clear(self) -> None:
+        with self._engine().begin() as conn:
+            conn.execute(text("DELETE FROM llm_cache WHERE cache_key LIKE :p"), {"p": self.prefix + "%"})
+
+    def size(self) -> Optional[int]:
+        return None
+
+
+_BACKENDS: Dict[str, Callable[[str], Any]] = {
+    "memory": lambda namespace: MemoryBackend(int(os.getenv("LLM_CACHE_MAX_ENTRIES", "1024"))),
+    "sql": lambda namespace: SqlBackend(prefix=f"{namespace}:"),
+}
+
+
+def register_backend(name: str, factory: Callable[[str], Any]) -> None:
+    """
+    Register a shared backend (e.g. Redis). `factory(namespace)` must return an
+    object with get(key) / set(key, value, ttl_s) / delete(key) / clear().
+    Select it with LLM_CACHE_BACKEND=<name>.
+    """
+    _BACKENDS[name] = factory
+
+
+class LLMCache:
+    """
+    Namespaced TTL cache for LLM outputs.
+    Backend errors are counted and treated as misses: caching must never fail a request.
+    """
+
+    def __init__(self, namespace: str, ttl_s: float, backend: Any = None, enabled: bool = True):
+        self.namespace = namespace
+        self.ttl_s = ttl_s
+        self.enabled = enabled
+        if backend is None:
+            name = os.getenv("LLM_CACHE_BACKEND", "memory").strip().lower()
+            backend = _BACKENDS.get(name, _BACKENDS["memory"])(namespace)
+        self.backend = backend
+
+        self._lock = threading.Lock()
+        self._counters: Dict[str, int] = {"hits": 0, "misses": 0, "stores": 0, "errors": 0}
+        _REGISTRY.append(self)
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + 1
+
+    @property
+    def is_local(self) -> bool:
+        """True when lookups are in-process (safe to call from the event loop)."""
+        return isinstance(self.backend, MemoryBackend)
+
+    def get(self, key: str, counter: str = "hits", count_miss: bool = True) -> Optional[Any]:
+        """
+        Return the cached JSON value (None on miss).
+        `counter` labels the hit; count_miss=False for a lookup that has a follow-up key.
+        """
+        if not self.enabled:
+            return None
+        try:
+            raw = self.backend.get(key)
+        except Exception:
+            self._count("errors")
+            raw = None
+        if raw is None:
+            if count_miss:
+                self._count("misses")
+            return None
+        self._count(counter)
+        return json.loads(raw)
+
+    def set(self, key: str, value: Any) -> None:
+        if not self.enabled:
+            return
+        try:
+            self.backend.set(key, json.dumps(value, default=str), self.ttl_s)
+            self._count("stores")
+        except Exception:
+            self._count("errors")
+
+    def clear(self) -> None:
+        try:
+            self.backend.clear()
+        except Exception:
+            self._count("errors")
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            out: Dict[str, Any] = dict(self._counters)
+        lookups = sum(v for k, v in out.items() if k not in ("misses", "stores", "errors")) + out["misses"]
+        hits = lookups - out["misses"]
+        out.update(
+            {
+                "backend": type(self.backend).__name__,
+                "enabled": self.enabled,
+                "ttl_s": self.ttl_s,
+                "hit_ratio": round(hits / lookups, 4) if lookups else 0.0,
+                "size": self.backend.size() if hasattr(self.backend, "size") else None,
+                "evictions": getattr(self.backend, "evictions", None),
+            }
+        )
+        return out
+
+
+_REGISTRY: List[LLMCache] = []
+
+
+def cache_stats() -> Dict[str, Any]:
+    """Stats for every LLMCache created in this process, by namespace."""
+    return {c.namespace: c.stats() for c in _REGISTRY}
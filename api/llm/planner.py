@@ -1,6 +1,11 @@
 import json
-from openai import OpenAI
+import os
+import re
+from typing import List, Optional
+from openai import AsyncOpenAI, OpenAI
 from api.core.config import OPENAI_API_KEY, OPENAI_MODEL
+from api.db.runner import run_in_db_executor
+from api.llm.cache import LLMCache
 from api.llm.schemas import AskPlan
 
 SYSTEM = """
@@ -20,6 +25,22 @@ Rules:
 """
 
 client = OpenAI(api_key=OPENAI_API_KEY)
+async_client = AsyncOpenAI(api_key=OPENAI_API_KEY)
+
+# Plan cache: repeated dashboard questions skip the planner LLM call.
+# PLAN_CACHE_FUZZY=1 also matches questions with the same heuristic plan shape
+# and the same content words (word order / filler words / punctuation ignored).
+plan_cache = LLMCache(
+    "plan",
+    ttl_s=float(os.getenv("PLAN_CACHE_TTL_S", "3600")),
+    enabled=os.getenv("PLAN_CACHE_ENABLED", "1") != "0",
+)
+PLAN_CACHE_FUZZY = os.getenv("PLAN_CACHE_FUZZY", "0") == "1"
+
+_STOPWORDS = {
+    "a", "an", "the", "did", "do", "does", "is", "are", "was", "were", "our", "my",
+    "me", "us", "we", "please", "can", "you", "show", "tell", "what", "how", "of", "to",
+}
 
 
 def _safe_json_load(text: str) -> dict:
@@ -117,20 +138,85 @@ def _normalize_plan_payload(raw_data: dict, question: str) -> dict:
     return data
 
 
+def _plan_input(question: str) -> list:
+    return [
+        {"role": "system", "content": SYSTEM},
+        {"role": "user", "content": question},
+    ]
+
+
+def _plan_from_text(text: str, question: str) -> AskPlan:
+    raw_data = _safe_json_load((text or "").strip())
+    normalized = _normalize_plan_payload(raw_data, question)
+    return AskPlan.model_validate(normalized)
+
+
+def normalize_question(question: str) -> str:
+    """Lowercase, drop punctuation, collapse whitespace."""
+    q = re.sub(r"[^\w\s]", " ", (question or "").lower())
+    return " ".join(q.split())
+
+
+def _plan_cache_keys(question: str) -> List[str]:
+    """Exact key first, then the optional fuzzy (shape + content words) key."""
+    normalized = normalize_question(question)
+    keys = [f"q:{normalized}"]
+    if PLAN_CACHE_FUZZY:
+        shape = json.dumps(_normalize_plan_payload({}, question), sort_keys=True)
+        words = sorted({w for w in normalized.split() if w not in _STOPWORDS})
+        keys.append(f"shape:{shape}|{' '.join(words)}")
+    return keys
+
+
+def _cached_plan(question: str) -> Optional[AskPlan]:
+    keys = _plan_cache_keys(question)
+    data = plan_cache.get(keys[0], count_miss=len(keys) == 1)
+    if data is None and len(keys) > 1:
+        data = plan_cache.get(keys[1], counter="fuzzy_hits")
+    return AskPlan.model_validate(data) if data is not None else None
+
+
+def _store_plan(question: str, plan: AskPlan) -> None:
+    data = plan.model_dump(mode="json")
+    for key in _plan_cache_keys(question):
+        plan_cache.set(key, data)
+
+
 def make_plan(question: str) -> AskPlan:
     if not OPENAI_API_KEY:
         raise RuntimeError("OPENAI_API_KEY is missing")
 
+    cached = _cached_plan(question)
+    if cached is not None:
+        return cached
+
     resp = client.responses.create(
         model=OPENAI_MODEL,
-        input=[
-            {"role": "system", "content": SYSTEM},
-            {"role": "user", "content": question},
-        ],
+        input=_plan_input(question),
     )
+    plan = _plan_from_text(resp.output_text, question)
+    _store_plan(question, plan)
+    return plan
 
-    text = (resp.output_text or "").strip()
-    raw_data = _safe_json_load(text)
-    normalized = _normalize_plan_payload(raw_data, question)
 
-    return AskPlan.model_validate(normalized)
\ No newline at end of file
+async def make_plan_async(question: str) -> AskPlan:
+    if not OPENAI_API_KEY:
+        raise RuntimeError("OPENAI_API_KEY is missing")
+
+    if plan_cache.is_local:
+        cached = _cached_plan(question)
+    else:
+        cached = await run_in_db_executor(_cached_plan, question)
+    if cached is not None:
+        return cached
+
+    resp = await async_client.responses.create(
+        model=OPENAI_MODEL,
+        input=_plan_input(question),
+    )
+    plan = _plan_from_text(resp.output_text, question)
+    if plan_cache.is_local:
+        _store_plan(question, plan)
+    else:
+        await run_in_db_executor(_store_plan, question, plan)
+    return plan
@@ -1,8 +1,24 @@
+import hashlib
 import json
-from openai import OpenAI
+import os
+from openai import AsyncOpenAI, OpenAI
+from api.app.services.intent_service import parse_intent
+from api.app.utils.serialization import dumps, dumps_str
 from api.core.config import OPENAI_API_KEY, OPENAI_MODEL
+from api.db.runner import run_in_db_executor
+from api.llm.cache import LLMCache
 
 client = OpenAI(api_key=OPENAI_API_KEY)
+async_client = AsyncOpenAI(api_key=OPENAI_API_KEY)
+
+# Summary cache: identical (question intent, plan, results) -> identical report.
+# The key hashes the results payload, so changed data never hits a stale entry;
+# writers also call invalidate_summary_cache() to drop entries for old data.
+summary_cache = LLMCache(
+    "summary",
+    ttl_s=float(os.getenv("SUMMARY_CACHE_TTL_S", "86400")),
+    enabled=os.getenv("SUMMARY_CACHE_ENABLED", "1") != "0",
+)
 
 SYSTEM = """
 You are an analytics insight writer.
@@ -15,22 +31,72 @@ Output JSON with:
 - next_actions (array of strings)
 """
 
-def summarize(question: str, plan: dict, results: dict) -> dict:
-    if not OPENAI_API_KEY:
-        raise RuntimeError("OPENAI_API_KEY is missing")
-
+def _summary_input(question: str, plan: dict, results: dict) -> list:
     payload = {
         "question": question,
         "plan": plan,
         "results": results,
     }
+    return [
+        {"role": "system", "content": SYSTEM},
+        {"role": "user", "content": dumps_str(payload)},
+    ]
+
+
+def summary_fingerprint(question: str, plan: dict, results: dict) -> str:
+    """Stable sha256 of (question intent + keywords, plan, results)."""
+    payload = {
+        "intent": parse_intent(question),
+        "plan": plan,
+        "results": results,
+    }
+    return hashlib.sha256(dumps(payload, sort_keys=True)).hexdigest()
+
+
+def invalidate_summary_cache() -> None:
+    """Drop cached summaries (call after the underlying sales data changes)."""
+    summary_cache.clear()
+
+
+def summarize(question: str, plan: dict, results: dict) -> dict:
+    if not OPENAI_API_KEY:
+        raise RuntimeError("OPENAI_API_KEY is missing")
+
+    key = summary_fingerprint(question, plan, results)
+    cached = summary_cache.get(key)
+    if cached is not None:
+        return cached
 
     resp = client.responses.create(
         model=OPENAI_MODEL,
-        input=[
-            {"role": "system", "content": SYSTEM},
-            {"role": "user", "content": json.dumps(payload)},
-        ],
+        input=_summary_input(question, plan, results),
+    )
+    text = resp.output_text.strip()
+    report = json.loads(text)
+    summary_cache.set(key, report)
+    return report
+
+
+async def summarize_async(question: str, plan: dict, results: dict) -> dict:
+    if not OPENAI_API_KEY:
+        raise RuntimeError("OPENAI_API_KEY is missing")
+
+    key = summary_fingerprint(question, plan, results)
+    if summary_cache.is_local:
+        cached = summary_cache.get(key)
+    else:
+        cached = await run_in_db_executor(summary_cache.get, key)
+    if cached is not None:
+        return cached
+
+    resp = await async_client.responses.create(
+        model=OPENAI_MODEL,
+        input=_summary_input(question, plan, results),
     )
     text = resp.output_text.strip()
-    return json.loads(text)
+    report = json.loads(text)
+    if summary_cache.is_local:
+        summary_cache.set(key, report)
+    else:
+        await run_in_db_executor(summary_cache.set, key, report)
+    return report
@@ -25,7 +25,7 @@ from api.app.security.api_key import require_api_key
 from api.app.services.kpi_service import fetch_kpi, upsert_kpi
 from api.app.services.report_service import fetch_latest_two_months, build_monthly_report
 from api.app.services.log_service import (
-    insert_analysis_log,
+    enqueue_analysis_log,
     fetch_analysis_history,
     ensure_analysis_log_table,
 )
@@ -45,9 +45,17 @@ from api.app.services.analyze_service import (
     build_llm_narrative,
 )
 
-from api.app.db import get_conn
+from api.app.db import get_conn, dispose_pools
+from api.db.engines import dispose_engines
+from api.app.services.job_runner import shutdown_job_runner
+from api.app.services.log_sink import shutdown_log_sink
 from api.app.services.agent import ask_agent
 from api.app.services.driver_service import build_driver_summary
+from api.app.services.fallback_runner import run_metric_legs
+from api.app.services.fetch_plan import FetchPlan
+from api.app.utils.log import shutdown_logging
+from api.app.utils.metrics import MetricsMiddleware
+from api.app.utils.serialization import FastJSONResponse
 
 # =========================
 # v1 Routers (Product API)
@@ -60,6 +68,8 @@ from api.routers.config import router as config_router
 from api.routers.meta import router as meta_router
 from api.routers.jobs import router as jobs_router
 from api.routers.dashboard import router as dashboard_router
+from api.routers.rollups import router as rollups_router
+from api.routers.metrics import router as metrics_router
 
 
 app = FastAPI(title="Micro SaaS KPI API", version="1.0.0")
@@ -117,6 +127,8 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+# Outermost: request latency includes CORS handling.
+app.add_middleware(MetricsMiddleware)
 
 
 # =========================
@@ -134,6 +146,10 @@ app.include_router(meta_router, prefix="/v1", dependencies=v1_auth)
 app.include_router(config_router, prefix="/v1", dependencies=v1_auth)
 app.include_router(jobs_router, prefix="/v1", dependencies=v1_auth)
 app.include_router(dashboard_router, prefix="/v1", dependencies=v1_auth)
+app.include_router(rollups_router, prefix="/v1", dependencies=v1_auth)
+
+# Prometheus scrape endpoint (unprotected, like /health)
+app.include_router(metrics_router)
 
 
 # =========================
@@ -152,6 +168,15 @@ def on_startup():
         pass
 
 
+@app.on_event("shutdown")
+def on_shutdown():
+    shutdown_job_runner()
+    shutdown_log_sink()
+    dispose_pools()
+    dispose_engines()
+    shutdown_logging()
+
+
 # =========================
 # Basic endpoints (Unprotected)
 # =========================
@@ -273,7 +298,7 @@ def ask(payload: AskAgentRequest):
     Use /v1/agent/query and /v1/ask-executive instead.
     """
     try:
-        return ask_agent(payload.question)
+        return FastJSONResponse(ask_agent(payload.question))
     except Exception:
         pass
 
@@ -282,14 +307,19 @@ def ask(payload: AskAgentRequest):
 
     if any(k in q for k in multi_keywords):
         metrics = ["revenue", "orders", "customers", "aov"]
-        outputs = []
+        fetch_plan = FetchPlan()
 
-        for m in metrics:
+        def _leg(m: str) -> AskResponse:
             legacy_payload = AskRequest(
                 question=f"{m} last_3_months executive",
                 style="executive",
             )
-            outputs.append(ask_legacy(legacy_payload))
+            return _ask_legacy(legacy_payload, fetch_plan=fetch_plan)
+
+        try:
+            outputs, failed_legs = run_metric_legs(_leg, metrics)
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=str(e))
 
         try:
             driver_summary = build_driver_summary(outputs)
@@ -327,6 +357,7 @@ def ask(payload: AskAgentRequest):
             "decision": decision,
             "final_report": final_report,
             "results": outputs,
+            "failed_legs": failed_legs,
         }
 
     try:
@@ -350,10 +381,14 @@ def ask_text(question: str = Body(..., media_type="text/plain")):
 
 @app.post("/ask-legacy", response_model=AskResponse, include_in_schema=False)
 def ask_legacy(payload: AskRequest):
+    return _ask_legacy(payload)
+
+
+def _ask_legacy(payload: AskRequest, fetch_plan: Optional[FetchPlan] = None) -> AskResponse:
     parsed = parse_question(payload.question, style=payload.style)
 
     sql = build_metric_sql(metric=parsed["metric"], range_=parsed["range"])
-    rows = fetch_metric_rows(sql)
+    rows = fetch_plan.rows(sql) if fetch_plan is not None else fetch_metric_rows(sql)
 
     try:
         narrative, risk, recommendation = build_llm_narrative(parsed["metric"], rows, style=parsed["style"])
@@ -361,7 +396,7 @@ def ask_legacy(payload: AskRequest):
         narrative, risk, recommendation = build_narrative(parsed["metric"], rows, style=parsed["style"])
 
     try:
-        insert_analysis_log(
+        enqueue_analysis_log(
             {
                 "metric": parsed["metric"],
                 "range": parsed["range"],
@@ -399,7 +434,7 @@ def analyze(payload: AnalyzeRequest):
         narrative, risk, recommendation = build_narrative(payload.metric, rows, style=payload.style)
 
     try:
-        insert_analysis_log(
+        enqueue_analysis_log(
             {
                 "metric": payload.metric,
                 "range": payload.range,
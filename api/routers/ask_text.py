@@ -1,33 +1,49 @@
+import logging
+import os
 import time
-import traceback
-from typing import Optional
+from typing import List, Literal, Optional
 
-from fastapi import APIRouter, Body, BackgroundTasks
-from fastapi.encoders import jsonable_encoder
+from fastapi import APIRouter, Body, HTTPException, Query
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, Field, ConfigDict
 
 from api.app.schemas import AskRequest
-from api.app.services.agent import ask_agent
+from api.app.services.agent import ask_agent, ask_agent_async, plan_agent_queries, stream_agent_results
 from api.app.services.ask_service import parse_question
 from api.app.services.analyze_service import (
     build_metric_sql,
     fetch_metric_rows,
     build_narrative,
     build_llm_narrative,
+    build_llm_narrative_async,
 )
 from api.app.services.driver_service import build_driver_summary
 from api.app.services.decision_service import build_decision_signals
 from api.app.services.report_formatter import build_final_report
-from api.app.services.agent_log_service import insert_agent_log, fetch_agent_history
+from api.app.services.agent_log_service import enqueue_agent_log, fetch_agent_history
+from api.app.services.fallback_runner import run_metric_legs, run_metric_legs_async
+from api.app.services.fetch_plan import FetchPlan
+from api.app.services.kpi_cache import data_version
+from api.app.services.single_flight import single_flight
+from api.app.utils.log import get_logger
 from api.app.utils.request_id import new_request_id
+from api.app.utils.metrics import set_request_mode, stage
+from api.app.utils.serialization import FastJSONResponse, dumps
+from api.db.runner import run_in_db_executor
+from api.llm.planner import normalize_question
 
 from api.app.services.insight_service import (
     compute_latest_kpi_changes,
     detect_anomalies,
+    simulate_kpi_grid,
+    simulate_kpi_scenarios,
     simulate_kpi_what_if,
 )
+from api.app.services.streaming_anomaly import streaming_insight
 
+from api.app.services.job_runner import submit_job
 from api.app.services.job_store import (
+    JOB_QUEUE_MODE,
     create_job,
     set_job_running,
     set_job_result,
@@ -35,6 +51,7 @@ from api.app.services.job_store import (
 )
 
 router = APIRouter(tags=["agent"])
+log = get_logger(__name__)
 
 
 class AgentQueryJSON(BaseModel):
@@ -49,6 +66,11 @@ class InsightRequest(BaseModel):
         default=None,
         description="Optional absolute pct-change thresholds (e.g., {'revenue':0.2})",
     )
+    z_threshold: Optional[float] = Field(
+        default=None,
+        gt=0,
+        description="mode=streaming only: |z| a day must reach to be flagged (default STREAMING_Z_THRESHOLD)",
+    )
 
 
 class SimulationRequest(BaseModel):
@@ -57,64 +79,65 @@ class SimulationRequest(BaseModel):
     customers_delta_pct: float = Field(default=0.0, description="Informational only")
 
 
-def _run_agent_with_fallback(question: str) -> dict:
-    """
-    Tries OpenAI agent first; if quota/error happens, falls back to legacy KPI analysis.
-    Always returns a consistent payload with mode + final_report.
-    """
-    q = (question or "").strip()
-    print("🔥 _run_agent_with_fallback CALLED")
-    print("question =", q)
+SIMULATE_MAX_SCENARIOS = int(os.getenv("SIMULATE_MAX_SCENARIOS", "10000"))
 
-    try:
-        print("🔥 TRY ask_agent")
-        res = ask_agent(q)
-        print("✅ ask_agent SUCCESS")
-        return {"mode": "agent_llm", "result": res}
-    except Exception as e:
-        print("🔥 ask_agent FAILED:", str(e))
-        traceback.print_exc()
-
-    q_lower = q.lower()
-    multi_keywords = ["performance", "business", "overall", "drop", "why"]
-    if any(k in q_lower for k in multi_keywords):
-        print("🔥 USING multi_metric_fallback")
-        metrics = ["revenue", "orders", "customers", "aov"]
-        outputs = []
-
-        for m in metrics:
-            print("fallback metric =", m)
-            legacy_payload = AskRequest(
-                question=f"{m} last_3_months executive",
-                style="executive",
-            )
-            outputs.append(_ask_legacy_core(legacy_payload))
 
-        driver_summary = build_driver_summary(outputs)
-        decision = build_decision_signals(driver_summary)
+class SimulationBatchRequest(BaseModel):
+    orders_delta_pct: Optional[List[float]] = Field(
+        default=None, description="Grid rows, e.g. [-0.1, 0, 0.1] (use with aov_delta_pct)"
+    )
+    aov_delta_pct: Optional[List[float]] = Field(
+        default=None, description="Grid columns, e.g. [-0.05, 0, 0.05] (use with orders_delta_pct)"
+    )
+    scenarios: Optional[List[SimulationRequest]] = Field(
+        default=None, description="Explicit scenario list (instead of a grid)"
+    )
 
-        final_report = build_final_report(
-            {
-                "mode": "multi_metric_fallback",
-                "style": "executive",
-                "driver_summary": driver_summary,
-                "decision": decision,
-                "metrics": metrics,
-            }
-        )
 
-        return {
+MULTI_METRICS = ["revenue", "orders", "customers", "aov"]
+MULTI_KEYWORDS = ["performance", "business", "overall", "drop", "why"]
+
+
+def _wants_multi_metric(question: str) -> bool:
+    q_lower = (question or "").lower()
+    return any(k in q_lower for k in MULTI_KEYWORDS)
+
+
+def _leg_request(metric: str) -> AskRequest:
+    return AskRequest(
+        question=f"{metric} last_3_months executive",
+        style="executive",
+    )
+
+
+def _multi_metric_payload(metrics: list, outputs: list, failed_legs: list) -> dict:
+    set_request_mode("multi_metric_fallback")
+    driver_summary = build_driver_summary(outputs)
+    decision = build_decision_signals(driver_summary)
+
+    final_report = build_final_report(
+        {
             "mode": "multi_metric_fallback",
-            "metrics": metrics,
+            "style": "executive",
             "driver_summary": driver_summary,
             "decision": decision,
-            "final_report": final_report,
-            "results": outputs,
+            "metrics": metrics,
         }
+    )
 
-    print("🔥 USING fallback_legacy")
-    legacy_payload = AskRequest(question=q, style="executive")
-    legacy = _ask_legacy_core(legacy_payload)
+    return {
+        "mode": "multi_metric_fallback",
+        "metrics": metrics,
+        "driver_summary": driver_summary,
+        "decision": decision,
+        "final_report": final_report,
+        "results": outputs,
+        "failed_legs": failed_legs,
+    }
+
+
+def _fallback_legacy_payload(legacy: dict) -> dict:
+    set_request_mode("fallback_legacy")
     final_report = build_final_report({"mode": "fallback_legacy", "legacy": legacy})
 
     return {
@@ -124,39 +147,95 @@ def _run_agent_with_fallback(question: str) -> dict:
     }
 
 
-def _ask_legacy_core(payload: AskRequest) -> dict:
+def _log_agent_failure(e: Exception) -> None:
+    # Expected whenever the LLM is unavailable (quota, no key): one line, traceback only at DEBUG.
+    log.warning(
+        "ask_agent failed; using fallback",
+        exc_info=log.isEnabledFor(logging.DEBUG),
+        extra={"error": str(e)[:200]},
+    )
+
+
+def _log_narrative_failure(e: Exception, metric: str) -> None:
+    log.warning(
+        "build_llm_narrative failed; using rule-based narrative",
+        exc_info=log.isEnabledFor(logging.DEBUG),
+        extra={"metric": metric, "error": str(e)[:200]},
+    )
+
+
+def _run_agent_with_fallback(question: str) -> dict:
     """
-    Core legacy path (no FastAPI response models) – returns plain dict.
+    Tries OpenAI agent first; if quota/error happens, falls back to legacy KPI analysis.
+    Always returns a consistent payload with mode + final_report.
     """
-    print("🔥 _ask_legacy_core CALLED")
-    print("legacy question =", payload.question)
+    q = (question or "").strip()
 
-    parsed = parse_question(payload.question, style=payload.style)
-    print("parsed =", parsed)
+    try:
+        res = ask_agent(q)
+        set_request_mode("agent_llm")
+        return {"mode": "agent_llm", "result": res}
+    except Exception as e:
+        _log_agent_failure(e)
 
-    sql = build_metric_sql(metric=parsed["metric"], range_=parsed["range"])
-    print("legacy sql =", sql)
+    if _wants_multi_metric(q):
+        log.debug("agent fallback", extra={"mode": "multi_metric_fallback", "question_len": len(q)})
+        # Every leg builds the same kpi_monthly SELECT; read it once and share the rows.
+        fetch_plan = FetchPlan()
 
-    rows = fetch_metric_rows(sql)
-    print("legacy rows count =", len(rows) if hasattr(rows, "__len__") else "unknown")
+        def _leg(m: str) -> dict:
+            return _ask_legacy_core(_leg_request(m), fetch_plan=fetch_plan)
+
+        with stage("fallback_legs"):
+            outputs, failed_legs = run_metric_legs(_leg, MULTI_METRICS)
+        return _multi_metric_payload(MULTI_METRICS, outputs, failed_legs)
+
+    log.debug("agent fallback", extra={"mode": "fallback_legacy", "question_len": len(q)})
+    legacy_payload = AskRequest(question=q, style="executive")
+    legacy = _ask_legacy_core(legacy_payload)
+    return _fallback_legacy_payload(legacy)
+
+
+async def _run_agent_with_fallback_async(question: str) -> dict:
+    """
+    Async _run_agent_with_fallback(): same modes and payloads, but LLM calls are
+    awaited and DB reads run on the DB executor, so a slow LLM request holds no thread.
+    """
+    q = (question or "").strip()
 
     try:
-        narrative, risk, recommendation = build_llm_narrative(
-            parsed["metric"],
-            rows,
-            style=parsed["style"],
-        )
-        print("✅ build_llm_narrative SUCCESS")
+        res = await ask_agent_async(q)
+        set_request_mode("agent_llm")
+        return {"mode": "agent_llm", "result": res}
     except Exception as e:
-        print("🔥 build_llm_narrative FAILED:", str(e))
-        traceback.print_exc()
-        narrative, risk, recommendation = build_narrative(
-            parsed["metric"],
-            rows,
-            style=parsed["style"],
-        )
-        print("✅ build_narrative fallback SUCCESS")
+        _log_agent_failure(e)
+
+    if _wants_multi_metric(q):
+        log.debug("agent fallback", extra={"mode": "multi_metric_fallback", "question_len": len(q)})
+        fetch_plan = FetchPlan()
+
+        async def _leg(m: str) -> dict:
+            return await _ask_legacy_core_async(_leg_request(m), fetch_plan=fetch_plan)
 
+        with stage("fallback_legs"):
+            outputs, failed_legs = await run_metric_legs_async(_leg, MULTI_METRICS)
+        return _multi_metric_payload(MULTI_METRICS, outputs, failed_legs)
+
+    log.debug("agent fallback", extra={"mode": "fallback_legacy", "question_len": len(q)})
+    legacy_payload = AskRequest(question=q, style="executive")
+    legacy = await _ask_legacy_core_async(legacy_payload)
+    return _fallback_legacy_payload(legacy)
+
+
+def _legacy_result(
+    payload: AskRequest,
+    parsed: dict,
+    sql: str,
+    rows: list,
+    narrative: str,
+    risk: str,
+    recommendation: str,
+) -> dict:
     return {
         "question": payload.question,
         "parsed": parsed,
@@ -173,6 +252,65 @@ def _ask_legacy_core(payload: AskRequest) -> dict:
     }
 
 
+def _ask_legacy_core(payload: AskRequest, fetch_plan: Optional[FetchPlan] = None) -> dict:
+    """
+    Core legacy path (no FastAPI response models) – returns plain dict.
+    fetch_plan: optional request-scoped FetchPlan shared by multi-metric legs.
+    """
+    parsed = parse_question(payload.question, style=payload.style)
+    sql = build_metric_sql(metric=parsed["metric"], range_=parsed["range"])
+
+    with stage("legacy_sql"):
+        rows = fetch_plan.rows(sql) if fetch_plan is not None else fetch_metric_rows(sql)
+    log.debug("legacy rows", extra={"metric": parsed["metric"], "range": parsed["range"], "rows": len(rows)})
+
+    try:
+        with stage("llm_narrative"):
+            narrative, risk, recommendation = build_llm_narrative(
+                parsed["metric"],
+                rows,
+                style=parsed["style"],
+            )
+    except Exception as e:
+        _log_narrative_failure(e, parsed["metric"])
+        with stage("narrative"):
+            narrative, risk, recommendation = build_narrative(
+                parsed["metric"],
+                rows,
+                style=parsed["style"],
+            )
+
+    return _legacy_result(payload, parsed, sql, rows, narrative, risk, recommendation)
+
+
+async def _ask_legacy_core_async(payload: AskRequest, fetch_plan: Optional[FetchPlan] = None) -> dict:
+    """Awaitable _ask_legacy_core()."""
+    parsed = parse_question(payload.question, style=payload.style)
+    sql = build_metric_sql(metric=parsed["metric"], range_=parsed["range"])
+
+    fetch = fetch_plan.rows if fetch_plan is not None else fetch_metric_rows
+    with stage("legacy_sql"):
+        rows = await run_in_db_executor(fetch, sql)
+
+    try:
+        with stage("llm_narrative"):
+            narrative, risk, recommendation = await build_llm_narrative_async(
+                parsed["metric"],
+                rows,
+                style=parsed["style"],
+            )
+    except Exception as e:
+        _log_narrative_failure(e, parsed["metric"])
+        with stage("narrative"):
+            narrative, risk, recommendation = build_narrative(
+                parsed["metric"],
+                rows,
+                style=parsed["style"],
+            )
+
+    return _legacy_result(payload, parsed, sql, rows, narrative, risk, recommendation)
+
+
 def _build_debug_trace(question: str) -> dict:
     """
     Product-grade debug trace.
@@ -204,9 +342,7 @@ def _build_debug_trace(question: str) -> dict:
     except Exception as e:
         trace["steps"].append({"name": "ask_agent", "status": "failed", "error": str(e)[:200]})
 
-    q_lower = q.lower()
-    multi_keywords = ["performance", "business", "overall", "drop", "why"]
-    if any(k in q_lower for k in multi_keywords):
+    if _wants_multi_metric(q):
         trace["mode"] = "multi_metric_fallback"
         trace["steps"].append({"name": "fallback_decision", "status": "ok", "reason": "multi_keywords_match"})
         return trace
@@ -216,73 +352,127 @@ def _build_debug_trace(question: str) -> dict:
     return trace
 
 
+def _log_agent(question: str, mode: Optional[str], latency_ms: int, status: str = "ok") -> None:
+    # Queued for the background log sink: no DB round trip in the request.
+    with stage("agent_log"):
+        enqueue_agent_log(question=question, mode=mode or "unknown", latency_ms=latency_ms, status=status)
+
+
 def _run_job(job_id: str, question: str):
     try:
         set_job_running(job_id)
         result = _run_agent_with_fallback(question)
-        set_job_result(job_id, jsonable_encoder(result))
+        set_job_result(job_id, result)
     except Exception as e:
         set_job_error(job_id, str(e))
 
 
 @router.post("/ask-text", summary="Ask (text/plain)")
-def ask_text(question: str = Body(..., media_type="text/plain")):
+async def ask_text(question: str = Body(..., media_type="text/plain")):
     request_id = new_request_id()
     t0 = time.time()
 
-    payload = _run_agent_with_fallback(question)
+    payload = await _run_agent_with_fallback_async(question)
     latency_ms = int((time.time() - t0) * 1000)
 
-    try:
-        insert_agent_log(
-            {
-                "request_id": request_id,
-                "question": question,
-                "mode": payload.get("mode"),
-                "status": "ok",
-                "latency_ms": latency_ms,
-            }
-        )
-    except Exception:
-        pass
+    _log_agent(question, payload.get("mode"), latency_ms)
 
     payload.update({"request_id": request_id, "latency_ms": latency_ms})
-    return jsonable_encoder(payload)
+    return FastJSONResponse(payload)
+
+
+def _columnar_results(result: dict) -> dict:
+    """Swap agent results ({metric: ColumnarResult}) for their columnar wire shape."""
+    inner = result.get("result")
+    if isinstance(inner, dict) and isinstance(inner.get("results"), dict):
+        inner["results"] = {
+            metric: rows.to_columnar() if hasattr(rows, "to_columnar") else rows
+            for metric, rows in inner["results"].items()
+        }
+    return result
 
 
 @router.post("/agent/query", summary="Agent Query (JSON)")
-def agent_query(payload: AgentQueryJSON):
+async def agent_query(
+    payload: AgentQueryJSON,
+    format: Literal["rows", "columnar"] = Query(
+        "rows",
+        description='"columnar": per-metric results as {"columns": [...], "data": {column: [values]}} '
+        "(dates as epoch days, repeated strings dictionary-encoded) instead of a row list",
+    ),
+):
     request_id = new_request_id()
     t0 = time.time()
 
-    result = _run_agent_with_fallback(payload.question)
+    result = await _run_agent_with_fallback_async(payload.question)
     latency_ms = int((time.time() - t0) * 1000)
 
+    _log_agent(payload.question, result.get("mode"), latency_ms)
+
+    if format == "columnar":
+        _columnar_results(result)
+    result.update({"request_id": request_id, "latency_ms": latency_ms})
+    return FastJSONResponse(result)
+
+
+def _ndjson(obj: dict) -> bytes:
+    return dumps(obj) + b"\n"
+
+
+def _ndjson_lines(events, request_id: str, t0: float):
+    """Encode agent events as NDJSON, one line per event (rows are never held beyond one chunk)."""
+    rows = 0
     try:
-        insert_agent_log(
-            {
-                "request_id": request_id,
-                "question": payload.question,
-                "mode": result.get("mode"),
-                "status": "ok",
-                "latency_ms": latency_ms,
-            }
+        for event in events:
+            if event["type"] == "rows":
+                rows += len(event["rows"])
+            yield _ndjson({**event, "request_id": request_id})
+    except Exception as e:
+        yield _ndjson({"type": "error", "request_id": request_id, "error": str(e)[:200]})
+        return
+    latency_ms = int((time.time() - t0) * 1000)
+    yield _ndjson({"type": "end", "request_id": request_id, "rows": rows, "latency_ms": latency_ms})
+
+
+@router.post("/agent/query/stream", summary="Agent Query (NDJSON stream, no summary)")
+async def agent_query_stream(payload: AgentQueryJSON):
+    """
+    Streams the agent's query results as application/x-ndjson:
+    a "plan" line, "rows" lines per fetched chunk, a "metric_end" line per metric,
+    then "end" (or "error"). Rows come from a server-side cursor, so memory stays
+    flat regardless of result size. No LLM summary and no legacy fallback.
+    """
+    request_id = new_request_id()
+    t0 = time.time()
+
+    try:
+        plan, queries = await plan_agent_queries(payload.question)
+    except Exception as e:
+        error = {"type": "error", "request_id": request_id, "stage": "plan", "error": str(e)[:200]}
+        return StreamingResponse(
+            iter([_ndjson(error)]), media_type="application/x-ndjson", headers={"X-Request-ID": request_id}
         )
-    except Exception:
-        pass
 
-    result.update({"request_id": request_id, "latency_ms": latency_ms})
-    return jsonable_encoder(result)
+    return StreamingResponse(
+        _ndjson_lines(stream_agent_results(plan, queries), request_id, t0),
+        media_type="application/x-ndjson",
+        headers={"X-Request-ID": request_id},
+    )
 
 
 @router.post("/agent/query-async", summary="Agent Query Async (returns job_id)")
-def agent_query_async(payload: AgentQueryJSON, background_tasks: BackgroundTasks):
+def agent_query_async(payload: AgentQueryJSON):
     job = create_job({"type": "agent_query", "input": {"question": payload.question}})
     job_id = job["job_id"]
 
-    background_tasks.add_task(_run_job, job_id, payload.question)
+    # queue mode: the row is the job; a `python -m api.worker` process claims it.
+    if JOB_QUEUE_MODE != "queue" and not submit_job(
+        _run_job, job_id, payload.question, on_cancel=lambda: set_job_error(job_id, "cancelled: server shutting down")
+    ):
+        set_job_error(job_id, "job queue full")
+        raise HTTPException(status_code=503, detail="Too many queued jobs; retry later.")
 
-    return jsonable_encoder(
+    return FastJSONResponse(
         {
             "status": "accepted",
             "job_id": job_id,
@@ -292,23 +482,22 @@ def agent_query_async(payload: AgentQueryJSON, background_tasks: BackgroundTasks
 
 
 @router.post("/ask-executive", summary="Executive Report Only")
-def ask_executive(payload: AgentQueryJSON):
+async def ask_executive(payload: AgentQueryJSON):
     """
     Returns ONLY the executive final_report string (clean CFO-style output).
+    Identical questions in flight at the same time share one agent run.
     """
-    print("🔥 ask_executive ROUTE CALLED")
-    print("question =", payload.question)
-
     request_id = new_request_id()
     t0 = time.time()
 
+    key = (normalize_question(payload.question), data_version(), "executive")
     try:
-        full = _run_agent_with_fallback(payload.question)
-        print("full keys =", list(full.keys()) if isinstance(full, dict) else type(full).__name__)
-    except Exception as e:
-        print("🔥 ask_executive ERROR:", str(e))
-        traceback.print_exc()
+        full = await single_flight(key, lambda: _run_agent_with_fallback_async(payload.question))
+    except Exception:
+        log.error("ask_executive failed", exc_info=True)
         raise
+    # Coalesced callers did not run the agent themselves; tag them with the shared mode.
+    set_request_mode(full.get("mode"))
 
     latency_ms = int((time.time() - t0) * 1000)
 
@@ -319,20 +508,9 @@ def ask_executive(payload: AgentQueryJSON):
         else:
             final_report = full.get("result")
 
-    try:
-        insert_agent_log(
-            {
-                "request_id": request_id,
-                "question": payload.question,
-                "mode": full.get("mode"),
-                "status": "ok",
-                "latency_ms": latency_ms,
-            }
-        )
-    except Exception:
-        pass
+    _log_agent(payload.question, full.get("mode"), latency_ms)
 
-    return jsonable_encoder(
+    return FastJSONResponse(
         {
             "request_id": request_id,
             "mode": full.get("mode"),
@@ -344,7 +522,7 @@ def ask_executive(payload: AgentQueryJSON):
 
 @router.get("/agent/history", summary="Agent Query History")
 def agent_history(limit: int = 20):
-    return jsonable_encoder({"data": fetch_agent_history(limit=limit)})
+    return FastJSONResponse({"data": fetch_agent_history(limit=limit)})
 
 
 @router.post("/agent/debug", summary="Debug trace (no chain-of-thought)")
@@ -355,7 +533,7 @@ def agent_debug(payload: AgentQueryJSON):
     trace = _build_debug_trace(payload.question)
     latency_ms = int((time.time() - t0) * 1000)
 
-    return jsonable_encoder(
+    return FastJSONResponse(
         {
             "request_id": request_id,
             "latency_ms": latency_ms,
@@ -368,7 +546,7 @@ def agent_debug(payload: AgentQueryJSON):
 def agent_explain():
     changes = compute_latest_kpi_changes()
     if changes.get("status") != "ok":
-        return jsonable_encoder(changes)
+        return FastJSONResponse(changes)
 
     months = changes["months"]
     base, target = months[0], months[1]
@@ -376,7 +554,7 @@ def agent_explain():
     def pct(prev, cur):
         return (cur - prev) / prev if (prev is not None and cur is not None and prev != 0) else None
 
-    return jsonable_encoder(
+    return FastJSONResponse(
         {
             "status": "ok",
             "previous_month": base.get("month"),
@@ -402,9 +580,18 @@ def agent_explain():
 
 
 @router.post("/agent/insight", summary="Auto anomaly detection on latest KPI changes")
-def agent_insight(payload: InsightRequest):
+def agent_insight(
+    payload: InsightRequest,
+    mode: Literal["monthly", "streaming"] = Query(
+        "monthly",
+        description='"monthly": latest two kpi_monthly rows vs pct thresholds; '
+        '"streaming": per-day EWMA / robust / weekday z-scores over demo_sales_daily series',
+    ),
+):
+    if mode == "streaming":
+        return FastJSONResponse(streaming_insight(payload.z_threshold))
     changes = compute_latest_kpi_changes()
-    return jsonable_encoder(detect_anomalies(changes, thresholds=payload.thresholds))
+    return FastJSONResponse(detect_anomalies(changes, thresholds=payload.thresholds))
 
 
 @router.post("/agent/simulate", summary="What-if simulation (Orders/AOV -> Revenue)")
@@ -415,4 +602,27 @@ def agent_simulate(payload: SimulationRequest):
         "aov_delta_pct": payload.aov_delta_pct,
         "customers_delta_pct": payload.customers_delta_pct,
     }
-    return jsonable_encoder(simulate_kpi_what_if(changes, scenario))
\ No newline at end of file
+    return FastJSONResponse(simulate_kpi_what_if(changes, scenario))
+
+
+@router.post("/agent/simulate/batch", summary="What-if simulation over a grid or list of scenarios")
+def agent_simulate_batch(payload: SimulationBatchRequest):
+    """
+    One base-month read for many scenarios. Either a grid (orders_delta_pct x
+    aov_delta_pct -> row-major flattened matrices) or an explicit scenario list
+    (results column-wise, in input order).
+    """
+    grid = payload.orders_delta_pct is not None or payload.aov_delta_pct is not None
+    if grid == (payload.scenarios is not None):
+        raise HTTPException(status_code=422, detail="Send either orders_delta_pct + aov_delta_pct or scenarios.")
+    if grid and (not payload.orders_delta_pct or not payload.aov_delta_pct):
+        raise HTTPException(status_code=422, detail="A grid needs both orders_delta_pct and aov_delta_pct.")
+
+    size = len(payload.orders_delta_pct) * len(payload.aov_delta_pct) if grid else len(payload.scenarios)
+    if size > SIMULATE_MAX_SCENARIOS:
+        raise HTTPException(status_code=400, detail=f"Too many scenarios (max {SIMULATE_MAX_SCENARIOS}).")
+
+    changes = compute_latest_kpi_changes()
+    if grid:
+        return FastJSONResponse(simulate_kpi_grid(changes, payload.orders_delta_pct, payload.aov_delta_pct))
+    return FastJSONResponse(simulate_kpi_scenarios(changes, [s.model_dump() for s in payload.scenarios]))
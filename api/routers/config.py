@@ -1,7 +1,15 @@
 import os
 from fastapi import APIRouter
 
-from api.app.db import get_conn
+from api.app.db import get_conn, pool_stats
+from api.app.services.job_runner import job_runner_stats
+from api.app.services.job_store import JOB_QUEUE_MODE, job_store_stats
+from api.app.services.kpi_cache import kpi_cache_stats
+from api.app.services.log_sink import log_sink_stats
+from api.app.services.single_flight import single_flight_stats
+from api.app.utils.log import log_stats
+from api.db.engines import engine_stats
+from api.llm.cache import cache_stats
 
 router = APIRouter(tags=["meta"])
 
@@ -24,4 +32,12 @@ def config_status():
         "db_ok": _db_ok(),
         "cors_origins": cors_origins,
         "env": os.getenv("APP_ENV", "dev"),
+        "db_pool": pool_stats(),
+        "db_engines": engine_stats(),
+        "llm_cache": cache_stats(),
+        "kpi_cache": kpi_cache_stats(),
+        "jobs": {"mode": JOB_QUEUE_MODE, "store": job_store_stats(), "runner": job_runner_stats()},
+        "logging": log_stats(),
+        "log_sink": log_sink_stats(),
+        "single_flight": single_flight_stats(),
     }
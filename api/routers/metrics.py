@@ -0,0 +1,45 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from api.app.db import pool_stats
+from api.app.services.job_runner import job_runner_stats
+from api.app.services.job_store import job_store_stats
+from api.app.services.kpi_cache import kpi_cache_stats
+from api.app.services.log_sink import log_sink_stats
+from api.app.services.single_flight import single_flight_stats
+from api.app.utils.log import log_stats
+from api.app.utils.metrics import register_gauges, render_prometheus
+from api.db.engines import engine_stats
+from api.llm.cache import cache_stats
+
+router = APIRouter(tags=["meta"])
+
+# Monotonic totals in each stats() dict (exported as *_total counters); the rest are gauges.
+POOL_COUNTERS = (
+    "checkouts",
+    "connections_created",
+    "connections_reused",
+    "connections_discarded",
+    "health_check_failures",
+    "overflow_checkouts",
+    "waits",
+    "wait_ms_total",
+    "timeouts",
+)
+CACHE_COUNTERS = ("hits", "misses", "stores", "errors", "evictions")
+
+register_gauges("db_pool", pool_stats, label="pool", counters=POOL_COUNTERS)
+register_gauges("db_engine", engine_stats, label="engine")
+register_gauges("llm_cache", cache_stats, label="namespace", counters=CACHE_COUNTERS)
+register_gauges("kpi_cache", kpi_cache_stats, counters=("hits", "misses", "bumps"))
+register_gauges("job_runner", job_runner_stats, counters=("submitted", "rejected", "failed", "cancelled"))
+register_gauges("job_store", job_store_stats, counters=("evicted",))
+register_gauges("log", log_stats, counters=("dropped", "sampled_out"))
+register_gauges("log_sink", log_sink_stats, counters=("submitted", "dropped", "written", "batches", "failed"))
+register_gauges("single_flight", single_flight_stats, counters=("leaders", "coalesced"))
+
+
+@router.get("/metrics", include_in_schema=False)
+def metrics():
+    """Prometheus text exposition (unauthenticated, like /health)."""
+    return PlainTextResponse(render_prometheus(), media_type="text/plain; version=0.0.4")
@@ -0,0 +1,32 @@
+from datetime import date
+from typing import Optional
+
+from fastapi import APIRouter
+
+from api.app.services.kpi_cache import bump_data_version
+from api.app.services.kpi_derivation import derive_kpi_monthly
+from api.app.services.rollup_service import refresh_rollups, rollup_coverage
+
+router = APIRouter(prefix="/rollups", tags=["rollups"])
+
+
+@router.get("", summary="Rollup coverage used by the agent SQL builder")
+def rollups_status():
+    return {
+        "coverage": {
+            grain: {"start": str(s), "end_exclusive": str(e)}
+            for grain, (s, e) in rollup_coverage().items()
+        }
+    }
+
+
+@router.post("/refresh", summary="Refresh weekly/monthly rollups after new days land")
+def rollups_refresh(start: Optional[date] = None, end: Optional[date] = None, full: bool = False):
+    result = refresh_rollups(start, end, full=full)
+    bump_data_version()
+    return result
+
+
+@router.post("/kpi-monthly", summary="Recompute kpi_monthly for months with new daily rows")
+def rollups_kpi_monthly():
+    return derive_kpi_monthly()
@@ -5,10 +5,13 @@ from typing import List
 
 from fastapi import APIRouter
 
-from api.app.services.kpi_service import upsert_kpi
+from api.app.services.kpi_service import upsert_kpi_bulk
 from api.app.db import get_conn
+from api.app.services.kpi_cache import bump_data_version
+from api.app.utils.log import get_logger
 
 router = APIRouter(tags=["seed-demo"])
+log = get_logger(__name__)
 
 
 def _month_start(d: date) -> date:
@@ -41,6 +44,7 @@ def _delete_kpi_months(months: List[date]) -> int:
                 (months,),
             )
         conn.commit()
+        bump_data_version()
         return len(months)
     finally:
         conn.close()
@@ -69,7 +73,7 @@ def seed_demo(months: int = 6, reset: bool = False, scenario: str = "revenue_dro
         base_orders = 1200
         base_customers = 800
 
-        inserted = 0
+        rows = []
         for idx, m in enumerate(month_list):
             revenue = base_revenue * (1.0 + 0.03 * idx)
             orders = int(base_orders * (1.0 + 0.02 * idx))
@@ -85,14 +89,17 @@ def seed_demo(months: int = 6, reset: bool = False, scenario: str = "revenue_dro
 
             aov = revenue / max(orders, 1)
 
-            upsert_kpi(
-                month=m,
-                revenue=float(round(revenue, 2)),
-                orders=int(orders),
-                customers=int(customers),
-                aov=float(round(aov, 2)),
+            rows.append(
+                {
+                    "month": m,
+                    "revenue": float(round(revenue, 2)),
+                    "orders": int(orders),
+                    "customers": int(customers),
+                    "aov": float(round(aov, 2)),
+                }
             )
-            inserted += 1
+
+        inserted = upsert_kpi_bulk(rows)["upserted"]
 
         return {
             "status": "ok",
@@ -104,7 +111,5 @@ def seed_demo(months: int = 6, reset: bool = False, scenario: str = "revenue_dro
         }
 
     except Exception as e:
-        import traceback
-        print("🔥 ERROR:", str(e))
-        traceback.print_exc()
+        log.error("seed_demo failed", exc_info=True)
         return {"error": str(e)}
\ No newline at end of file
@@ -0,0 +1,141 @@
+"""
+Standalone job worker for JOB_QUEUE_MODE=queue.
+
+Claims agent_jobs rows (api.app.services.job_queue), runs up to --concurrency of
+them at once and heartbeats their leases until they finish. Run any number of
+these, on any node, against the same DATABASE_URL:
+
+    PYTHONPATH=. python -m api.worker --concurrency 4
+
+SIGINT/SIGTERM stop claiming new jobs; running jobs are allowed to finish.
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import signal
+import socket
+import sys
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional, Set
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+from api.app.services.job_queue import (  # noqa: E402 - after load_dotenv
+    JOB_HEARTBEAT_S,
+    claim_jobs,
+    complete_job,
+    fail_exhausted_jobs,
+    fail_job,
+    heartbeat,
+)
+from api.app.services.log_sink import shutdown_log_sink  # noqa: E402
+from api.app.utils.log import get_logger, shutdown_logging  # noqa: E402
+
+log = get_logger("api.worker")
+
+
+def _agent_query(job_input: Dict[str, Any]) -> Any:
+    # Same code path as the in-process runner (JOB_QUEUE_MODE=local).
+    from api.routers.ask_text import _run_agent_with_fallback
+
+    return _run_agent_with_fallback(job_input.get("question", ""))
+
+
+JOB_HANDLERS: Dict[str, Callable[[Dict[str, Any]], Any]] = {
+    "agent_query": _agent_query,
+}
+
+
+class Worker:
+    def __init__(self, concurrency: int, poll_interval: float, worker_id: Optional[str] = None):
+        self.concurrency = max(1, concurrency)
+        self.poll_interval = poll_interval
+        self.worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+        self._executor = ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="worker")
+        self._running: Set[str] = set()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._drained = threading.Event()
+
+    def _run(self, job: Dict[str, Any]) -> None:
+        job_id = job["job_id"]
+        payload = job["payload"]
+        try:
+            handler = JOB_HANDLERS.get(payload.get("type"))
+            if handler is None:
+                fail_job(job_id, self.worker_id, f"unknown job type: {payload.get('type')!r}")
+                return
+            result = handler(payload.get("input") or {})
+            if not complete_job(job_id, self.worker_id, result):
+                log.warning("lease lost; result discarded", extra={"worker_id": self.worker_id, "job_id": job_id})
+        except Exception as e:
+            log.error("job failed", exc_info=True, extra={"worker_id": self.worker_id, "job_id": job_id})
+            fail_job(job_id, self.worker_id, str(e)[:500])
+        finally:
+            with self._lock:
+                self._running.discard(job_id)
+
+    def _heartbeat_loop(self) -> None:
+        while not self._drained.wait(JOB_HEARTBEAT_S):
+            with self._lock:
+                running = list(self._running)
+            try:
+                heartbeat(self.worker_id, running)
+            except Exception:
+                log.error("heartbeat failed", exc_info=True, extra={"worker_id": self.worker_id})
+
+    def run_once(self) -> int:
+        """Claim as many jobs as there are free slots and start them; returns how many."""
+        with self._lock:
+            free = self.concurrency - len(self._running)
+        jobs = claim_jobs(self.worker_id, free)
+        for job in jobs:
+            with self._lock:
+                self._running.add(job["job_id"])
+            self._executor.submit(self._run, job)
+        return len(jobs)
+
+    def run(self) -> None:
+        beat = threading.Thread(target=self._heartbeat_loop, name="worker-heartbeat", daemon=True)
+        beat.start()
+        log.info("worker started", extra={"worker_id": self.worker_id, "concurrency": self.concurrency})
+        while not self._stop.is_set():
+            try:
+                fail_exhausted_jobs()
+                claimed = self.run_once()
+            except Exception:
+                log.error("claim failed", exc_info=True, extra={"worker_id": self.worker_id})
+                claimed = 0
+            if not claimed:
+                self._stop.wait(self.poll_interval)
+        # Keep heartbeating until the running jobs finish.
+        self._executor.shutdown(wait=True)
+        self._drained.set()
+
+    def stop(self, *_: Any) -> None:
+        self._stop.set()
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m api.worker")
+    parser.add_argument("--concurrency", type=int, default=int(os.getenv("JOB_WORKERS", "4")))
+    parser.add_argument("--poll-interval", type=float, default=float(os.getenv("JOB_POLL_INTERVAL_S", "1.0")))
+    args = parser.parse_args(argv)
+
+    worker = Worker(args.concurrency, args.poll_interval)
+    signal.signal(signal.SIGINT, worker.stop)
+    signal.signal(signal.SIGTERM, worker.stop)
+    worker.run()
+    # Rows the jobs queued for agent_query_log / analysis_log: write them before exiting.
+    shutdown_log_sink()
+    shutdown_logging()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,131 @@
+"""
+In-process load test: sync vs async /v1 agent path under slow LLM calls.
+
+The OpenAI clients and the SQL runner are replaced by fakes with a fixed
+latency, so the numbers isolate the request-execution model:
+
+- sync:  the old `def` handler -> _run_agent_with_fallback on Starlette's threadpool
+         (capped at 40 threads per worker)
+- async: `async def` handler -> _run_agent_with_fallback_async on the event loop
+
+Usage:
+    PYTHONPATH=. python benchmarks/agent_async_load.py --requests 400 --llm-ms 500
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import time
+
+os.environ.setdefault("OPENAI_API_KEY", "bench-key")
+os.environ.setdefault("DATABASE_URL", "sqlite:///./bench.db")
+
+import httpx  # noqa: E402
+from fastapi import FastAPI  # noqa: E402
+
+from api.app.services import agent  # noqa: E402
+from api.llm import planner, summarizer  # noqa: E402
+from api.routers import ask_text  # noqa: E402
+
+PLAN = json.dumps({"metrics": ["revenue"], "intent": "trend", "grain": "day"})
+SUMMARY = json.dumps({"executive_summary": "ok", "key_findings": [], "drivers": [], "next_actions": []})
+ROWS = [{"period": "2025-01-01", "value": 1.0}]
+
+
+class _Resp:
+    def __init__(self, text):
+        self.output_text = text
+
+
+def _fake_clients(llm_s: float, db_s: float) -> None:
+    class SyncResponses:
+        def __init__(self, text):
+            self.text = text
+
+        def create(self, **_):
+            time.sleep(llm_s)
+            return _Resp(self.text)
+
+    class AsyncResponses(SyncResponses):
+        async def create(self, **_):
+            await asyncio.sleep(llm_s)
+            return _Resp(self.text)
+
+    class Client:
+        def __init__(self, responses):
+            self.responses = responses
+
+    planner.client = Client(SyncResponses(PLAN))
+    planner.async_client = Client(AsyncResponses(PLAN))
+    summarizer.client = Client(SyncResponses(SUMMARY))
+    summarizer.async_client = Client(AsyncResponses(SUMMARY))
+
+    def run_sql(sql, params):
+        time.sleep(db_s)
+        return list(ROWS)
+
+    async def run_sql_async(sql, params):
+        await asyncio.sleep(db_s)
+        return list(ROWS)
+
+    agent.run_sql = run_sql
+    agent.run_sql_async = run_sql_async
+
+
+def _app() -> FastAPI:
+    app = FastAPI()
+
+    @app.post("/sync")
+    def sync_route(payload: ask_text.AgentQueryJSON):
+        return ask_text._run_agent_with_fallback(payload.question)
+
+    @app.post("/async")
+    async def async_route(payload: ask_text.AgentQueryJSON):
+        return await ask_text._run_agent_with_fallback_async(payload.question)
+
+    return app
+
+
+async def _run(app: FastAPI, path: str, n: int) -> dict:
+    transport = httpx.ASGITransport(app=app)
+    latencies = []
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+
+        async def one():
+            t0 = time.perf_counter()
+            r = await client.post(path, json={"question": "revenue trend"})
+            r.raise_for_status()
+            latencies.append((time.perf_counter() - t0) * 1000)
+
+        t0 = time.perf_counter()
+        await asyncio.gather(*(one() for _ in range(n)))
+        wall = time.perf_counter() - t0
+
+    latencies.sort()
+    return {
+        "requests": n,
+        "wall_s": round(wall, 2),
+        "rps": round(n / wall, 1),
+        "p50_ms": round(statistics.median(latencies), 1),
+        "p95_ms": round(latencies[int(len(latencies) * 0.95) - 1], 1),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=400)
+    parser.add_argument("--llm-ms", type=int, default=500)
+    parser.add_argument("--db-ms", type=int, default=5)
+    args = parser.parse_args()
+
+    _fake_clients(args.llm_ms / 1000.0, args.db_ms / 1000.0)
+    app = _app()
+
+    for path in ("/sync", "/async"):
+        print(path, asyncio.run(_run(app, path, args.requests)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""
+KPI time-series results: List[Dict] rows vs api.db.columnar.ColumnarResult.
+
+Builds a long daily series with a country x category breakdown (the shape
+build_kpi_sql returns for grain=day, breakdown=[country, category]) and reports:
+- retained memory: tracemalloc size of the held result (rows list vs columnar)
+- response bytes: dumps() of the row list vs dumps(result.to_columnar())
+
+Usage:
+    PYTHONPATH=. python benchmarks/columnar_bench.py --days 1095
+"""
+import argparse
+import gc
+import json
+import tracemalloc
+from datetime import date, timedelta
+from decimal import Decimal
+
+from api.app.utils.serialization import dumps
+from api.db.columnar import ColumnarResult
+
+COUNTRIES = ["US", "CA", "KR", "JP", "BR", "DE"]
+CATEGORIES = ["electronics", "fashion", "home", "beauty"]
+
+
+def _tuples(days: int):
+    start = date(2020, 1, 1)
+    i = 0
+    for d in range(days):
+        for c in COUNTRIES:
+            for cat in CATEGORIES:
+                i += 1
+                yield (start + timedelta(days=d), c, cat, Decimal(f"{1000 + (i * 7919) % 100000}.{i % 100:02d}"))
+
+
+def _retained(build):
+    gc.collect()
+    tracemalloc.start()
+    obj = build()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return obj, size
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--days", type=int, default=1095)
+    args = parser.parse_args()
+
+    columns = ["period", "country", "category", "value"]
+    source = list(_tuples(args.days))  # stands in for the cursor; not counted
+
+    rows, rows_mem = _retained(lambda: [dict(zip(columns, t)) for t in source])
+    col, col_mem = _retained(lambda: ColumnarResult(columns, source))
+
+    rows_bytes = len(dumps(rows))
+    col_bytes = len(dumps(col.to_columnar()))
+    assert json.loads(dumps(col)) == json.loads(dumps(rows))
+
+    print(
+        json.dumps(
+            {
+                "rows": len(rows),
+                "memory_mb": {"rows": round(rows_mem / 1e6, 2), "columnar": round(col_mem / 1e6, 2)},
+                "memory_ratio": round(rows_mem / col_mem, 1),
+                "response_mb": {"rows": round(rows_bytes / 1e6, 2), "columnar": round(col_bytes / 1e6, 2)},
+                "response_ratio": round(rows_bytes / col_bytes, 1),
+            },
+            indent=2,
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+"""
+Risk scoring / trend detection: previous per-metric passes vs api.app.services.kpi_stats.
+
+old: the pre-kernel compute_risk_score + risk_visual_from_score, copied verbatim
+     (key union over all rows, then separate passes for mean, variance and the
+     last two values)
+kernel: what /v1/kpi/query runs, one series_stats() pass shared by both, over
+     List[Dict] rows and over a ColumnarResult (numeric columns read straight
+     from their arrays)
+reduce: the NumPy and pure-Python column reducers on the same column, which is
+     what KPI_STATS_NUMPY_MIN_POINTS is tuned from (needs NumPy installed)
+
+Reports best-of --repeat wall time per call.
+
+Usage:
+    PYTHONPATH=. python benchmarks/kpi_stats_bench.py --points 10000 100000 1000000
+"""
+import argparse
+import json
+import time
+from datetime import date, timedelta
+
+from api.app.services.kpi_stats import (
+    DEFAULT_WINDOW,
+    HAS_NUMPY,
+    KPI_STATS_NUMPY_MIN_POINTS,
+    _reduce_numpy,
+    _reduce_python,
+    series_stats,
+)
+from api.db.columnar import ColumnarResult
+from api.routers.kpi import RISK_METRICS, compute_risk_score, risk_visual_from_score
+
+
+def _old_risk_score(rows):
+    # compute_risk_score before the kernel (verbatim).
+    if not rows:
+        return 0.0
+    keys = set().union(*[r.keys() for r in rows])
+    if "return_rate" in keys or "late_rate" in keys:
+        rr = []
+        lr = []
+        for r in rows:
+            if "return_rate" in r and r["return_rate"] is not None:
+                rr.append(float(r["return_rate"]))
+            if "late_rate" in r and r["late_rate"] is not None:
+                lr.append(float(r["late_rate"]))
+        rr_avg = sum(rr) / len(rr) if rr else 0.0
+        lr_avg = sum(lr) / len(lr) if lr else 0.0
+        score = (rr_avg * 100 * 0.6) + (lr_avg * 100 * 0.4)
+        return max(0, min(100, score))
+    if "revenue" in keys:
+        rev = [float(r["revenue"]) for r in rows if r.get("revenue") is not None]
+        if len(rev) >= 3:
+            mean = sum(rev) / len(rev)
+            if mean > 0:
+                var = sum((x - mean) ** 2 for x in rev) / (len(rev) - 1)
+                cv = (var ** 0.5) / mean
+                return max(0, min(100, (cv - 0.05) / (0.35 - 0.05) * 100))
+    return 25.0
+
+
+def _old_arrow(rows):
+    # risk_visual_from_score's trend arrow before the kernel (verbatim).
+    arrow = "→"
+    keys = set().union(*[r.keys() for r in rows])
+    metric = None
+    if "revenue" in keys:
+        metric = "revenue"
+    elif "return_rate" in keys:
+        metric = "return_rate"
+    elif "late_rate" in keys:
+        metric = "late_rate"
+    if metric:
+        vals = [r.get(metric) for r in rows if r.get(metric) is not None]
+        if len(vals) >= 2:
+            prev = float(vals[-2])
+            last = float(vals[-1])
+            if last > prev:
+                arrow = "↑"
+            elif last < prev:
+                arrow = "↓"
+    return arrow
+
+
+def _old(rows):
+    return _old_risk_score(rows), _old_arrow(rows)
+
+
+def _kernel(rows):
+    stats = series_stats(rows, RISK_METRICS)
+    score = compute_risk_score(rows, stats)
+    return score, risk_visual_from_score(score, rows, stats).arrow
+
+
+def _best(fn, arg, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        out = fn(arg)
+        best = min(best, time.perf_counter() - t0)
+    return best, out
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--points", type=int, nargs="+", default=[10, 200, 10_000, 100_000, 1_000_000])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    start = date(2000, 1, 1)
+    report = {"numpy": HAS_NUMPY, "kpi_stats_numpy_min_points": KPI_STATS_NUMPY_MIN_POINTS, "runs": []}
+    for n in args.points:
+        rows = [
+            {"d": start + timedelta(days=i % 9000), "revenue": 1000.0 + (i * 7919) % 500, "orders": 10 + i % 7}
+            for i in range(n)
+        ]
+        col = ColumnarResult.from_rows(rows)
+
+        t_old, r_old = _best(_old, rows, args.repeat)
+        t_rows, r_rows = _best(_kernel, rows, args.repeat)
+        t_col, r_col = _best(_kernel, col, args.repeat)
+        assert r_old[1] == r_rows[1] == r_col[1] and abs(r_old[0] - r_col[0]) < 1e-6
+
+        run = {
+            "points": n,
+            "old_ms": round(t_old * 1000, 3),
+            "kernel_rows_ms": round(t_rows * 1000, 3),
+            "kernel_columnar_ms": round(t_col * 1000, 3),
+        }
+        if HAS_NUMPY:
+            values = [r["revenue"] for r in rows]
+            t_np, _ = _best(lambda v: _reduce_numpy("revenue", v, DEFAULT_WINDOW), values, args.repeat)
+            t_py, _ = _best(lambda v: _reduce_python("revenue", v, DEFAULT_WINDOW), values, args.repeat)
+            run["reduce_numpy_ms"] = round(t_np * 1000, 3)
+            run["reduce_python_ms"] = round(t_py * 1000, 3)
+        report["runs"].append(run)
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,41 @@
+"""
+Bulk-load demo_sales_daily and report throughput.
+
+Uses the configured DATABASE_URL: Postgres goes through COPY, SQLite through
+multi-row INSERTs.
+
+Usage:
+    PYTHONPATH=. python benchmarks/seed_load.py --days 3650 --countries 50 --categories 5 --sellers 4
+"""
+import argparse
+import json
+
+from api.app.services.demo_loader import load_demo_sales
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--days", type=int, default=3650)
+    parser.add_argument("--countries", type=int, default=6)
+    parser.add_argument("--categories", type=int, default=1)
+    parser.add_argument("--sellers", type=int, default=1)
+    parser.add_argument("--upsert", action="store_true", help="merge into existing rows instead of replacing")
+    parser.add_argument("--chunk-rows", type=int, default=50_000)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    stats = load_demo_sales(
+        days=args.days,
+        countries=args.countries,
+        categories=args.categories,
+        sellers=args.sellers,
+        replace=not args.upsert,
+        seed=args.seed,
+        chunk_rows=args.chunk_rows,
+    )
+    stats["countries"] = len(stats["countries"])
+    print(json.dumps(stats, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""
+Response serialization: old /v1 agent path vs api.app.utils.serialization.
+
+old: _json_safe (json.dumps(default=str) -> json.loads) -> jsonable_encoder -> JSONResponse.render
+new: FastJSONResponse.render (one pass; orjson when installed)
+
+Reports CPU time per response (best of --repeat) and the tracemalloc peak of
+Python allocations while rendering one response.
+
+Usage:
+    PYTHONPATH=. python benchmarks/serialization_bench.py --rows 50000
+"""
+import argparse
+import json
+import time
+import tracemalloc
+from datetime import date, timedelta
+from decimal import Decimal
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from api.app.utils.serialization import HAS_ORJSON, FastJSONResponse
+
+
+def _payload(n: int) -> dict:
+    countries = ["US", "CA", "KR", "JP", "BR", "DE"]
+    start = date(2020, 1, 1)
+    rows = [
+        {
+            "period": start + timedelta(days=i // len(countries)),
+            "country": countries[i % len(countries)],
+            "value": Decimal(f"{1000 + (i * 7919) % 100000}.{i % 100:02d}"),
+        }
+        for i in range(n)
+    ]
+    return {
+        "mode": "agent_llm",
+        "result": {
+            "question": "daily revenue by country",
+            "plan": {"intent": "trend", "metrics": ["revenue"], "grain": "day", "breakdown": ["country"]},
+            "results": {"revenue": rows},
+            "report": {"executive_summary": "...", "key_findings": [], "drivers": [], "next_actions": []},
+        },
+    }
+
+
+def render_old(payload: dict) -> bytes:
+    result = payload["result"]
+    safe = json.loads(json.dumps(result["results"], default=str))
+    body = {**payload, "result": {**result, "results": safe}}
+    return JSONResponse(jsonable_encoder(body)).body
+
+
+def render_new(payload: dict) -> bytes:
+    return FastJSONResponse(payload).body
+
+
+def _cpu(fn, payload, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.process_time()
+        fn(payload)
+        best = min(best, time.process_time() - t0)
+    return best
+
+
+def _memory(fn, payload):
+    tracemalloc.start()
+    body = fn(payload)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak, len(body)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=50_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    payload = _payload(args.rows)
+    print(f"rows={args.rows} orjson={HAS_ORJSON}")
+    for name, fn in (("old", render_old), ("new", render_new)):
+        cpu = _cpu(fn, payload, args.repeat)
+        peak, size = _memory(fn, payload)
+        print(f"{name:>4}: cpu {cpu * 1000:8.1f} ms/response | peak {peak / 1e6:7.1f} MB | body {size / 1e6:.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+import json
+from datetime import date
+from decimal import Decimal
+
+from fastapi.testclient import TestClient
+
+from api.app.services import agent
+from api.llm.schemas import AskPlan, DateRange
+from api.main import app
+
+client = TestClient(app)
+
+
+def test_agent_query_stream_emits_ndjson_chunks(monkeypatch):
+    async def fake_plan(question):
+        return AskPlan(
+            intent="trend",
+            metrics=["revenue"],
+            grain="day",
+            date_range=DateRange(mode="relative", preset="last_7_days"),
+            breakdown=["country"],
+        )
+
+    def fake_stream(sql, params, chunk_size=0):
+        yield [{"period": date(2025, 1, 1), "country": "US", "value": Decimal("10.50")}]
+        yield [{"period": date(2025, 1, 2), "country": "US", "value": Decimal("11.00")}]
+
+    monkeypatch.setattr(agent, "make_plan_async", fake_plan)
+    monkeypatch.setattr(agent, "run_sql_stream", fake_stream)
+
+    res = client.post("/v1/agent/query/stream", json={"question": "daily revenue by country"}, headers={"X-API-Key": "test"})
+
+    assert res.status_code == 200
+    assert res.headers["content-type"].startswith("application/x-ndjson")
+    events = [json.loads(line) for line in res.text.splitlines()]
+    assert [e["type"] for e in events] == ["plan", "rows", "rows", "metric_end", "end"]
+    assert events[1]["rows"][0] == {"period": "2025-01-01", "country": "US", "value": 10.5}
+    assert events[3]["row_count"] == 2
+    assert events[-1]["rows"] == 2
+
+
+def test_agent_query_stream_plan_error_carries_request_id(monkeypatch):
+    async def failing_plan(question):
+        raise RuntimeError("planner unavailable")
+
+    monkeypatch.setattr(agent, "make_plan_async", failing_plan)
+
+    res = client.post("/v1/agent/query/stream", json={"question": "daily revenue"}, headers={"X-API-Key": "test"})
+
+    events = [json.loads(line) for line in res.text.splitlines()]
+    assert events == [{"type": "error", "request_id": res.headers["X-Request-ID"], "stage": "plan", "error": "planner unavailable"}]
@@ -0,0 +1,31 @@
+import json
+from datetime import date
+from decimal import Decimal
+
+from api.db.columnar import ColumnarResult
+from api.app.utils.serialization import dumps
+
+
+def test_columnar_result_round_trips_rows_and_encodes_columns():
+    rows = [
+        {"period": date(2025, 1, d), "country": c, "value": Decimal("10.50"), "orders": Decimal("3")}
+        for d in (1, 2)
+        for c in ("KR", "US")
+    ]
+    result = ColumnarResult.from_rows(rows)
+
+    assert len(result) == 4
+    assert result[-1]["country"] == "US" and result[0]["period"] == date(2025, 1, 1)
+    assert json.loads(dumps({"r": result})) == json.loads(dumps({"r": rows}))
+
+    wire = json.loads(dumps(result.to_columnar()))
+    types = {c["name"]: (c["type"], c.get("encoding")) for c in wire["columns"]}
+    assert types == {
+        "period": ("date", "epoch_day"),
+        "country": ("str", "dictionary"),
+        "value": ("float", None),
+        "orders": ("int", None),
+    }
+    assert wire["data"]["period"][0] == (date(2025, 1, 1) - date(1970, 1, 1)).days
+    assert wire["data"]["country"] == [0, 1, 0, 1]
+    assert wire["data"]["orders"] == [3, 3, 3, 3]
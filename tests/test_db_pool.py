@@ -0,0 +1,80 @@
+import threading
+import time
+
+import pytest
+
+from api.app.db import ConnectionPool, PoolTimeout
+
+
+def _pool(tmp_path, **kwargs):
+    return ConnectionPool(f"sqlite:///{tmp_path / 'pool.db'}", **kwargs)
+
+
+def test_pool_reuses_connections(tmp_path):
+    pool = _pool(tmp_path, size=2, max_overflow=0)
+
+    conn = pool.acquire()
+    conn.execute("SELECT 1")
+    conn.close()
+
+    with pool.acquire(dict_cursor=True) as conn:
+        row = conn.execute("SELECT 1 AS one").fetchone()
+        assert row["one"] == 1
+
+    stats = pool.stats()
+    assert stats["checkouts"] == 2
+    assert stats["connections_created"] == 1
+    assert stats["connections_reused"] == 1
+    assert stats["in_use"] == 0
+
+
+def test_context_manager_commits_on_success_and_rolls_back_on_error(tmp_path):
+    pool = _pool(tmp_path, size=1, max_overflow=0)
+    with pool.acquire() as conn:
+        conn.execute("CREATE TABLE t (x INTEGER)")
+        conn.execute("INSERT INTO t VALUES (1)")
+
+    with pytest.raises(RuntimeError):
+        with pool.acquire() as conn:
+            conn.execute("INSERT INTO t VALUES (2)")
+            raise RuntimeError("boom")
+
+    conn = pool.acquire()
+    conn.execute("INSERT INTO t VALUES (3)")
+    conn.close()  # no commit: discarded on release
+
+    with pool.acquire() as conn:
+        assert [r[0] for r in conn.execute("SELECT x FROM t")] == [1]
+
+
+def test_pool_overflow_and_timeout(tmp_path):
+    pool = _pool(tmp_path, size=1, max_overflow=1, timeout=0.05)
+
+    a = pool.acquire()
+    b = pool.acquire()
+    assert pool.stats()["overflow_in_use"] == 1
+
+    with pytest.raises(PoolTimeout):
+        pool.acquire()
+
+    b.close()
+    a.close()
+    stats = pool.stats()
+    assert stats["timeouts"] == 1
+    assert stats["overflow_peak"] == 1
+    assert stats["idle"] == 1
+
+
+def test_pool_waiter_gets_released_connection(tmp_path):
+    pool = _pool(tmp_path, size=1, max_overflow=0, timeout=2.0)
+    held = pool.acquire()
+
+    got = []
+    t = threading.Thread(target=lambda: got.append(pool.acquire()))
+    t.start()
+    time.sleep(0.05)
+    held.close()
+    t.join()
+
+    got[0].close()
+    assert pool.stats()["waits"] == 1
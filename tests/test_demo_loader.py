@@ -0,0 +1,22 @@
+from datetime import date
+
+from sqlalchemy import text
+
+from api.app.services.demo_loader import demo_countries, load_demo_sales
+from api.db.engines import get_engine
+
+
+def test_bulk_load_replaces_then_upserts():
+    end = date(2025, 3, 31)
+
+    stats = load_demo_sales(days=30, countries=8, end=end, seed=1)
+    assert stats["rows"] == 240
+    assert stats["countries"] == demo_countries(8)
+    assert stats["rows_per_sec"] > 0
+
+    again = load_demo_sales(days=10, countries=8, end=end, seed=2, replace=False)
+    assert again["rows"] == 80
+
+    with get_engine().connect() as conn:
+        count = conn.execute(text("SELECT COUNT(*) FROM demo_sales_daily")).scalar()
+    assert count == 240
@@ -0,0 +1,38 @@
+import time
+
+import pytest
+
+from api.app.services.fallback_runner import run_metric_legs
+
+
+def test_legs_run_concurrently_and_keep_order():
+    def leg(m):
+        time.sleep(0.2)
+        return m.upper()
+
+    t0 = time.time()
+    outputs, failed = run_metric_legs(leg, ["revenue", "orders", "customers", "aov"])
+    assert time.time() - t0 < 0.6
+    assert outputs == ["REVENUE", "ORDERS", "CUSTOMERS", "AOV"]
+    assert failed == []
+
+
+def test_partial_results_on_error_and_timeout():
+    def leg(m):
+        if m == "orders":
+            raise ValueError("boom")
+        if m == "aov":
+            time.sleep(1.0)
+        return m
+
+    outputs, failed = run_metric_legs(leg, ["revenue", "orders", "aov"], timeout_s=0.2)
+    assert outputs == ["revenue"]
+    assert {f["metric"] for f in failed} == {"orders", "aov"}
+
+
+def test_all_legs_failed_raises():
+    def leg(m):
+        raise ValueError(m)
+
+    with pytest.raises(RuntimeError):
+        run_metric_legs(leg, ["revenue", "orders"])
@@ -0,0 +1,26 @@
+import threading
+import time
+
+from api.app.services.fallback_runner import run_metric_legs
+from api.app.services.fetch_plan import FetchPlan
+
+
+def test_identical_sql_runs_once_across_concurrent_legs():
+    calls = []
+    lock = threading.Lock()
+
+    def fetch(sql):
+        with lock:
+            calls.append(sql)
+        time.sleep(0.05)
+        return [{"month": "2025-12-01", "revenue": 1.0}]
+
+    plan = FetchPlan(fetch=fetch)
+    sql = "SELECT month, revenue FROM kpi_monthly ORDER BY month DESC LIMIT 3;"
+
+    outputs, failed = run_metric_legs(lambda m: plan.rows(sql), ["revenue", "orders", "customers", "aov"])
+
+    assert failed == []
+    assert len(calls) == 1
+    assert all(rows is outputs[0] for rows in outputs)
+    assert plan.stats() == {"reads": 4, "queries": 1, "shared": 3}
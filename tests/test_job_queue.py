@@ -0,0 +1,78 @@
+import time
+
+from sqlalchemy import text
+
+from api import worker as worker_mod
+from api.app.services import job_queue
+from api.app.services.job_store import SqlJobStore
+from api.db.engines import get_engine
+
+store = SqlJobStore(ttl_s=0)
+
+
+def _clear():
+    with get_engine().begin() as conn:
+        store.ensure(conn)
+        conn.execute(text("DELETE FROM agent_jobs"))
+
+
+def test_claim_lease_and_fencing(monkeypatch):
+    _clear()
+    job = store.create({"type": "agent_query", "input": {"question": "q"}})
+
+    claimed = job_queue.claim_jobs("w1", 5)
+    assert [c["job_id"] for c in claimed] == [job["job_id"]] and claimed[0]["attempts"] == 1
+    assert job_queue.claim_jobs("w2", 5) == []
+    assert job_queue.heartbeat("w1", [job["job_id"]]) == 1
+
+    # w1 stalls past its lease: w2 reclaims, and w1 can no longer write the result.
+    with get_engine().begin() as conn:
+        conn.execute(text("UPDATE agent_jobs SET lease_expires_at = :t"), {"t": int(time.time()) - 1})
+    assert [c["job_id"] for c in job_queue.claim_jobs("w2", 5)] == [job["job_id"]]
+    assert not job_queue.complete_job(job["job_id"], "w1", {"stale": True})
+    assert job_queue.complete_job(job["job_id"], "w2", {"ok": True})
+
+    done = store.get(job["job_id"])
+    assert done["status"] == "SUCCEEDED" and done["result"] == {"ok": True}
+
+
+def test_backlog_older_than_ttl_is_still_claimable():
+    _clear()
+    ttl_store = SqlJobStore(ttl_s=60)
+    old = ttl_store.create({"type": "agent_query", "input": {"question": "old"}})
+    with get_engine().begin() as conn:
+        conn.execute(
+            text("UPDATE agent_jobs SET created_at = :t, updated_at = :t WHERE job_id = :j"),
+            {"t": int(time.time()) - 3600, "j": old["job_id"]},
+        )
+    new = ttl_store.create({"type": "agent_query", "input": {"question": "new"}})  # runs TTL cleanup
+
+    claimed = [c["job_id"] for c in job_queue.claim_jobs("w1", 5)]
+    assert claimed == [old["job_id"], new["job_id"]]
+
+
+def test_exhausted_jobs_fail(monkeypatch):
+    _clear()
+    monkeypatch.setattr(job_queue, "JOB_MAX_ATTEMPTS", 1)
+    job = store.create({"type": "agent_query", "input": {}})
+    job_queue.claim_jobs("w1", 1)
+    with get_engine().begin() as conn:
+        conn.execute(text("UPDATE agent_jobs SET lease_expires_at = :t"), {"t": int(time.time()) - 1})
+
+    assert job_queue.claim_jobs("w2", 1) == []
+    assert job_queue.fail_exhausted_jobs() == 1
+    assert store.get(job["job_id"])["status"] == "FAILED"
+
+
+def test_worker_runs_claimed_jobs(monkeypatch):
+    _clear()
+    monkeypatch.setitem(worker_mod.JOB_HANDLERS, "echo", lambda job_input: {"echo": job_input["x"]})
+    ok = store.create({"type": "echo", "input": {"x": 1}})
+    bad = store.create({"type": "nope", "input": {}})
+
+    w = worker_mod.Worker(concurrency=2, poll_interval=0.01)
+    assert w.run_once() == 2
+    w._executor.shutdown(wait=True)
+
+    assert store.get(ok["job_id"])["result"] == {"echo": 1}
+    assert store.get(bad["job_id"])["status"] == "FAILED"
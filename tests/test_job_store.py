@@ -0,0 +1,119 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from sqlalchemy import text
+
+from api.app.services import job_runner
+from api.app.services.job_store import MemoryJobStore, SqlJobStore
+from api.db.engines import get_engine
+
+
+def test_memory_store_is_bounded_and_lists_newest_first():
+    store = MemoryJobStore(max_jobs=3, ttl_s=3600)
+    ids = []
+    for i in range(5):
+        ids.append(store.create({"n": i})["job_id"])
+        store.update(ids[-1], status="SUCCEEDED", result={"n": i})
+
+    assert [j["job_id"] for j in store.recent(10)] == ids[:1:-1]
+    assert store.get(ids[0]) is None and store.stats()["evicted"] == 2
+    assert store.get(ids[-1])["result"] == {"n": 4}
+
+
+def test_memory_store_ttl_eviction():
+    store = MemoryJobStore(max_jobs=10, ttl_s=60)
+    old = store.create({})
+    store.update(old["job_id"], status="FAILED", error="boom")
+    old["updated_at"] -= 120
+    store.create({})
+    assert store.get(old["job_id"]) is None
+
+
+def test_memory_store_never_evicts_unfinished_jobs():
+    store = MemoryJobStore(max_jobs=2, ttl_s=60)
+    pending = store.create({})
+    pending["created_at"] -= 120
+    pending["updated_at"] -= 120
+    running = store.create({})
+    store.update(running["job_id"], status="RUNNING")
+    done = store.create({})
+    store.update(done["job_id"], status="SUCCEEDED")
+    store.create({})
+
+    assert store.get(pending["job_id"]) is not None and store.get(running["job_id"]) is not None
+    assert store.get(done["job_id"]) is None
+
+
+def test_sql_store_round_trip():
+    store = SqlJobStore(ttl_s=3600)
+    job = store.create({"type": "agent_query", "input": {"question": "q"}})
+    store.update(job["job_id"], status="SUCCEEDED", result={"rows": [1, 2]})
+
+    loaded = store.get(job["job_id"])
+    assert loaded["status"] == "SUCCEEDED" and loaded["result"] == {"rows": [1, 2]}
+    assert loaded["payload"]["input"]["question"] == "q"
+    assert store.recent(1)[0]["job_id"] == job["job_id"]
+
+
+def test_sql_store_expiry_keeps_unfinished_jobs():
+    store = SqlJobStore(ttl_s=60)
+    pending = store.create({"type": "agent_query", "input": {}})
+    done = store.create({"type": "agent_query", "input": {}})
+    store.update(done["job_id"], status="SUCCEEDED", result={})
+    with get_engine().begin() as conn:
+        conn.execute(
+            text("UPDATE agent_jobs SET created_at = :t, updated_at = :t WHERE job_id IN (:a, :b)"),
+            {"t": int(time.time()) - 120, "a": pending["job_id"], "b": done["job_id"]},
+        )
+
+    store.create({"type": "agent_query", "input": {}})
+    assert store.get(pending["job_id"])["status"] == "PENDING"
+    assert store.get(done["job_id"]) is None
+
+
+def test_sql_store_fails_stale_unfinished_jobs_in_local_mode():
+    store = SqlJobStore(ttl_s=3600, stale_s=60)
+    stale = store.create({"type": "agent_query", "input": {}})
+    fresh = store.create({"type": "agent_query", "input": {}})
+    with get_engine().begin() as conn:
+        conn.execute(
+            text("UPDATE agent_jobs SET updated_at = :t WHERE job_id = :id"),
+            {"t": int(time.time()) - 120, "id": stale["job_id"]},
+        )
+
+    store.create({"type": "agent_query", "input": {}})
+    got = store.get(stale["job_id"])
+    assert got["status"] == "FAILED" and got["error"].startswith("abandoned")
+    assert store.get(fresh["job_id"])["status"] == "PENDING"
+
+
+def test_job_runner_shutdown_cancels_waiting_jobs(monkeypatch):
+    monkeypatch.setattr(job_runner, "_EXECUTOR", ThreadPoolExecutor(max_workers=1))
+    monkeypatch.setitem(job_runner._STATS, "inflight", 0)
+    started, release = threading.Event(), threading.Event()
+    cancelled = []
+
+    def block():
+        started.set()
+        release.wait(5)
+
+    assert job_runner.submit_job(block, on_cancel=lambda: cancelled.append("running"))
+    assert job_runner.submit_job(lambda: None, on_cancel=lambda: cancelled.append("waiting"))
+    assert started.wait(5)
+    job_runner.shutdown_job_runner()
+
+    assert cancelled == ["waiting"]
+    assert job_runner._STATS["inflight"] == 1  # only the running job; it releases its slot when done
+    release.set()
+
+
+def test_job_runner_rejects_past_queue_depth(monkeypatch):
+    monkeypatch.setattr(job_runner, "JOB_WORKERS", 1)
+    monkeypatch.setattr(job_runner, "JOB_QUEUE_MAX", 0)
+    monkeypatch.setitem(job_runner._STATS, "inflight", 0)
+
+    assert job_runner.submit_job(time.sleep, 0.2)
+    assert not job_runner.submit_job(time.sleep, 0)
+    time.sleep(0.3)
+    assert job_runner.submit_job(lambda: None)
@@ -0,0 +1,34 @@
+from fastapi.testclient import TestClient
+
+from api.main import app
+
+client = TestClient(app)
+
+
+def test_bulk_upsert_reports_invalid_rows_and_writes_valid_ones():
+    res = client.post(
+        "/v1/kpi/bulk",
+        json={
+            "rows": [
+                {"month": "2024-01-01", "revenue": 90000, "orders": 1800, "customers": 1300, "aov": 50.0},
+                {"month": "2024-02-01", "revenue": 95000, "orders": 1900, "customers": 1350, "aov": 50.0},
+                {"month": "not-a-date", "revenue": 1, "orders": 1, "customers": 1, "aov": 1},
+            ]
+        },
+        headers={"X-API-Key": "test"},
+    )
+
+    assert res.status_code == 200
+    body = res.json()
+    assert body["valid"] == 2
+    assert body["invalid"] == 1
+    assert body["errors"][0]["index"] == 2
+    assert body["upserted"] == 2
+    assert body["months_range"] == ["2024-01-01", "2024-02-01"]
+
+    strict = client.post(
+        "/v1/kpi/bulk",
+        json={"rows": [{"month": "2024-03-01"}], "strict": True},
+        headers={"X-API-Key": "test"},
+    )
+    assert strict.status_code == 422
@@ -0,0 +1,20 @@
+from api.app.services import kpi_cache
+
+
+def test_reads_are_cached_until_data_version_bumps():
+    calls = []
+
+    @kpi_cache.kpi_cached
+    def read(month):
+        calls.append(month)
+        return [{"month": month, "revenue": 1.0}]
+
+    first = read("2025-12-01")
+    assert read("2025-12-01") is first
+    assert len(calls) == 1
+
+    version = kpi_cache.data_version()
+    assert kpi_cache.bump_data_version() == version + 1
+
+    read("2025-12-01")
+    assert len(calls) == 2
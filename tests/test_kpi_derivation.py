@@ -0,0 +1,52 @@
+from datetime import date
+
+from sqlalchemy import text
+
+from api.app.services import kpi_derivation
+from api.app.services.demo_loader import load_demo_sales
+from api.db.engines import get_engine
+
+
+def test_only_changed_months_are_recomputed(monkeypatch):
+    monkeypatch.setattr(kpi_derivation, "KPI_DERIVE_OVERLAP_S", 0)
+
+    load_demo_sales(days=60, countries=3, end=date(2023, 2, 28), seed=7)
+    first = kpi_derivation.derive_kpi_monthly(loaded=(date(2023, 1, 1), date(2023, 2, 28)))
+    assert {"2023-01-01", "2023-02-01"} <= set(first["months_recomputed"])
+
+    with get_engine().begin() as conn:
+        conn.execute(text("UPDATE demo_sales_daily SET updated_at = '2000-01-01 00:00:00'"))
+        conn.execute(
+            text("UPDATE kpi_derivation_watermark SET watermark = '2000-01-01 00:00:00'")
+        )
+
+    load_demo_sales(days=1, countries=3, end=date(2023, 2, 28), seed=8, replace=False)
+    second = kpi_derivation.derive_kpi_monthly()
+    assert second["months_recomputed"] == ["2023-02-01"]
+
+    with get_engine().connect() as conn:
+        revenue, orders, aov = conn.execute(
+            text("SELECT revenue, orders, aov FROM kpi_monthly WHERE month = '2023-02-01'")
+        ).one()
+        daily = conn.execute(
+            text("SELECT SUM(revenue), SUM(orders) FROM demo_sales_daily WHERE d >= '2023-02-01' AND d < '2023-03-01'")
+        ).one()
+    assert round(revenue, 2) == round(daily[0], 2)
+    assert orders == daily[1]
+    assert round(aov, 4) == round(daily[0] / daily[1], 4)
+
+
+def test_truncating_reseed_removes_months_without_daily_rows():
+    load_demo_sales(days=120, countries=2, end=date(2024, 8, 31), seed=1)
+    kpi_derivation.derive_kpi_monthly(loaded=(date(2024, 5, 4), date(2024, 8, 31)))
+
+    stats = load_demo_sales(days=20, countries=2, end=date(2024, 5, 20), seed=2)
+    replaced = tuple(date.fromisoformat(x) for x in stats["replaced_range"])
+    result = kpi_derivation.derive_kpi_monthly(loaded=(date(2024, 5, 1), date(2024, 5, 20)), replaced=replaced)
+
+    assert result["months_removed"] == ["2024-06-01", "2024-07-01", "2024-08-01"]
+    with get_engine().connect() as conn:
+        months = conn.execute(
+            text("SELECT month FROM kpi_monthly WHERE month >= '2024-05-01' AND month < '2024-09-01' ORDER BY month")
+        ).scalars().all()
+    assert [str(m)[:10] for m in months] == ["2024-05-01"]
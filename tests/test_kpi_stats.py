@@ -0,0 +1,61 @@
+from decimal import Decimal
+
+import pytest
+
+from api.app.services import kpi_stats
+from api.app.services.kpi_stats import series_stats
+from api.db.columnar import ColumnarResult
+from api.routers.kpi import RISK_METRICS, compute_risk_score, risk_visual_from_score
+
+
+def test_series_stats_rows_and_columnar_agree():
+    rows = [
+        {"month": "2025-0%d-01" % i, "revenue": Decimal(v), "orders": o, "note": "x"}
+        for i, (v, o) in enumerate([("100", 10), ("110", None), ("130", 12), ("120", 13)], start=1)
+    ]
+
+    for src in (rows, ColumnarResult.from_rows(rows)):
+        stats = series_stats(src, window=2)
+        assert set(stats) == {"revenue", "orders"}
+        rev = stats["revenue"]
+        assert rev.n == 4 and rev.mean == 115.0 and rev.first == 100.0
+        assert round(rev.std, 6) == round((500 / 3) ** 0.5, 6)
+        assert round(rev.slope, 6) == 8.0
+        assert rev.last_delta == -10.0 and rev.rolling_mean == 125.0
+        assert stats["orders"].n == 3 and stats["orders"].last_delta == 1.0
+
+
+def test_risk_score_and_visual_use_kernel():
+    rows = [{"revenue": v} for v in (100, 50, 150, 60)]
+    score = compute_risk_score(rows)
+    assert score == 100.0
+    assert risk_visual_from_score(score, rows).arrow == "↓"
+    assert compute_risk_score([{"return_rate": 0.1, "late_rate": None}]) == 6.0
+
+
+def test_all_null_rate_columns_match_pre_kernel_scoring():
+    # Expected values are what compute_risk_score / risk_visual_from_score returned
+    # before the kernel: a present rate column selects the rate branch even when all
+    # its values are NULL, and a present all-NULL revenue column pins the arrow to "→".
+    null_rates = [{"revenue": v, "return_rate": None, "late_rate": None} for v in (100, 50, 150, 60)]
+    null_revenue = [{"revenue": None, "return_rate": r} for r in (0.1, 0.2)]
+
+    for rows, score, arrow in ((null_rates, 0.0, "↓"), (null_revenue, 9.0, "→")):
+        stats = series_stats(rows, RISK_METRICS)
+        got = compute_risk_score(rows, stats)
+        assert round(got, 6) == score
+        assert risk_visual_from_score(got, rows, stats).arrow == arrow
+        col = ColumnarResult.from_rows(rows)
+        assert round(compute_risk_score(col), 6) == score and risk_visual_from_score(score, col).arrow == arrow
+
+
+@pytest.mark.skipif(not kpi_stats.HAS_NUMPY, reason="numpy not installed")
+def test_numpy_and_python_reducers_agree():
+    values = [1e6 + (i * 7919) % 500 - i * 0.25 for i in range(1000)]
+    for n in (1, 2, 5, 1000):
+        for window in (1, 7, 2000):
+            fast = kpi_stats._reduce_numpy("revenue", values[:n], window)
+            slow = kpi_stats._reduce_python("revenue", values[:n], window)
+            for field in vars(fast):
+                a, b = getattr(fast, field), getattr(slow, field)
+                assert a == pytest.approx(b, rel=1e-9, abs=1e-9), (n, window, field)
@@ -0,0 +1,29 @@
+import json
+import logging
+import queue
+
+from api.app.utils.log import DropQueueHandler, JsonFormatter
+from api.app.utils.request_id import new_request_id
+
+
+def _record(msg: str, **extra) -> logging.LogRecord:
+    record = logging.LogRecord("api.test", logging.INFO, __file__, 1, msg, None, None)
+    record.__dict__.update(extra)
+    return record
+
+
+def test_queue_handler_drops_instead_of_blocking_and_stamps_request_id():
+    q = queue.Queue(maxsize=1)
+    handler = DropQueueHandler(q)
+    request_id = new_request_id()
+
+    handler.handle(_record("first", metric="revenue"))
+    handler.handle(_record("second"))
+
+    assert handler.dropped == 1
+    line = JsonFormatter().format(q.get_nowait())
+    out = json.loads(line)
+    assert out["msg"] == "first"
+    assert out["request_id"] == request_id
+    assert out["metric"] == "revenue"
+    assert out["level"] == "INFO"
@@ -0,0 +1,80 @@
+from sqlalchemy import event, text
+
+from api.app.services.log_sink import LogSink
+from api.db.engines import get_engine
+
+
+def test_log_sink_batches_rows_and_flushes_on_close():
+    with get_engine().begin() as conn:
+        conn.execute(
+            text(
+                "CREATE TABLE IF NOT EXISTS agent_query_log ("
+                "id INTEGER PRIMARY KEY, question TEXT NOT NULL, mode TEXT NOT NULL, "
+                "latency_ms INT NOT NULL, status TEXT NOT NULL, error TEXT, "
+                "created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP)"
+            )
+        )
+        conn.execute(text("DELETE FROM agent_query_log"))
+
+    sink = LogSink(batch_size=2, flush_ms=60000, queue_max=3)
+    sink._ensure_thread = lambda: None  # hold the writer so the queue fills deterministically
+    for i in range(4):
+        sink.submit("agent_query_log", {"question": f"q{i}", "mode": "agent_llm", "latency_ms": i, "status": "ok"})
+    assert sink.stats()["dropped"] == 1
+
+    del sink._ensure_thread
+    sink._ensure_thread()
+    sink.close()
+
+    stats = sink.stats()
+    assert stats["written"] == 3 and stats["batches"] == 2 and stats["queued"] == 0
+    with get_engine().connect() as conn:
+        rows = conn.execute(text("SELECT question FROM agent_query_log ORDER BY id")).scalars().all()
+    assert rows == ["q0", "q1", "q2"]
+
+
+def test_log_sink_failure_is_isolated_per_table_and_row():
+    with get_engine().begin() as conn:
+        conn.execute(text("DROP TABLE IF EXISTS analysis_log"))
+        conn.execute(text("DELETE FROM agent_query_log"))
+
+    sink = LogSink(batch_size=10, flush_ms=60000)
+    rows = [{"question": "ok1", "mode": "m", "latency_ms": 1, "status": "ok"},
+            {"question": "bad", "mode": None, "latency_ms": 1, "status": "ok"},  # NOT NULL violation
+            {"question": "ok2", "mode": "m", "latency_ms": 1, "status": "ok"}]
+    sink._write([("agent_query_log", r) for r in rows] + [("analysis_log", {"metric": "revenue"})])
+
+    stats = sink.stats()
+    assert stats["written"] == 2 and stats["failed"] == 2
+    with get_engine().connect() as conn:
+        assert conn.execute(text("SELECT question FROM agent_query_log ORDER BY id")).scalars().all() == ["ok1", "ok2"]
+
+
+def test_log_sink_splits_large_batches_under_sqlite_param_limit():
+    with get_engine().begin() as conn:
+        conn.execute(text("DROP TABLE IF EXISTS analysis_log"))
+        conn.execute(
+            text(
+                "CREATE TABLE analysis_log (id INTEGER PRIMARY KEY, metric TEXT NOT NULL, range TEXT NOT NULL, "
+                "style TEXT NOT NULL, sql TEXT NOT NULL, narrative TEXT, risk TEXT, recommendation TEXT)"
+            )
+        )
+
+    params_per_insert = []
+
+    def count(conn, cursor, statement, parameters, context, executemany):
+        if statement.startswith("INSERT INTO analysis_log"):
+            params_per_insert.append(len(parameters))
+
+    engine = get_engine()
+    event.listen(engine, "before_cursor_execute", count)
+    try:
+        row = {"metric": "revenue", "range": "last_30_days", "style": "executive", "sql": "SELECT 1"}
+        LogSink()._write([("analysis_log", row)] * 300)
+    finally:
+        event.remove(engine, "before_cursor_execute", count)
+
+    assert sum(params_per_insert) == 300 * 7 and max(params_per_insert) <= 999
+    with engine.begin() as conn:
+        assert conn.execute(text("SELECT COUNT(*) FROM analysis_log")).scalar() == 300
+        conn.execute(text("DROP TABLE analysis_log"))
@@ -0,0 +1,55 @@
+from fastapi.testclient import TestClient
+
+from api.app.utils.metrics import stage
+from api.main import app
+
+client = TestClient(app)
+
+
+def test_metrics_endpoint_exposes_requests_stages_and_gauges():
+    assert client.get("/health").status_code == 200
+    with stage("unit_test"):
+        pass
+
+    res = client.get("/metrics")
+    assert res.status_code == 200
+    assert res.headers["content-type"].startswith("text/plain")
+    body = res.text
+
+    assert 'http_requests_total{endpoint="/health",method="GET",mode="none",status="200"}' in body
+    assert 'agent_stage_seconds_count{endpoint="background",mode="none",stage="unit_test"}' in body
+    assert 'agent_stage_seconds_bucket{endpoint="background",mode="none",stage="unit_test",le="+Inf"}' in body
+    assert "# TYPE kpi_cache_hits_total counter\nkpi_cache_hits_total " in body
+    assert "# TYPE job_runner_inflight gauge\njob_runner_inflight " in body
+    assert "single_flight_coalesced_total " in body and "job_runner_submitted " not in body
+
+
+def test_jobs_submitted_from_a_request_are_recorded_as_background(monkeypatch):
+    from concurrent.futures import ThreadPoolExecutor
+
+    from api.app.services import job_runner
+    from api.app.utils import metrics
+    from api.app.utils.request_id import current_request_id, new_request_id
+
+    monkeypatch.setattr(job_runner, "_EXECUTOR", ThreadPoolExecutor(max_workers=1))
+    seen = {}
+
+    def job():
+        metrics.set_request_mode("agent_llm")
+        with stage("job_test"):
+            pass
+        seen["request_id"] = current_request_id()
+
+    rec = metrics._RequestRecord()
+    token = metrics._CURRENT.set(rec)
+    try:
+        request_id = new_request_id()
+        assert job_runner.submit_job(job)
+        job_runner._EXECUTOR.shutdown(wait=True)
+    finally:
+        metrics._CURRENT.reset(token)
+
+    assert rec.mode == "none" and rec.stages == []
+    assert seen["request_id"] == request_id
+    body = client.get("/metrics").text
+    assert 'agent_stage_seconds_count{endpoint="background",mode="none",stage="job_test"} 1' in body
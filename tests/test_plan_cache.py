@@ -0,0 +1,94 @@
+import json
+
+from api.llm import planner
+from api.llm.cache import LLMCache, MemoryBackend
+
+
+class _Resp:
+    output_text = json.dumps({"metrics": ["revenue"], "intent": "explain", "grain": "month"})
+
+
+class _FakeClient:
+    def __init__(self):
+        self.calls = 0
+        self.responses = self
+
+    def create(self, **_):
+        self.calls += 1
+        return _Resp()
+
+
+def test_repeated_question_skips_planner_llm(monkeypatch):
+    fake = _FakeClient()
+    monkeypatch.setattr(planner, "client", fake)
+    monkeypatch.setattr(planner, "OPENAI_API_KEY", "test-key")
+    monkeypatch.setattr(planner, "plan_cache", LLMCache("plan-test", ttl_s=60, backend=MemoryBackend()))
+
+    first = planner.make_plan("Why did revenue drop last month?")
+    second = planner.make_plan("  why did REVENUE drop last month ")
+
+    assert fake.calls == 1
+    assert second == first
+    stats = planner.plan_cache.stats()
+    assert stats["hits"] == 1 and stats["misses"] == 1
+
+
+def test_fuzzy_match_ignores_word_order_and_filler(monkeypatch):
+    fake = _FakeClient()
+    monkeypatch.setattr(planner, "client", fake)
+    monkeypatch.setattr(planner, "OPENAI_API_KEY", "test-key")
+    monkeypatch.setattr(planner, "PLAN_CACHE_FUZZY", True)
+    monkeypatch.setattr(planner, "plan_cache", LLMCache("plan-fuzzy-test", ttl_s=60, backend=MemoryBackend()))
+
+    planner.make_plan("Why did revenue drop last month?")
+    planner.make_plan("Why revenue drop last month")
+    planner.make_plan("Show revenue trend by country")
+
+    assert fake.calls == 2
+    assert planner.plan_cache.stats()["fuzzy_hits"] == 1
+
+
+def test_memory_backend_lru_and_ttl():
+    backend = MemoryBackend(max_entries=2)
+    backend.set("a", "1", ttl_s=60)
+    backend.set("b", "2", ttl_s=60)
+    backend.get("a")
+    backend.set("c", "3", ttl_s=60)
+    assert backend.get("b") is None
+    assert backend.get("a") == "1"
+    assert backend.evictions == 1
+
+    backend.set("d", "4", ttl_s=-1)
+    assert backend.get("d") is None
+
+
+def test_summary_cache_keyed_on_results(monkeypatch):
+    from api.llm import summarizer
+
+    class _SummaryResp:
+        output_text = json.dumps({"executive_summary": "ok", "key_findings": [], "drivers": [], "next_actions": []})
+
+    class _SummaryClient:
+        def __init__(self):
+            self.calls = 0
+            self.responses = self
+
+        def create(self, **_):
+            self.calls += 1
+            return _SummaryResp()
+
+    fake = _SummaryClient()
+    monkeypatch.setattr(summarizer, "client", fake)
+    monkeypatch.setattr(summarizer, "OPENAI_API_KEY", "test-key")
+    monkeypatch.setattr(summarizer, "summary_cache", LLMCache("summary-test", ttl_s=60, backend=MemoryBackend()))
+
+    plan = {"intent": "explain", "metrics": ["revenue"]}
+    results = {"revenue": [{"period": "2025-01-01", "value": "10.00"}]}
+
+    first = summarizer.summarize("Why did revenue drop?", plan, results)
+    assert summarizer.summarize("why did revenue drop", plan, results) == first
+    assert fake.calls == 1
+
+    changed = {"revenue": [{"period": "2025-01-01", "value": "9.00"}]}
+    summarizer.summarize("Why did revenue drop?", plan, changed)
+    assert fake.calls == 2
@@ -0,0 +1,25 @@
+from datetime import date
+
+from api.app.sql.builder import build_kpi_sql
+
+
+def test_month_grain_reads_whole_months_from_rollup():
+    coverage = {"month": (date(2024, 1, 1), date(2025, 7, 1)), "week": (date(2024, 1, 1), date(2025, 6, 30))}
+
+    sql, params = build_kpi_sql("revenue", "month", date(2024, 3, 15), date(2025, 6, 20), rollups=coverage)
+
+    assert "FROM demo_sales_monthly" in sql
+    assert params["r_start"] == "2024-04-01"
+    assert params["r_end"] == "2025-06-01"
+
+
+def test_falls_back_to_daily_without_matching_rollup():
+    coverage = {"month": (date(2024, 1, 1), date(2025, 7, 1))}
+
+    day_sql, _ = build_kpi_sql("orders", "day", date(2024, 3, 1), date(2025, 6, 1), rollups=coverage)
+    weekly_only, _ = build_kpi_sql(
+        "orders", "month", date(2024, 3, 1), date(2025, 6, 1), rollups={"week": coverage["month"]}
+    )
+
+    assert "demo_sales_monthly" not in day_sql
+    assert "demo_sales_weekly" not in weekly_only
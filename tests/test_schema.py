@@ -0,0 +1,36 @@
+import os
+from datetime import date
+
+import pytest
+
+from api.db.schema import iter_months, partition_name, supported_plan_shapes
+
+IS_POSTGRES = os.getenv("DATABASE_URL", "").startswith(("postgres://", "postgresql"))
+
+
+def test_monthly_partitions_cover_load_range():
+    months = list(iter_months(date(2024, 11, 15), date(2025, 2, 3)))
+    assert [partition_name(m) for m in months] == [
+        "demo_sales_daily_p202411",
+        "demo_sales_daily_p202412",
+        "demo_sales_daily_p202501",
+        "demo_sales_daily_p202502",
+    ]
+
+
+@pytest.mark.skipif(not IS_POSTGRES, reason="EXPLAIN check needs Postgres")
+def test_supported_plan_shapes_avoid_seq_scans():
+    from api.app.services.demo_loader import load_demo_sales
+    from api.app.services.rollup_service import refresh_rollups
+    from api.db.engines import get_engine
+    from api.db.schema import explain_plan_shapes
+
+    stats = load_demo_sales(days=120, countries=3, categories=2, sellers=2, end=date(2025, 6, 30), seed=3)
+    refresh_rollups(full=True)
+    assert stats["schema"]["layout"] == "partitioned"
+
+    with get_engine().connect() as conn:
+        results = explain_plan_shapes(conn, date(2025, 3, 10), date(2025, 6, 20))
+
+    assert len(results) == len(supported_plan_shapes())
+    assert [r for r in results if not r["ok"]] == []
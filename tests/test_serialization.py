@@ -0,0 +1,23 @@
+import json
+from datetime import date, datetime
+from decimal import Decimal
+
+from api.app.utils.serialization import FastJSONResponse, dumps
+from api.llm.schemas import DateRange
+
+
+def test_single_pass_encoding_matches_jsonable_encoder_rules():
+    payload = {
+        "rows": [{"period": date(2025, 1, 1), "value": Decimal("10.50"), "orders": Decimal("12")}],
+        "at": datetime(2025, 1, 1, 9, 30),
+        "range": DateRange(mode="relative", preset="last_7_days"),
+        "pair": ("a", "b"),
+    }
+
+    decoded = json.loads(dumps(payload))
+
+    assert decoded["rows"] == [{"period": "2025-01-01", "value": 10.5, "orders": 12}]
+    assert decoded["at"] == "2025-01-01T09:30:00"
+    assert decoded["range"]["preset"] == "last_7_days"
+    assert decoded["pair"] == ["a", "b"]
+    assert FastJSONResponse(payload).body == dumps(payload)
@@ -0,0 +1,44 @@
+from fastapi.testclient import TestClient
+
+from api.app.services.insight_service import simulate_kpi_what_if
+from api.main import app
+
+client = TestClient(app)
+HEADERS = {"X-API-Key": "test"}
+
+CHANGES = {
+    "status": "ok",
+    "months": [
+        {"month": "2025-10-01", "revenue": 100.0, "orders": 10, "aov": 10.0},
+        {"month": "2025-11-01", "revenue": 120.0, "orders": 12, "aov": 10.0},
+    ],
+}
+
+
+def test_grid_matches_single_scenarios(monkeypatch):
+    monkeypatch.setattr("api.routers.ask_text.compute_latest_kpi_changes", lambda: CHANGES)
+    od, ad = [-0.1, 0.0, 0.2], [0.05, -0.05]
+
+    res = client.post("/v1/agent/simulate/batch", json={"orders_delta_pct": od, "aov_delta_pct": ad}, headers=HEADERS)
+    assert res.status_code == 200
+    body = res.json()
+    assert body["shape"] == [3, 2]
+
+    for i, o in enumerate(od):
+        for j, a in enumerate(ad):
+            single = simulate_kpi_what_if(CHANGES, {"orders_delta_pct": o, "aov_delta_pct": a})
+            assert abs(body["revenue"][i * 2 + j] - single["simulated"]["revenue"]) < 1e-9
+            assert abs(body["revenue_delta_pct"][i * 2 + j] - single["impact"]["revenue_delta_pct"]) < 1e-9
+
+    listed = client.post(
+        "/v1/agent/simulate/batch", json={"scenarios": [{"orders_delta_pct": 0.1}]}, headers=HEADERS
+    ).json()
+    assert abs(listed["revenue"][0] - 132.0) < 1e-9
+
+
+def test_batch_rejects_ambiguous_or_oversized_requests(monkeypatch):
+    monkeypatch.setattr("api.routers.ask_text.SIMULATE_MAX_SCENARIOS", 4)
+    assert client.post("/v1/agent/simulate/batch", json={}, headers=HEADERS).status_code == 422
+    assert client.post("/v1/agent/simulate/batch", json={"orders_delta_pct": [0.1]}, headers=HEADERS).status_code == 422
+    big = {"orders_delta_pct": [0, 0.1, 0.2], "aov_delta_pct": [0, 0.1]}
+    assert client.post("/v1/agent/simulate/batch", json=big, headers=HEADERS).status_code == 400
@@ -0,0 +1,43 @@
+import asyncio
+
+from api.app.services.single_flight import AsyncSingleFlight
+
+
+def test_concurrent_identical_keys_share_one_call():
+    flight = AsyncSingleFlight()
+    calls = []
+
+    async def work(tag):
+        calls.append(tag)
+        await asyncio.sleep(0.05)
+        return {"mode": "agent_llm", "tag": tag}
+
+    async def main():
+        same = [flight.do("q", lambda: work("q")) for _ in range(5)]
+        return await asyncio.gather(*same, flight.do("other", lambda: work("other")))
+
+    results = asyncio.run(main())
+
+    assert sorted(calls) == ["other", "q"]
+    assert all(r is results[0] for r in results[:5])
+    assert flight.stats() == {"leaders": 2, "coalesced": 4, "inflight": 0, "enabled": True}
+
+
+def test_errors_are_shared_and_key_is_released():
+    flight = AsyncSingleFlight()
+
+    async def boom():
+        await asyncio.sleep(0.01)
+        raise RuntimeError("llm down")
+
+    async def main():
+        return await asyncio.gather(flight.do("q", boom), flight.do("q", boom), return_exceptions=True)
+
+    results = asyncio.run(main())
+    assert all(isinstance(r, RuntimeError) for r in results)
+
+    async def ok():
+        return 1
+
+    assert asyncio.run(flight.do("q", ok)) == 1
+    assert flight.stats()["leaders"] == 2
@@ -0,0 +1,65 @@
+from datetime import date, timedelta
+
+from fastapi.testclient import TestClient
+
+from api.app.services.demo_loader import load_demo_sales
+from api.app.services.streaming_anomaly import StreamingAnomalyDetector, reset_streaming_detector
+from api.main import app
+
+
+def _day(d, revenue):
+    return [
+        {"d": d, "country": c, "category": "home", "revenue": revenue, "orders": 10, "customers": 5}
+        for c in ("KR", "US")
+    ]
+
+
+def test_detector_flags_spike_only_on_the_affected_series_and_skips_old_days():
+    start = date(2024, 1, 1)
+    detector = StreamingAnomalyDetector(warmup=14)
+    history = [r for i in range(42) for r in _day(start + timedelta(days=i), 100.0 + (i % 7) * 3 + (i % 3))]
+    assert detector.ingest(history) == 41  # the newest day is held back
+    assert detector.alerts() == []
+
+    spike_day = start + timedelta(days=42)
+    rows = _day(spike_day, 100.0)
+    rows[0]["revenue"] = 400.0  # KR only
+    rows += _day(spike_day + timedelta(days=1), 100.0)
+    assert detector.ingest(history + rows) == 2  # already-seen days are skipped
+
+    alerts = detector.alerts()
+    flagged = {(a["metric"], a["country"], a["category"]) for a in alerts}
+    assert ("revenue", "KR", "home") in flagged and ("revenue", "KR", None) in flagged
+    assert not any(a["country"] == "US" for a in alerts)
+    assert all(a["direction"] == "UP" and a["day"] == spike_day.isoformat() for a in alerts)
+
+
+def test_detector_waits_for_a_day_to_finish_loading():
+    start = date(2024, 1, 1)
+    detector = StreamingAnomalyDetector(warmup=14)
+    history = [r for i in range(42) for r in _day(start + timedelta(days=i), 100.0 + (i % 7) * 3 + (i % 3))]
+    detector.ingest(history)
+
+    today = start + timedelta(days=42)
+    partial = _day(today, 100.0)[:1]
+    partial[0]["revenue"] = 5.0  # only the first rows of the day have landed
+    assert detector.ingest(history + partial) == 1  # yesterday, now that today has started
+    assert detector.watermark == today - timedelta(days=1)
+
+    complete = _day(today, 100.0) + _day(today + timedelta(days=1), 100.0)
+    assert detector.ingest(history + complete) == 1 and detector.watermark == today
+    assert detector.alerts() == []
+
+
+def test_streaming_insight_endpoint():
+    reset_streaming_detector()
+    load_demo_sales(days=30, countries=2)
+    client = TestClient(app)
+    res = client.post("/v1/agent/insight?mode=streaming", json={}, headers={"X-API-Key": "test"})
+    assert res.status_code == 200
+    body = res.json()
+    assert body["mode"] == "streaming" and body["days_ingested"] >= 29
+    assert body["series"] > 0 and "alerts" in body
+
+    again = client.post("/v1/agent/insight?mode=streaming", json={}, headers={"X-API-Key": "test"}).json()
+    assert again["days_ingested"] == 0